@@ -1,8 +1,35 @@
-from flask import Flask, request, jsonify
-import joblib
+from flask import Flask, Response, request, jsonify, stream_with_context
+import hmac
+import itertools
+import json
 import os
+import threading
+import time
+import numpy as np
 import pandas as pd
 
+from artifact import artifact_path, feature_schema, open_model
+from batch import (
+    DEFAULT_CHUNK_SIZE,
+    format_results,
+    full_output,
+    iter_ndjson,
+    iter_predictions,
+    parse_output_options,
+)
+from columnar import load_dataset
+from cache import DEFAULT_MAXSIZE, DEFAULT_TTL, PredictionCache, canonical_key
+from dataset import FORMATS, DatasetView, QueryError, parse_query
+from drift import DEFAULT_MIN_SAMPLES, DEFAULT_SLOT_SECONDS, DEFAULT_WINDOWS, DriftMonitor, ReferenceProfile
+from explain import explain_records, explanation_output, parse_explain_class, supports_explanations
+from ingest import IncrementalDataset, parse_csv_records
+from metrics import Metrics
+from registry import ModelRegistry, RegistryError
+from schema import RecordSchema
+from scheduler import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS, MicroBatcher
+from serving import ServedModel, ShadowScorer
+from sweep import SweepError, parse_sweep, sweep_output, sweep_probabilities
+
 app = Flask(__name__)
 
 # =====================================================
@@ -11,17 +38,240 @@ app = Flask(__name__)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 MODEL_PATH = os.path.join(BASE_DIR, "obesity_model.pkl")
+MODEL_ARTIFACT_PATH = os.getenv("MODEL_ARTIFACT_PATH", artifact_path(MODEL_PATH))
 DATA_PATH = os.path.join(BASE_DIR, "obesity.csv")
+INGEST_LOG_PATH = os.getenv("INGEST_LOG_PATH", os.path.join(BASE_DIR, "obesity.ingested.csv"))
+INGEST_DIR = os.getenv("INGEST_DIR", os.path.join(BASE_DIR, "ingest"))
+INGEST_TOKEN = os.getenv("INGEST_TOKEN")
+MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", os.path.join(BASE_DIR, "registry"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", DEFAULT_CHUNK_SIZE))
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", DEFAULT_MAXSIZE))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", DEFAULT_TTL))
+EXPLANATION_CACHE_SIZE = int(os.getenv("EXPLANATION_CACHE_SIZE", DEFAULT_MAXSIZE))
+
+MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "0") == "1"
+MICROBATCH_MAX_SIZE = int(os.getenv("MICROBATCH_MAX_SIZE", DEFAULT_MAX_BATCH_SIZE))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", DEFAULT_MAX_WAIT_MS))
+
+METRICS_STAGE_TIMING = os.getenv("METRICS_STAGE_TIMING", "0") == "1"
+
+MODEL_WARM_UP_ROWS = int(os.getenv("MODEL_WARM_UP_ROWS", "64"))
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "5"))
+
+DRIFT_ENABLED = os.getenv("DRIFT_ENABLED", "1") == "1"
+DRIFT_SLOT_SECONDS = float(os.getenv("DRIFT_SLOT_SECONDS", DEFAULT_SLOT_SECONDS))
+DRIFT_WINDOWS = [int(w) for w in os.getenv("DRIFT_WINDOWS", ",".join(map(str, DEFAULT_WINDOWS))).split(",")]
+DRIFT_MIN_SAMPLES = int(os.getenv("DRIFT_MIN_SAMPLES", DEFAULT_MIN_SAMPLES))
 
 # =====================================================
-# LOAD MODEL
+# METRICS
 # =====================================================
-model = joblib.load(MODEL_PATH)
+metrics = Metrics(stage_timing=METRICS_STAGE_TIMING)
 
 # =====================================================
 # LOAD DATA
 # =====================================================
-df = pd.read_csv(DATA_PATH)
+# Cópia colunar por memory-map quando gerada (ver columnar.py); senão o CSV.
+df = load_dataset(DATA_PATH)
+
+# Esquema de entrada que a API serve: as colunas do dataset, menos o alvo.
+EXPECTED_SCHEMA = feature_schema(df.drop(columns=["Obesity"]))
+
+# Dataset servido pelo /data: o base + as linhas ingeridas (ver ingest.py), já com as
+# colunas derivadas. O `df` acima continua sendo só o obesity.csv (warm-up e esquemas).
+dataset = DatasetView(df)
+store = IncrementalDataset(df, RecordSchema.from_frame(df), INGEST_LOG_PATH, on_append=dataset.update)
+dataset.update(store.frame)
+
+# =====================================================
+# DRIFT MONITORING
+# =====================================================
+# Perfil de referência do obesity.csv; as entradas do /predict são comparadas a ele em
+# janelas deslizantes (ver drift.py).
+drift = None
+if DRIFT_ENABLED:
+    drift = DriftMonitor(
+        ReferenceProfile.from_frame(df, df.columns.drop("Obesity"), target="Obesity"),
+        slot_seconds=DRIFT_SLOT_SECONDS,
+        windows=DRIFT_WINDOWS,
+        min_samples=DRIFT_MIN_SAMPLES
+    )
+
+# =====================================================
+# LOAD MODEL
+# =====================================================
+# Versões em registry/ (ver registry.py); sem CURRENT, o obesity_model.pkl da imagem.
+registry = ModelRegistry(MODEL_REGISTRY_DIR)
+BUILTIN_VERSION = "builtin"
+
+served = None       # ServedModel ativo: as rotas o leem uma vez por requisição
+shadow = None       # ShadowScorer da versão candidata, ou None
+ready = False
+
+_swap_lock = threading.Lock()
+loading = {"version": None, "started_at": None, "error": None}
+
+
+def resolve_model(version=None):
+    """(versão, caminho do .pkl, caminho do artefato) da versão pedida ou da ativa no registro."""
+    version = version or registry.current()
+    if version is None or version == BUILTIN_VERSION:
+        return BUILTIN_VERSION, MODEL_PATH, MODEL_ARTIFACT_PATH
+    path = registry.model_path(version)
+    return version, path, artifact_path(path)
+
+
+def build_served_model(version=None):
+    """Carrega uma versão e a aquece com linhas reais do dataset, sem colocá-la em serviço.
+
+    Usa o artefato compacto (artifact.py) quando ele existe e corresponde ao `.pkl`;
+    um artefato com esquema de features diferente do dataset é recusado.
+    """
+    version, path, model_artifact = resolve_model(version)
+    model, compiled, model_format = open_model(path, model_artifact, EXPECTED_SCHEMA)
+    features = list(model.feature_names_in_)
+
+    # Warm-up: predições unitárias e em lote com linhas espalhadas pelo dataset.
+    step = max(len(df) // max(MODEL_WARM_UP_ROWS, 1), 1)
+    sample = df[features].iloc[::step].head(MODEL_WARM_UP_ROWS)
+    if compiled is not None:
+        compiled.predict_record(sample.to_dict("records")[0])
+        proba = compiled.predict_proba(compiled.transform_records(sample.to_dict("records")))
+    else:
+        model.predict(sample.head(1))
+        proba = model.predict_proba(sample)
+    if not np.allclose(np.sum(proba, axis=1), 1.0):
+        raise ValueError(f"model version {version} failed warm-up: invalid probabilities")
+
+    batcher = None
+    if MICROBATCH_ENABLED and compiled is not None:
+        # Só o predict_proba é agrupado; o vetor é montado na thread da requisição.
+        batcher = MicroBatcher(
+            compiled.predict_proba,
+            max_batch_size=MICROBATCH_MAX_SIZE,
+            max_wait_ms=MICROBATCH_MAX_WAIT_MS
+        )
+    return ServedModel(
+        version, path, model, compiled, model_format,
+        schema=RecordSchema.from_frame(df, features),
+        numeric_features=df[features].select_dtypes(include="number").columns,
+        prediction_cache=PredictionCache(
+            maxsize=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL, model_path=path
+        ),
+        explanation_cache=PredictionCache(
+            maxsize=EXPLANATION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL, model_path=path
+        ),
+        batcher=batcher,
+    )
+
+
+def load_model(version=None):
+    """Carrega (ou recarrega) o modelo e o coloca em serviço após o warm-up.
+
+    A troca é atômica: requisições em andamento terminam na versão antiga.
+    """
+    global served, ready
+
+    started = time.perf_counter()
+    new = build_served_model(version)
+    with _swap_lock:
+        old, served = served, new
+        ready = True
+    metrics.observe_model_load(time.perf_counter() - started)
+    if old is not None and old is not new:
+        old.retire()
+    return new
+
+
+def reload_models():
+    """Recarrega a versão ativa e a sombra do registro.
+
+    Se a versão ativa falhar, a atual continua e o erro sobe. A sombra é opcional e falha
+    à parte (ver `configure_shadow`): uma troca da ativa já feita nunca é desfeita por ela,
+    e quem chamou segue adiante (no Gunicorn, recicla os workers).
+    """
+    loading.update(version=registry.current() or BUILTIN_VERSION, started_at=time.time(), error=None)
+    try:
+        load_model()
+    except Exception as e:
+        loading["error"] = f"{loading['version']}: {e}"
+        raise
+    finally:
+        loading["version"] = None
+    configure_shadow()
+
+
+def configure_shadow():
+    """(Re)configura o modo sombra a partir do registro (arquivo SHADOW).
+
+    Uma candidata que não carrega desliga o modo sombra (com o erro em `loading`), sem
+    derrubar a API nem a troca da versão ativa.
+    """
+    global shadow
+
+    config = registry.shadow()
+    if config is None:
+        shadow = None
+    elif shadow is None or (shadow.candidate.version, shadow.fraction) != (config["version"], config["fraction"]):
+        try:
+            shadow = ShadowScorer(build_served_model(config["version"]), config["fraction"])
+        except Exception as e:
+            shadow = None
+            loading["error"] = f"shadow {config['version']}: {e}"
+            app.logger.error("shadow model %s failed to load, shadow mode disabled: %s",
+                             config["version"], e)
+    return shadow
+
+
+def model_state():
+    """Assinatura do estado de deploy (registro + arquivo da versão ativa), para os watchers."""
+    try:
+        stat = os.stat(served.path)
+        file_signature = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        file_signature = None
+    return registry.state(), file_signature
+
+
+def watch_models(interval=MODEL_WATCH_INTERVAL):
+    """Thread que recarrega o modelo quando o registro ou o `.pkl` ativo mudam (fora do Gunicorn).
+
+    A carga e o warm-up rodam nesta thread; as requisições seguem na versão atual até a troca.
+    """
+    if interval <= 0:
+        return None
+
+    def loop():
+        state = model_state()
+        while True:
+            time.sleep(interval)
+            current = model_state()
+            if current == state:
+                continue
+            try:
+                reload_models()
+            except Exception as e:
+                app.logger.error("model reload failed, keeping current model: %s", e)
+            state = model_state()
+
+    thread = threading.Thread(target=loop, daemon=True, name="model-watcher")
+    thread.start()
+    return thread
+
+
+load_model()
+configure_shadow()
+
+# =====================================================
+# REQUEST COUNTERS
+# =====================================================
+@app.after_request
+def count_request(response):
+    endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    metrics.observe_request(endpoint, response.status_code)
+    return response
 
 # =====================================================
 # ROOT
@@ -34,37 +284,406 @@ def home():
         "version": "2.0"
     })
 
+# =====================================================
+# HEALTH / READINESS
+# =====================================================
+@app.route("/health", methods=["GET"])
+def health():
+    return jsonify({
+        "status": "ok"
+    })
+
+
+@app.route("/ready", methods=["GET"])
+def readiness():
+    if not ready:
+        return jsonify({
+            "ready": False
+        }), 503
+    return jsonify({
+        "ready": True,
+        "model_version": served.version,
+        "model_format": served.format,
+        "model_classes": len(served.classes_)
+    })
+
 # =====================================================
 # PREDICTION ENDPOINT
 # =====================================================
 @app.route("/predict", methods=["POST"])
 def predict():
+    # Uma leitura da versão ativa por requisição: uma troca no meio não a afeta.
+    current = served
+    timer = metrics.timer("/predict")
     try:
+        options = parse_output_options(request.args, len(current.classes_))
         data = request.json
-        input_df = pd.DataFrame([data])
-        prediction = model.predict(input_df)[0]
+        timer.mark("decode")
+
+        checked = current.schema.validate([data])
+        if checked.errors:
+            body = {"error": checked.error_message(0)}
+            if "_record" not in checked.errors[0]:
+                body["fields"] = checked.errors[0]
+            if drift is not None:
+                drift.observe_rejected(list(checked.errors[0]))
+            return jsonify(body), 400
+        data = checked.record(0)
+
+        # O cache guarda a linha de predict_proba; rótulo e top-k saem dela.
+        key = canonical_key(data, current.features, current.numeric_features)
+        proba = current.prediction_cache.get(key)
+        timer.mark("validation")
+
+        if proba is None:
+            started = time.perf_counter()
+            if current.compiled is not None:
+                X = current.compiled.transform_record(data)
+                timer.mark("preprocessing")
+                if current.batcher is not None:
+                    proba = current.batcher.predict_proba_one(X)
+                else:
+                    proba = current.compiled.predict_proba(X)[0]
+            else:
+                X = current.model[:-1].transform(pd.DataFrame([data]))
+                timer.mark("preprocessing")
+                proba = current.model[-1].predict_proba(X)[0]
+            timer.mark("model")
+            current.prediction_cache.put(key, proba)
+
+            candidate = shadow
+            if candidate is not None:
+                candidate.maybe_submit(data, current.classes_, proba, time.perf_counter() - started)
+
+        if drift is not None:
+            drift.observe(data, current.classes_, proba)
+        response = jsonify(full_output(proba, current.classes_, options["top_k"]))
+        timer.mark("encode")
+        timer.done()
+        return response
 
+    except Exception as e:
         return jsonify({
-            "prediction": prediction
+            "error": str(e)
+        }), 400
+
+# =====================================================
+# EXPLANATION ENDPOINT
+# =====================================================
+@app.route("/explain", methods=["POST"])
+def explain():
+    current = served
+    if not supports_explanations(current.compiled):
+        return jsonify({
+            "error": "explanations require the compiled GradientBoosting model"
+        }), 501
+
+    timer = metrics.timer("/explain")
+    classes = current.compiled.classes_
+    try:
+        class_index = parse_explain_class(request.args, classes)
+    except ValueError as e:
+        return jsonify({
+            "error": str(e)
+        }), 400
+
+    data = request.get_json(silent=True)
+    timer.mark("decode")
+    if not isinstance(data, (dict, list)):
+        return jsonify({
+            "error": "expected a JSON object or a JSON array of records"
+        }), 400
+
+    records = [data] if isinstance(data, dict) else data
+    checked, entries = explain_records(
+        current.compiled, current.schema, records, current.explanation_cache, current.numeric_features
+    )
+    timer.mark("explain")
+
+    results = []
+    for i, entry in enumerate(entries):
+        if entry is None:
+            result = {"error": checked.error_message(i)}
+            if "_record" not in checked.errors[i]:
+                result["fields"] = checked.errors[i]
+        else:
+            result = explanation_output(entry, classes, current.features, class_index)
+        results.append(result)
+
+    if isinstance(data, dict):
+        response = jsonify(results[0]), 400 if entries[0] is None else 200
+    else:
+        response = jsonify({
+            "count": len(results),
+            "results": [dict(index=i, **result) for i, result in enumerate(results)]
         })
+    timer.mark("encode")
+    timer.done()
+    return response
 
-    except Exception as e:
+# =====================================================
+# INPUT SCHEMA ENDPOINT
+# =====================================================
+@app.route("/schema", methods=["GET"])
+def input_schema():
+    return jsonify(served.schema.describe())
+
+# =====================================================
+# BATCH PREDICTION ENDPOINT
+# =====================================================
+@app.route("/predict/batch", methods=["POST"])
+def predict_batch():
+    current = served
+    classes = [str(c) for c in current.classes_]
+    try:
+        options = parse_output_options(request.args, len(classes))
+    except ValueError as e:
+        return jsonify({
+            "error": str(e)
+        }), 400
+
+    if request.mimetype == "application/x-ndjson":
+        results = format_results(
+            iter_predictions(current.predictor, iter_ndjson(request.stream), current.schema, BATCH_CHUNK_SIZE),
+            classes, **options
+        )
+        lines = (json.dumps(result) + "\n" for result in results)
+        if options["compact"]:
+            # Formato compacto: a ordem das classes vai uma vez, na primeira linha.
+            lines = itertools.chain([json.dumps({"classes": classes}) + "\n"], lines)
+        return Response(stream_with_context(lines), mimetype="application/x-ndjson")
+
+    timer = metrics.timer("/predict/batch")
+    data = request.get_json(silent=True)
+    timer.mark("decode")
+    if not isinstance(data, list):
+        return jsonify({
+            "error": "expected a JSON array of records or an application/x-ndjson body"
+        }), 400
+
+    results = list(format_results(
+        iter_predictions(current.predictor, data, current.schema, BATCH_CHUNK_SIZE), classes, **options
+    ))
+    timer.mark("inference")
+    body = {
+        "count": len(results),
+        "results": results
+    }
+    if options["compact"]:
+        body = {"classes": classes, **body}
+    response = jsonify(body)
+    timer.mark("encode")
+    timer.done()
+    return response
+
+# =====================================================
+# WHAT-IF SWEEP ENDPOINT
+# =====================================================
+@app.route("/predict/sweep", methods=["POST"])
+def predict_sweep():
+    current = served
+    timer = metrics.timer("/predict/sweep")
+    data = request.get_json(silent=True)
+    timer.mark("decode")
+    try:
+        record, axes = parse_sweep(data, current.schema)
+    except SweepError as e:
+        body = {"error": str(e)}
+        if e.fields:
+            body["fields"] = e.fields
+        return jsonify(body), 400
+    timer.mark("validation")
+
+    baseline, surface = sweep_probabilities(current, record, axes)
+    timer.mark("inference")
+    response = jsonify(sweep_output(record, axes, baseline, surface, current.classes_))
+    timer.mark("encode")
+    timer.done()
+    return response
+
+# =====================================================
+# DRIFT ENDPOINT
+# =====================================================
+@app.route("/drift", methods=["GET"])
+def drift_report():
+    if drift is None:
+        return jsonify({
+            "enabled": False
+        })
+    return jsonify(dict(enabled=True, **drift.report()))
+
+# =====================================================
+# CACHE STATS ENDPOINT
+# =====================================================
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    return jsonify(served.prediction_cache.stats())
+
+# =====================================================
+# SCHEDULER STATS ENDPOINT
+# =====================================================
+@app.route("/scheduler/stats", methods=["GET"])
+def scheduler_stats():
+    batcher = served.batcher
+    if batcher is None:
+        return jsonify({
+            "enabled": False
+        })
+    return jsonify(dict(enabled=True, **batcher.stats()))
+
+# =====================================================
+# PROMETHEUS METRICS ENDPOINT
+# =====================================================
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    current, candidate = served, shadow
+    gauges = {
+        "model_ready": ("1 once the model is loaded and warmed up.", int(ready)),
+        "prediction_cache_entries": ("Entries currently in the prediction cache.", current.prediction_cache.stats()["size"]),
+        "explanation_cache_entries": ("Entries currently in the explanation cache.", current.explanation_cache.stats()["size"]),
+    }
+    if candidate is not None:
+        stats = candidate.stats()
+        gauges["shadow_scored"] = ("Requests scored by the shadow model version.", stats["scored"])
+        gauges["shadow_dropped"] = ("Shadow requests dropped because the queue was full.", stats["dropped"])
+        if stats["agreement"] is not None:
+            gauges["shadow_agreement_ratio"] = ("Label agreement between active and shadow versions.", stats["agreement"])
+    body = metrics.render(gauges)
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+# =====================================================
+# MODEL ADMIN ENDPOINTS
+# =====================================================
+# Ativar ou colocar em sombra só grava no registro. Quem carrega a versão nova, com
+# warm-up e em segundo plano, é o watcher: no master do Gunicorn (que depois recicla os
+# workers) ou, com `python app.py`, a thread de `watch_models`.
+def admin_denied():
+    if not ADMIN_TOKEN:
+        return jsonify({
+            "error": "admin endpoints are disabled; set ADMIN_TOKEN"
+        }), 403
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN):
+        return jsonify({
+            "error": "invalid or missing X-Admin-Token"
+        }), 401
+    return None
+
+
+@app.route("/admin/models", methods=["GET"])
+def admin_models():
+    denied = admin_denied()
+    if denied:
+        return denied
+    current, candidate = served, shadow
+    return jsonify({
+        "active": {
+            "version": current.version,
+            "format": current.format,
+            "loaded_at": current.loaded_at
+        },
+        "registry": {
+            "versions": registry.versions(),
+            "current": registry.current()
+        },
+        "loading": loading,
+        "shadow": candidate.stats() if candidate is not None else None
+    })
+
+
+@app.route("/admin/models/activate", methods=["POST"])
+def admin_activate():
+    denied = admin_denied()
+    if denied:
+        return denied
+    version = (request.get_json(silent=True) or {}).get("version")
+    try:
+        registry.activate(version)
+    except RegistryError as e:
         return jsonify({
             "error": str(e)
         }), 400
+    return jsonify({
+        "activating": version
+    }), 202
+
+
+@app.route("/admin/models/shadow", methods=["POST"])
+def admin_shadow():
+    denied = admin_denied()
+    if denied:
+        return denied
+    data = request.get_json(silent=True) or {}
+    try:
+        if data.get("version") is None:
+            registry.clear_shadow()
+        else:
+            registry.set_shadow(data["version"], data.get("fraction", 0.1))
+    except (RegistryError, TypeError, ValueError) as e:
+        return jsonify({
+            "error": str(e)
+        }), 400
+    return jsonify({
+        "shadow": registry.shadow()
+    }), 202
 
 # =====================================================
 # DATA ENDPOINT (NOVO)
 # =====================================================
 @app.route("/data", methods=["GET"])
 def get_data():
+    # Incorpora o que outros workers ingeriram; clientes pedem só o delta com ?offset=N.
+    store.refresh()
     try:
-        return df.to_json(orient="records")
-    except Exception as e:
+        query = parse_query(request.args, dataset.columns)
+    except QueryError as e:
         return jsonify({
             "error": str(e)
         }), 400
 
+    body = dataset.respond(query)
+    if not isinstance(body, bytes):
+        body = stream_with_context(body)
+    response = Response(body, mimetype=FORMATS[query["format"]])
+    response.headers["X-Dataset-Rows"] = str(store.rows)
+    return response
+
+# =====================================================
+# INGESTION ENDPOINT
+# =====================================================
+@app.route("/ingest", methods=["POST"])
+def ingest():
+    # Desativada por padrão, como os endpoints de administração: a API é pública e o que
+    # entra aqui vai para sempre ao dataset servido pelo /data.
+    if not INGEST_TOKEN:
+        return jsonify({
+            "error": "ingestion is disabled; set INGEST_TOKEN"
+        }), 403
+    if not hmac.compare_digest(request.headers.get("X-Ingest-Token", ""), INGEST_TOKEN):
+        return jsonify({
+            "error": "invalid or missing X-Ingest-Token"
+        }), 401
+
+    if request.mimetype == "text/csv":
+        try:
+            records = parse_csv_records(request.get_data(as_text=True))
+        except Exception as e:
+            return jsonify({
+                "error": f"invalid CSV: {e}"
+            }), 400
+    else:
+        data = request.get_json(silent=True)
+        records = [data] if isinstance(data, dict) else data
+        if not isinstance(records, list):
+            return jsonify({
+                "error": "expected a JSON object, a JSON array of records or a text/csv body"
+            }), 400
+
+    result = store.ingest(records)
+    return jsonify(result), 200 if result["accepted"] else 400
 
 if __name__ == "__main__":
+    from ingest import watch_directory
+
+    watch_directory(store, INGEST_DIR)
+    watch_models()
     app.run(host="0.0.0.0", port=5000)
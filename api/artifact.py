@@ -0,0 +1,298 @@
+"""
+Artefato compacto do modelo, sem pickle, carregado por memory-map.
+
+`python artifact.py obesity_model.pkl` exporta o pipeline compilado (ver
+`inference.py`) para `obesity_model.artifact`:
+
+    magic (8 bytes) | versão (uint32) | tamanho do cabeçalho (uint32) | cabeçalho JSON
+    | arrays NumPy brutos, cada um alinhado em 64 bytes
+
+O cabeçalho guarda as features de entrada, médias e escalas do scaler (como arrays),
+vocabulários do one-hot, classes, parâmetros das árvores empacotadas (inclusive os
+valores esperados por nó usados nas explicações), a assinatura do
+`.pkl` de origem e o hash do esquema de features. Os arrays (árvores, médias, escalas)
+são abertos com `np.memmap`, sem cópia e sem importar sklearn nem unpickling, então a
+inicialização fica mais rápida e o artefato não depende da versão do sklearn.
+
+`load_artifact` recusa um artefato cujo esquema (nomes, ordem e tipo das features) não
+bata com o esperado pela API. Só pipelines compiláveis com GradientBoosting são
+exportáveis; os demais continuam sendo servidos pelo `.pkl`.
+
+Executar o módulo também compara tamanho, tempo de carga a frio e predições com o `.pkl`.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+from inference import CompiledPipeline
+from trees import PackedTrees
+
+MAGIC = b"OBMODEL\0"
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sII")
+
+TREE_ARRAYS = ("feature", "threshold", "left", "right", "value", "roots", "init_raw", "expected")
+
+
+class ArtifactError(ValueError):
+    """Artefato ilegível, de versão não suportada ou desatualizado (usa-se o .pkl)."""
+
+
+class SchemaMismatchError(ValueError):
+    """As features do artefato não são as que a API espera (o artefato é recusado)."""
+
+
+def artifact_path(model_path):
+    return os.path.splitext(model_path)[0] + ".artifact"
+
+
+def _source_signature(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+# =====================================================
+# ESQUEMA DE FEATURES
+# =====================================================
+def feature_schema(frame):
+    """Esquema [(nome, "numeric"|"categorical")] das colunas de um DataFrame."""
+    import pandas as pd
+
+    return [
+        [name, "numeric" if pd.api.types.is_numeric_dtype(frame[name]) else "categorical"]
+        for name in frame.columns
+    ]
+
+
+def schema_hash(schema):
+    canonical = json.dumps([list(item) for item in schema], separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _compiled_schema(compiled):
+    numeric = set(compiled.numeric_features)
+    return [[name, "numeric" if name in numeric else "categorical"]
+            for name in compiled.feature_names_in_]
+
+
+# =====================================================
+# EXPORTAÇÃO
+# =====================================================
+def export_artifact(compiled, path, source=None):
+    """Grava um CompiledPipeline com árvores empacotadas; retorna o tamanho em bytes."""
+    trees = compiled.estimator
+    if not isinstance(trees, PackedTrees):
+        raise TypeError("only pipelines compiled to packed trees can be exported")
+
+    arrays = {"means": compiled.means, "scales": compiled.scales}
+    arrays.update({f"trees.{name}": getattr(trees, name) for name in TREE_ARRAYS})
+
+    schema = _compiled_schema(compiled)
+    header = {
+        "format_version": FORMAT_VERSION,
+        "source": _source_signature(source) if source else None,
+        "schema": schema,
+        "schema_hash": schema_hash(schema),
+        "input_features": list(compiled.feature_names_in_),
+        "numeric_features": compiled.numeric_features,
+        "categorical_features": compiled.categorical_features,
+        "categories": [[_plain(v) for v in values] for values in compiled.categories],
+        "handle_unknown": compiled.handle_unknown,
+        "classes": [_plain(c) for c in compiled.classes_],
+        "trees": {"learning_rate": trees.learning_rate, "depth": trees.depth},
+        "arrays": {},
+    }
+
+    # Offsets relativos ao início da área de dados, que começa alinhada após o cabeçalho.
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _align(offset + array.nbytes)
+
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    data_start = _align(_PREAMBLE.size + len(header_bytes))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + header["arrays"][name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def _align(n):
+    return -(-n // ALIGNMENT) * ALIGNMENT
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+# =====================================================
+# CARREGAMENTO
+# =====================================================
+def read_header(path):
+    with open(path, "rb") as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) != _PREAMBLE.size:
+            raise ArtifactError("truncated artifact")
+        magic, version, header_size = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ArtifactError("not a model artifact")
+        if version != FORMAT_VERSION:
+            raise ArtifactError(f"unsupported artifact format version: {version}")
+        try:
+            header = json.loads(f.read(header_size).decode("utf-8"))
+        except ValueError as e:  # JSONDecodeError e UnicodeDecodeError
+            raise ArtifactError(f"unreadable artifact header: {e}") from e
+    if not isinstance(header, dict):
+        raise ArtifactError("artifact header is not a JSON object")
+    return header, _align(_PREAMBLE.size + header_size)
+
+
+def load_artifact(path, expected_schema=None, source=None):
+    """Abre o artefato por memory-map e devolve um CompiledPipeline.
+
+    `expected_schema`: esquema de `feature_schema` que a API serve; diferente do
+    artefato, levanta SchemaMismatchError. `source`: `.pkl` de origem; se ele existir e
+    tiver mudado desde a exportação, levanta ArtifactError.
+    """
+    header, data_start = read_header(path)
+
+    # Cabeçalho danificado (campo ausente ou de outro tipo) é ArtifactError, e a API cai
+    # no .pkl; só um esquema íntegro e diferente do esperado é SchemaMismatchError.
+    try:
+        if schema_hash(header["schema"]) != header["schema_hash"]:
+            raise ArtifactError("artifact schema hash does not match its schema")
+        found = {name for name, _ in header["schema"]}
+    except ArtifactError:
+        raise
+    except (KeyError, TypeError, ValueError) as e:
+        raise ArtifactError(f"invalid artifact header: {e!r}") from e
+    if expected_schema is not None and schema_hash(expected_schema) != header["schema_hash"]:
+        expected = {name for name, _ in expected_schema}
+        detail = ", ".join(
+            [f"missing {name}" for name in sorted(expected - found)] +
+            [f"unexpected {name}" for name in sorted(found - expected)]
+        ) or "feature order or types differ"
+        raise SchemaMismatchError(f"artifact feature schema does not match the API: {detail}")
+    if source and os.path.exists(source) and header.get("source") != _source_signature(source):
+        raise ArtifactError("artifact is older than the model pickle")
+
+    try:
+        return _build_pipeline(path, header, data_start)
+    except ArtifactError:
+        raise
+    except (KeyError, TypeError, ValueError, IndexError) as e:
+        raise ArtifactError(f"invalid artifact header: {e!r}") from e
+
+
+def _build_pipeline(path, header, data_start):
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        start = data_start + spec["offset"]
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        stop = start + count * dtype.itemsize
+        if stop > len(buffer):
+            raise ArtifactError(f"array {name} extends past the end of the artifact")
+        arrays[name] = buffer[start:stop].view(dtype).reshape(spec["shape"])
+
+    trees = PackedTrees(
+        arrays["trees.feature"], arrays["trees.threshold"], arrays["trees.left"],
+        arrays["trees.right"], arrays["trees.value"], arrays["trees.roots"],
+        header["classes"], header["trees"]["learning_rate"], arrays["trees.init_raw"],
+        header["trees"]["depth"], arrays["trees.expected"],
+    )
+    return CompiledPipeline(
+        header["numeric_features"], arrays["means"], arrays["scales"],
+        header["categorical_features"], header["categories"], trees,
+        handle_unknown=header["handle_unknown"], feature_names_in=header["input_features"],
+    )
+
+
+def open_model(model_path, artifact=None, expected_schema=None):
+    """Abre o modelo como a API: o artefato quando existe e corresponde ao `.pkl`,
+    senão o pickle (compilado quando possível).
+
+    Devolve (modelo, pipeline compilado ou None, "artifact"|"pickle").
+    """
+    try:
+        compiled = load_artifact(artifact or artifact_path(model_path), expected_schema, source=model_path)
+        return compiled, compiled, "artifact"
+    except (OSError, ArtifactError):
+        pass
+
+    import joblib
+
+    from inference import compile_pipeline
+
+    model = joblib.load(model_path)
+    # Caminho rápido sem pandas; pipelines fora do formato do notebook usam o sklearn direto.
+    try:
+        compiled = compile_pipeline(model)
+    except TypeError:
+        compiled = None
+    return model, compiled, "pickle"
+
+
+# =====================================================
+# EXPORTAÇÃO + COMPARAÇÃO COM O PICKLE
+# =====================================================
+def _cold_load_seconds(code):
+    import subprocess
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    script = "import time; t = time.perf_counter()\n" + code + "\nprint(time.perf_counter() - t)"
+    runs = [
+        float(subprocess.run([sys.executable, "-c", script], cwd=base_dir, check=True,
+                             capture_output=True, text=True).stdout.strip().splitlines()[-1])
+        for _ in range(3)
+    ]
+    return min(runs)
+
+
+if __name__ == "__main__":
+    import joblib
+    import pandas as pd
+
+    from inference import compile_pipeline
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    pkl_path = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else os.path.join(base_dir, "obesity_model.pkl"))
+    out_path = sys.argv[2] if len(sys.argv) > 2 else artifact_path(pkl_path)
+
+    pipeline = joblib.load(pkl_path)
+    size = export_artifact(compile_pipeline(pipeline), out_path, source=pkl_path)
+    print(f"{pkl_path} -> {out_path}")
+
+    df = pd.read_csv(os.path.join(base_dir, "obesity.csv"))
+    X_frame = df[list(pipeline.feature_names_in_)]
+    loaded = load_artifact(out_path, feature_schema(X_frame), source=pkl_path)
+    proba = loaded.predict_proba(loaded.transform_records(X_frame.to_dict("records")))
+    expected = pipeline.predict_proba(X_frame)
+    mismatches = int((loaded.classes_[proba.argmax(axis=1)] != pipeline.predict(X_frame)).sum())
+    max_diff = float(np.abs(proba - expected).max())
+
+    pkl_seconds = _cold_load_seconds(f"import joblib; joblib.load({pkl_path!r})")
+    artifact_seconds = _cold_load_seconds(f"import artifact; artifact.load_artifact({os.path.abspath(out_path)!r})")
+
+    print(f"tamanho: pkl {os.path.getsize(pkl_path) / 1024:.1f} KB, artefato {size / 1024:.1f} KB")
+    print(f"carga a frio (processo novo, com imports): pkl {pkl_seconds * 1000:.0f} ms, "
+          f"artefato {artifact_seconds * 1000:.0f} ms")
+    print(f"paridade: {mismatches} rótulos diferentes, max |Δproba| = {max_diff:.2e}")
+    if mismatches or max_diff > 1e-9:
+        raise SystemExit("artifact predictions diverge from the pickle")
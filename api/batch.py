@@ -0,0 +1,174 @@
+"""
+Predição em lote para a API de obesidade.
+
+Os registros chegam como um array JSON ou como NDJSON (um objeto por linha) e são
+avaliados em blocos de tamanho limitado: cada bloco é validado coluna a coluna pelo
+esquema de entrada (`schema.py`) e as linhas válidas viram uma única matriz de features e
+uma única chamada vetorizada a `predict_proba` (árvores empacotadas quando o pipeline
+compilado está disponível, DataFrame + pipeline sklearn caso contrário). Rótulo,
+probabilidades e top-k saem dessa mesma matriz. Erros são reportados por linha, sem
+derrubar o lote.
+
+Formatos de saída por linha:
+- completo: `{"index", "prediction", "probabilities": {classe: p}, "top_k"?}`;
+- compacto (clientes em massa): `{"index", "label": i, "probabilities": [p, ...], "top_k"?}`,
+  com a ordem das classes enviada uma única vez pelo endpoint.
+"""
+
+import json
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 1000
+COMPACT_DECIMALS = 4
+
+
+# =====================================================
+# LEITURA DOS REGISTROS
+# =====================================================
+def iter_ndjson(stream):
+    """Lê um corpo NDJSON linha a linha, sem carregar o corpo inteiro em memória."""
+    for raw in stream:
+        line = raw.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"invalid JSON line: {e}")
+
+
+# =====================================================
+# INFERÊNCIA EM BLOCOS
+# =====================================================
+def predict_chunk(model, records, schema, start=0):
+    """Probabilidades de um bloco de registros, preservando a ordem de entrada.
+
+    O bloco é validado coluna a coluna pelo `schema` (ver schema.py) e só as linhas
+    válidas chegam ao modelo. Cada resultado é `{"index", "proba": linha de
+    predict_proba}` ou `{"index", "error", "fields"?}`.
+    """
+    checked = schema.validate(records)
+    results = [None] * len(records)
+    for i, fields in checked.errors.items():
+        results[i] = {"index": start + i, "error": checked.error_message(i)}
+        if "_record" not in fields:
+            results[i]["fields"] = fields
+
+    valid_rows, probas = predict_validated(model, checked, schema)
+    for i, proba in zip(valid_rows, probas):
+        if isinstance(proba, Exception):
+            results[i] = {"index": start + i, "error": str(proba)}
+        else:
+            results[i] = {"index": start + i, "proba": proba}
+    return results
+
+
+def predict_validated(model, checked, schema):
+    """(linhas válidas, probabilidades) de um lote já validado, numa chamada vetorizada.
+
+    Com o pipeline sklearn, se a chamada vetorizada falhar, a linha culpada vira uma
+    exceção no lugar da sua linha de probabilidades.
+    """
+    valid_rows = np.flatnonzero(checked.valid).tolist()
+    if not valid_rows:
+        return valid_rows, []
+
+    columns = checked.valid_columns()
+    if hasattr(model, "transform_columns"):
+        return valid_rows, model.predict_proba(model.transform_columns(columns, len(valid_rows)))
+
+    frame = pd.DataFrame(columns, columns=schema.features)
+    try:
+        probas = model.predict_proba(frame)
+    except Exception:
+        # Um valor que o pipeline rejeita derruba a chamada vetorizada; isola a linha culpada.
+        probas = [_predict_one(model, frame.iloc[[j]]) for j in range(len(frame))]
+    return valid_rows, probas
+
+
+def _predict_one(model, row):
+    try:
+        return model.predict_proba(row)[0]
+    except Exception as e:
+        return e
+
+
+def iter_predictions(model, records, schema, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Gera os resultados bloco a bloco a partir de qualquer iterável de registros."""
+    records = iter(records)
+    start = 0
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield from predict_chunk(model, chunk, schema, start)
+        start += len(chunk)
+
+
+# =====================================================
+# FORMATAÇÃO DA SAÍDA
+# =====================================================
+def parse_output_options(args, n_classes):
+    """Lê `top_k`, `format` (full|compact) e `decimals` da query string; ValueError se inválidos."""
+    options = {"compact": False, "top_k": None, "decimals": COMPACT_DECIMALS}
+
+    fmt = args.get("format", "full")
+    if fmt not in ("full", "compact"):
+        raise ValueError("format must be one of: full, compact")
+    options["compact"] = fmt == "compact"
+
+    for name, low, high in (("top_k", 1, n_classes), ("decimals", 0, 17)):
+        raw = args.get(name)
+        if raw in (None, ""):
+            continue
+        try:
+            value = int(raw)
+        except ValueError:
+            raise ValueError(f"{name} must be an integer")
+        if not low <= value <= high:
+            raise ValueError(f"{name} must be between {low} and {high}")
+        options[name] = value
+    return options
+
+
+def top_k_indices(proba, k):
+    """Índices das k classes mais prováveis, da maior para a menor probabilidade."""
+    return np.argsort(-proba, kind="stable")[:k]
+
+
+def full_output(proba, classes, top_k=None):
+    """Rótulo, probabilidade por classe e (opcional) top-k de uma linha de predict_proba."""
+    output = {
+        "prediction": classes[int(np.argmax(proba))],
+        "probabilities": {str(c): float(p) for c, p in zip(classes, proba)},
+    }
+    if top_k:
+        output["top_k"] = [
+            {"class": classes[j], "probability": float(proba[j])} for j in top_k_indices(proba, top_k)
+        ]
+    return output
+
+
+def compact_output(proba, top_k=None, decimals=COMPACT_DECIMALS):
+    """Versão compacta: índice da classe e probabilidades na ordem de `classes`."""
+    output = {
+        "label": int(np.argmax(proba)),
+        "probabilities": np.round(proba, decimals).tolist(),
+    }
+    if top_k:
+        output["top_k"] = top_k_indices(proba, top_k).tolist()
+    return output
+
+
+def format_results(results, classes, compact=False, top_k=None, decimals=COMPACT_DECIMALS):
+    """Converte os resultados de `iter_predictions` para o formato de resposta."""
+    for result in results:
+        if "error" in result:
+            yield result
+        elif compact:
+            yield dict(index=result["index"], **compact_output(result["proba"], top_k, decimals))
+        else:
+            yield dict(index=result["index"], **full_output(result["proba"], classes, top_k))
@@ -0,0 +1,130 @@
+"""
+Cache de predições em memória (LRU com TTL).
+
+O formulário do Streamlit restringe as entradas a sliders e selectboxes, então a API
+recebe muitos registros idênticos. A chave do cache é a tupla canônica dos 16 campos
+de entrada após normalização de tipos (numéricos viram float, então `Age` 30 e 30.0
+caem na mesma entrada; categóricos viram str). O cache se invalida sozinho quando o
+arquivo do modelo muda (mtime/tamanho) e mantém contadores de acertos, faltas e
+remoções.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAXSIZE = 4096
+DEFAULT_TTL = 3600.0
+
+# Intervalo mínimo entre verificações do arquivo do modelo, para não fazer stat a cada hit.
+MODEL_CHECK_INTERVAL = 1.0
+
+
+def canonical_key(record, features, numeric_features):
+    """Chave canônica do registro, ou None quando ele não pode ser normalizado."""
+    try:
+        return tuple(
+            float(record[name]) if name in numeric_features else str(record[name])
+            for name in features
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class PredictionCache:
+    """LRU limitado por tamanho e por tempo de vida, atrelado ao arquivo do modelo."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL, model_path=None):
+        self.maxsize = int(maxsize)
+        self.ttl = float(ttl)
+        self.model_path = model_path
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_signature = _file_signature(model_path) if model_path else None
+        self._next_model_check = time.monotonic() + MODEL_CHECK_INTERVAL
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    def _check_model(self, now):
+        if self.model_path is None or now < self._next_model_check:
+            return
+        self._next_model_check = now + MODEL_CHECK_INTERVAL
+        signature = _file_signature(self.model_path)
+        if signature != self._model_signature:
+            self._model_signature = signature
+            self._entries.clear()
+            self.invalidations += 1
+
+    def get(self, key):
+        """Valor em cache para a chave, ou None."""
+        if key is None or not self.enabled:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            self._check_model(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if key is None or not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
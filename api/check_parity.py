@@ -0,0 +1,90 @@
+"""
+Verificação de paridade dos caminhos rápidos com o pipeline sklearn original.
+
+    python check_parity.py [--model obesity_model.pkl] [--data obesity.csv] [--artifact obesity_model.artifact]
+
+Compara, sobre o `obesity.csv` inteiro, rótulos e probabilidades de:
+
+- o pipeline compilado (`inference.py`), contra `pipeline.predict_proba`;
+- as árvores empacotadas (`trees.py`), contra o GradientBoosting sobre a mesma matriz
+  pré-processada;
+- o artefato recarregado por memory-map (`artifact.py`): o de `--artifact` quando existe
+  (o da imagem Docker), senão um exportado agora num diretório temporário.
+
+Sai com erro se algum rótulo divergir ou se |Δproba| passar de `TOLERANCE`. Roda no
+build da imagem da API, logo depois da exportação do artefato.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import inference
+import trees
+from artifact import artifact_path, export_artifact, feature_schema, load_artifact
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(BASE_DIR, "obesity_model.pkl")
+DATA_PATH = os.path.join(BASE_DIR, "obesity.csv")
+
+TOLERANCE = 1e-9
+
+
+def run_checks(model_path, data_path, artifact=None):
+    """Relatório de paridade de cada caminho: {nome: {"rows", "label_mismatches", ...}}."""
+    pipeline = joblib.load(model_path)
+    df = pd.read_csv(data_path)
+    compiled = inference.compile_pipeline(pipeline)
+    if not isinstance(compiled.estimator, trees.PackedTrees):
+        raise SystemExit("the model is not a GradientBoosting pipeline; nothing to check")
+
+    reports = {"pipeline compilado": inference.check_parity(pipeline, compiled, df)}
+
+    preprocessor, estimator = pipeline.steps[0][1], pipeline.steps[-1][1]
+    X = np.asarray(preprocessor.transform(df[list(pipeline.feature_names_in_)]))
+    reports["árvores empacotadas"] = trees.check_parity(estimator, compiled.estimator, X)
+
+    expected_schema = feature_schema(df[list(pipeline.feature_names_in_)])
+    if artifact is not None and os.path.exists(artifact):
+        loaded = load_artifact(artifact, expected_schema, source=model_path)
+        reports["artefato"] = inference.check_parity(pipeline, loaded, df)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.artifact")
+            export_artifact(compiled, path, source=model_path)
+            loaded = load_artifact(path, expected_schema, source=model_path)
+            reports["artefato"] = inference.check_parity(pipeline, loaded, df)
+            del loaded  # fecha o memory-map antes de apagar o diretório
+    return reports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Paridade dos caminhos rápidos com o pipeline sklearn.")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--artifact", default=None,
+                        help="artefato a verificar (padrão: o ao lado do modelo, se existir)")
+    args = parser.parse_args(argv)
+
+    reports = run_checks(args.model, args.data, args.artifact or artifact_path(args.model))
+    failed = []
+    for name, report in reports.items():
+        ok = not report["label_mismatches"] and report["max_proba_diff"] <= TOLERANCE
+        print(f"{'ok' if ok else 'FALHOU'} {name}: {report['rows']} linhas, "
+              f"{report['label_mismatches']} rótulos diferentes, "
+              f"max |Δproba| = {report['max_proba_diff']:.2e}")
+        if not ok:
+            failed.append(name)
+    if failed:
+        print(f"paridade quebrada: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+Consulta e serialização do dataset para o endpoint `/data`.
+
+Em vez de montar o JSON inteiro do dataset a cada requisição, `/data` aceita paginação
+(`offset`/`limit`), projeção de colunas (`columns`), os mesmos filtros do painel
+(`age_min`/`age_max`, `gender`, `obesity`) e devolve a resposta em blocos, em JSON,
+NDJSON ou CSV. Páginas pequenas sem filtro são serializadas uma única vez e
+reaproveitadas; pedidos sem `limit` (ou com `limit` acima de `PAGE_CACHE_MAX_ROWS`)
+são sempre transmitidos em blocos, sem guardar a resposta na memória.
+"""
+
+import threading
+from collections import OrderedDict
+
+FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+DEFAULT_STREAM_CHUNK = 500
+PAGE_CACHE_SIZE = 64
+# Só páginas de até PAGE_CACHE_MAX_ROWS linhas entram no cache, que guarda no máximo
+# PAGE_CACHE_MAX_BYTES por worker.
+PAGE_CACHE_MAX_ROWS = 1000
+PAGE_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+
+class QueryError(ValueError):
+    """Parâmetro de consulta inválido (vira HTTP 400)."""
+
+
+# =====================================================
+# PARÂMETROS DA CONSULTA
+# =====================================================
+def _int_arg(args, name, default=None, minimum=0):
+    raw = args.get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise QueryError(f"{name} must be an integer")
+    if value < minimum:
+        raise QueryError(f"{name} must be >= {minimum}")
+    return value
+
+
+def _float_arg(args, name):
+    raw = args.get(name)
+    if raw in (None, ""):
+        return None
+    try:
+        return float(raw)
+    except ValueError:
+        raise QueryError(f"{name} must be a number")
+
+
+def _list_arg(args, name):
+    values = []
+    for raw in args.getlist(name):
+        values.extend(v.strip() for v in raw.split(",") if v.strip())
+    return tuple(values)
+
+
+def parse_query(args, columns):
+    """Lê os parâmetros de `/data` de um MultiDict (request.args)."""
+    fmt = args.get("format", "json")
+    if fmt not in FORMATS:
+        raise QueryError(f"format must be one of: {', '.join(FORMATS)}")
+
+    selected = _list_arg(args, "columns")
+    unknown = [c for c in selected if c not in columns]
+    if unknown:
+        raise QueryError(f"unknown columns: {', '.join(unknown)}")
+
+    gender = args.get("gender")
+    return {
+        "format": fmt,
+        "offset": _int_arg(args, "offset", 0),
+        "limit": _int_arg(args, "limit"),
+        "columns": selected or None,
+        "age_min": _float_arg(args, "age_min"),
+        "age_max": _float_arg(args, "age_max"),
+        "gender": None if gender in (None, "", "Todos") else gender,
+        "obesity": _list_arg(args, "obesity") or None,
+    }
+
+
+def is_unfiltered(query):
+    return all(query[k] is None for k in ("age_min", "age_max", "gender", "obesity"))
+
+
+# =====================================================
+# FILTRO + SERIALIZAÇÃO EM BLOCOS
+# =====================================================
+def select(df, query):
+    """Aplica filtros, paginação e projeção (sem copiar quando não há filtro)."""
+    mask = None
+    if query["age_min"] is not None:
+        mask = df["Age"] >= query["age_min"]
+    if query["age_max"] is not None:
+        cond = df["Age"] <= query["age_max"]
+        mask = cond if mask is None else mask & cond
+    if query["gender"] is not None:
+        cond = df["Gender"] == query["gender"]
+        mask = cond if mask is None else mask & cond
+    if query["obesity"] is not None:
+        cond = df["Obesity"].isin(query["obesity"])
+        mask = cond if mask is None else mask & cond
+
+    frame = df if mask is None else df[mask]
+    stop = None if query["limit"] is None else query["offset"] + query["limit"]
+    frame = frame.iloc[query["offset"]:stop]
+    if query["columns"] is not None:
+        frame = frame[list(query["columns"])]
+    return frame
+
+
+def iter_serialized(frame, fmt, chunk_size=DEFAULT_STREAM_CHUNK):
+    """Serializa o frame em blocos de texto, sem materializar a resposta inteira."""
+    if fmt == "json":
+        yield "["
+    for start in range(0, max(len(frame), 1), chunk_size):
+        chunk = frame.iloc[start:start + chunk_size]
+        if fmt == "csv":
+            yield chunk.to_csv(index=False, header=start == 0)
+        elif len(chunk) == 0:
+            continue
+        elif fmt == "ndjson":
+            text = chunk.to_json(orient="records", lines=True)
+            yield text if text.endswith("\n") else text + "\n"
+        else:
+            prefix = "," if start else ""
+            yield prefix + chunk.to_json(orient="records")[1:-1]
+    if fmt == "json":
+        yield "]"
+
+
+class PageCache:
+    """LRU de páginas serializadas, limitado em número de entradas e em bytes."""
+
+    def __init__(self, maxsize=PAGE_CACHE_SIZE, max_bytes=PAGE_CACHE_MAX_BYTES):
+        self.maxsize = int(maxsize)
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= len(previous)
+            self._entries[key] = body
+            self.bytes += len(body)
+            while len(self._entries) > self.maxsize or self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def info(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+
+class DatasetView:
+    """Dataset em memória + cache das páginas pequenas sem filtro já serializadas."""
+
+    def __init__(self, df):
+        self.df = df
+        self.columns = list(df.columns)
+        # Versão do dataset na chave: uma página serializada durante um `update` não
+        # volta a ser servida depois dele.
+        self._version = 0
+        self._pages = PageCache()
+
+    def update(self, df):
+        """Troca o dataset (ex.: após ingestão) e descarta as páginas serializadas."""
+        self.df = df
+        self.columns = list(df.columns)
+        self._version += 1
+        self._pages.clear()
+
+    def respond(self, query):
+        """Corpo da resposta: bytes prontos (página em cache) ou um gerador de blocos."""
+        version, df = self._version, self.df
+        limit = query["limit"]
+        if not is_unfiltered(query) or limit is None or limit > PAGE_CACHE_MAX_ROWS:
+            return iter_serialized(select(df, query), query["format"])
+
+        key = (version, query["format"], query["offset"], limit, query["columns"])
+        body = self._pages.get(key)
+        if body is None:
+            body = "".join(iter_serialized(select(df, query), query["format"])).encode("utf-8")
+            self._pages.put(key, body)
+        return body
+
+    def cache_info(self):
+        return self._pages.info()
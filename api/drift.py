@@ -0,0 +1,358 @@
+"""
+Monitoramento de drift e de qualidade dos dados do `/predict`, em streaming.
+
+Perfil de referência (calculado uma vez do `obesity.csv`):
+- numéricos: cortes nos decis do dataset (bins com as pontas abertas) e a fração de
+  linhas em cada bin, além do mínimo e do máximo observados;
+- categóricos: a fração de cada categoria;
+- classe prevista: a distribuição do alvo (`Obesity`) no dataset.
+
+No caminho da requisição, `observe` só anexa (instante, registro, probabilidades) a uma
+fila limitada, sem lock nem NumPy. Uma thread por processo esvazia a fila a cada
+`flush_interval` segundos e soma as contagens em slots de tempo fixos (um anel de
+`ceil(maior janela / slot_seconds)` vetores de contagem), então a memória é constante,
+independente do tráfego. Cada janela deslizante é a soma dos slots mais recentes, e o
+drift de cada campo é o PSI (Population Stability Index) entre a distribuição da janela
+e a de referência:
+
+    PSI = Σ (atual - referência) * ln(atual / referência)
+
+Até 0,1 é estável, até 0,25 é moderado, acima disso é significativo. Qualidade dos dados:
+requisições rejeitadas pela validação (por campo) e a fração de valores numéricos fora da
+faixa vista no dataset (aceitos pelo esquema, mas sem exemplos no treino).
+
+Com Gunicorn cada worker mantém e expõe as próprias janelas, como em metrics.py.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from workers import ProcessThread
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BINS = 10
+DEFAULT_SLOT_SECONDS = 60
+DEFAULT_WINDOWS = (300, 3600)
+DEFAULT_BUFFER_SIZE = 8192
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_MIN_SAMPLES = 100
+
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+# Piso das proporções no PSI: bins vazios não levam o índice ao infinito.
+_EPSILON = 1e-4
+
+_RECORD = "_record"
+
+
+def psi(expected, actual):
+    """PSI entre duas distribuições (proporções) sobre os mesmos bins."""
+    expected = np.maximum(np.asarray(expected, dtype=float), _EPSILON)
+    actual = np.maximum(np.asarray(actual, dtype=float), _EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def psi_status(value):
+    if value < PSI_MODERATE:
+        return "stable"
+    if value < PSI_SIGNIFICANT:
+        return "moderate"
+    return "significant"
+
+
+# =====================================================
+# PERFIL DE REFERÊNCIA
+# =====================================================
+class ReferenceProfile:
+    """Bins e distribuições de referência, num vetor de contagens com blocos por campo.
+
+    Layout do vetor: um bloco por campo (bins ou categorias), o bloco das classes, um
+    contador de fora-da-faixa por campo numérico e um contador de rejeição por campo
+    (mais um para registros inválidos como um todo).
+    """
+
+    def __init__(self, rows, edges, ranges, categories, classes, expected, class_expected):
+        self.rows = rows
+        self.bins = max((len(cuts) + 1 for cuts in edges.values()), default=0)
+        self.edges = {name: np.asarray(values, dtype=float) for name, values in edges.items()}
+        self.ranges = dict(ranges)
+        self.categories = {name: list(values) for name, values in categories.items()}
+        self.classes = list(classes)
+        self.expected = {name: np.asarray(values, dtype=float) for name, values in expected.items()}
+        self.class_expected = np.asarray(class_expected, dtype=float)
+        self.features = list(expected)
+
+        offset = 0
+        self.blocks = {}
+        for name in self.features:
+            size = len(self.edges[name]) + 1 if name in self.edges else len(self.categories[name])
+            self.blocks[name] = (offset, offset + size)
+            offset += size
+        self.class_block = (offset, offset + len(self.classes))
+        offset += len(self.classes)
+        self.out_of_range = {}
+        for name in self.edges:
+            self.out_of_range[name] = offset
+            offset += 1
+        self.rejected = {}
+        for name in self.features + [_RECORD]:
+            self.rejected[name] = offset
+            offset += 1
+        self.size = offset
+
+        self._category_index = {
+            name: {value: start + i for i, value in enumerate(self.categories[name])}
+            for name, (start, _) in self.blocks.items() if name in self.categories
+        }
+        self._class_index = {value: self.class_block[0] + i for i, value in enumerate(self.classes)}
+
+    @classmethod
+    def from_frame(cls, frame, features, target, bins=DEFAULT_BINS):
+        """Perfil do dataset: decis nas numéricas, frequências nas categóricas e no alvo."""
+        quantiles = np.linspace(0, 1, bins + 1)[1:-1]
+        edges, ranges, categories, expected = {}, {}, {}, {}
+        for name in features:
+            column = frame[name].dropna()
+            if pd.api.types.is_numeric_dtype(column):
+                values = column.to_numpy(dtype=float)
+                cuts = np.unique(np.quantile(values, quantiles))
+                edges[name] = cuts
+                ranges[name] = (float(values.min()), float(values.max()))
+                counts = np.bincount(np.searchsorted(cuts, values, side="right"), minlength=len(cuts) + 1)
+            else:
+                shares = column.astype(str).value_counts()
+                categories[name] = sorted(shares.index)
+                counts = shares.reindex(categories[name]).to_numpy()
+            expected[name] = counts / counts.sum()
+
+        labels = frame[target].astype(str).value_counts()
+        classes = sorted(labels.index)
+        class_expected = labels.reindex(classes).to_numpy() / labels.sum()
+        return cls(len(frame), edges, ranges, categories, classes, expected, class_expected)
+
+    def bin_labels(self, name):
+        if name in self.categories:
+            return list(self.categories[name])
+        cuts = [f"{c:g}" for c in self.edges[name]]
+        if not cuts:
+            return ["all"]
+        return [f"< {cuts[0]}"] + [f"{a} – {b}" for a, b in zip(cuts, cuts[1:])] + [f">= {cuts[-1]}"]
+
+    # =====================================================
+    # CONTAGEM
+    # =====================================================
+    def count(self, records, labels, rejected):
+        """Vetor de contagens de um lote: registros aceitos (e suas classes previstas) e
+        listas de campos das requisições rejeitadas."""
+        indices = []
+        if records:
+            for name in self.features:
+                if name in self.edges:
+                    values = np.fromiter((r[name] for r in records), dtype=float, count=len(records))
+                    indices.append(self.blocks[name][0] + np.searchsorted(self.edges[name], values, side="right"))
+                    low, high = self.ranges[name]
+                    outside = int(np.count_nonzero((values < low) | (values > high)))
+                    if outside:
+                        indices.append(np.full(outside, self.out_of_range[name]))
+                else:
+                    lookup = self._category_index[name]
+                    indices.append(np.fromiter(
+                        (i for i in map(lookup.get, (str(r[name]) for r in records)) if i is not None), dtype=np.int64
+                    ))
+            indices.append(np.fromiter(
+                (i for i in map(self._class_index.get, labels) if i is not None), dtype=np.int64
+            ))
+        for fields in rejected:
+            indices.append(np.fromiter(
+                (self.rejected.get(name, self.rejected[_RECORD]) for name in fields), dtype=np.int64
+            ))
+        if not indices:
+            return None
+        return np.bincount(np.concatenate(indices), minlength=self.size)
+
+
+# =====================================================
+# MONITOR EM JANELAS DESLIZANTES
+# =====================================================
+class DriftMonitor:
+    """Contagens em slots de tempo + comparação das janelas com o perfil de referência."""
+
+    def __init__(self, profile, slot_seconds=DEFAULT_SLOT_SECONDS, windows=DEFAULT_WINDOWS,
+                 buffer_size=DEFAULT_BUFFER_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 min_samples=DEFAULT_MIN_SAMPLES):
+        self.profile = profile
+        self.slot_seconds = float(slot_seconds)
+        self.windows = sorted(int(w) for w in windows)
+        self.flush_interval = flush_interval
+        self.min_samples = min_samples
+
+        n_slots = max(math.ceil(self.windows[-1] / self.slot_seconds), 1)
+        self._counts = np.zeros((n_slots, profile.size), dtype=np.int64)
+        self._slot_ids = np.full(n_slots, -1, dtype=np.int64)
+        self._samples = np.zeros(n_slots, dtype=np.int64)
+        self._rejections = np.zeros(n_slots, dtype=np.int64)
+        self._pending = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+        self._worker = ProcessThread("drift-monitor")
+
+    # =====================================================
+    # CAMINHO DA REQUISIÇÃO
+    # =====================================================
+    def observe(self, record, classes, proba):
+        """Registra uma predição; só um append numa deque (a contagem é feita depois)."""
+        pending = self._pending
+        if len(pending) == pending.maxlen:
+            self.dropped += 1
+        pending.append((time.time(), record, classes, proba))
+        self._worker.ensure(self._run)
+
+    def observe_rejected(self, fields):
+        """Registra uma requisição rejeitada pela validação (campos com erro)."""
+        self._pending.append((time.time(), None, fields, None))
+        self._worker.ensure(self._run)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            # Uma falha num lote não pode parar a thread: sem ela, a fila só enche.
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("drift flush failed")
+
+    # =====================================================
+    # AGREGAÇÃO
+    # =====================================================
+    def flush(self):
+        """Esvazia a fila e soma as contagens nos slots de cada instante."""
+        items = []
+        pending = self._pending
+        while True:
+            try:
+                items.append(pending.popleft())
+            except IndexError:
+                break
+        if not items:
+            return
+
+        by_slot = {}
+        for when, record, extra, proba in items:
+            by_slot.setdefault(int(when // self.slot_seconds), []).append((record, extra, proba))
+
+        with self._lock:
+            for slot_id, group in by_slot.items():
+                records, labels, rejected = [], [], []
+                for record, extra, proba in group:
+                    if record is None:
+                        rejected.append(extra)
+                    else:
+                        records.append(record)
+                        labels.append(str(extra[int(np.argmax(proba))]))
+                counts = self.profile.count(records, labels, rejected)
+                row = self._slot_row(slot_id)
+                if counts is None or row is None:
+                    continue
+                self._counts[row] += counts
+                self._samples[row] += len(records)
+                self._rejections[row] += len(rejected)
+
+    def _slot_row(self, slot_id):
+        row = slot_id % len(self._slot_ids)
+        if self._slot_ids[row] > slot_id:
+            return None  # chegou depois de o slot ser reciclado
+        if self._slot_ids[row] != slot_id:
+            self._slot_ids[row] = slot_id
+            self._counts[row] = 0
+            self._samples[row] = 0
+            self._rejections[row] = 0
+        return row
+
+    # =====================================================
+    # RELATÓRIO
+    # =====================================================
+    def report(self, now=None):
+        """Drift e qualidade dos dados de cada janela, prontos para JSON."""
+        self.flush()
+        current = int((time.time() if now is None else now) // self.slot_seconds)
+        with self._lock:
+            totals = []
+            for window in self.windows:
+                n = max(math.ceil(window / self.slot_seconds), 1)
+                mask = (self._slot_ids > current - n) & (self._slot_ids <= current)
+                totals.append((
+                    window, self._counts[mask].sum(axis=0),
+                    int(self._samples[mask].sum()), int(self._rejections[mask].sum())
+                ))
+        return {
+            "reference": {
+                "rows": self.profile.rows,
+                "bins": self.profile.bins,
+            },
+            "thresholds": {
+                "moderate": PSI_MODERATE,
+                "significant": PSI_SIGNIFICANT,
+                "min_samples": self.min_samples,
+            },
+            "slot_seconds": self.slot_seconds,
+            "dropped": self.dropped,
+            "windows": [self._window_report(*item) for item in totals],
+        }
+
+    def _distribution(self, counts, expected, labels):
+        total = counts.sum()
+        actual = counts / total if total else np.zeros(len(counts))
+        value = psi(expected, actual)
+        return {
+            "psi": round(value, 4),
+            "status": psi_status(value),
+            "bins": labels,
+            "expected": np.round(expected, 4).tolist(),
+            "actual": np.round(actual, 4).tolist(),
+        }
+
+    def _window_report(self, window, counts, samples, rejections):
+        profile = self.profile
+        enough = samples >= self.min_samples
+        features = {}
+        for name in profile.features:
+            start, stop = profile.blocks[name]
+            entry = self._distribution(counts[start:stop], profile.expected[name], profile.bin_labels(name))
+            entry["type"] = "number" if name in profile.edges else "category"
+            if name in profile.out_of_range:
+                entry["out_of_range"] = round(counts[profile.out_of_range[name]] / samples, 4) if samples else 0.0
+            if not enough:
+                entry["status"] = "insufficient_data"
+            features[name] = entry
+
+        start, stop = profile.class_block
+        prediction = self._distribution(counts[start:stop], profile.class_expected, profile.classes)
+        if not enough:
+            prediction["status"] = "insufficient_data"
+
+        drifted = sorted(
+            (name for name, entry in features.items() if entry["status"] in ("moderate", "significant")),
+            key=lambda name: -features[name]["psi"]
+        )
+        total = samples + rejections
+        return {
+            "window_seconds": window,
+            "samples": samples,
+            "rejected": rejections,
+            "rejected_rate": round(rejections / total, 4) if total else 0.0,
+            "rejected_fields": {
+                name: int(counts[i]) for name, i in profile.rejected.items() if counts[i]
+            },
+            "drifted_features": drifted,
+            "prediction": prediction,
+            "features": features,
+        }
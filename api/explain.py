@@ -0,0 +1,95 @@
+"""
+Explicações das predições para o endpoint `/explain`.
+
+As atribuições vêm das árvores empacotadas do GradientBoosting
+(`PackedTrees.contributions`): para cada um dos 16 campos de entrada, quanto ele moveu o
+score bruto (log-odds da softmax) da classe explicada em relação ao valor base do modelo,
+somando os nós em que o campo decidiu o caminho em cada árvore. As colunas do one-hot
+são somadas no campo de origem, e valor base + soma das contribuições = score da classe.
+
+Um lote é validado pelo esquema de entrada, as linhas já vistas saem do cache (mesma
+chave canônica do `/predict`) e as demais são explicadas numa única passada vetorizada.
+"""
+
+import numpy as np
+
+from cache import canonical_key
+
+
+def supports_explanations(compiled):
+    """True quando o modelo servido é o GradientBoosting em árvores empacotadas."""
+    return compiled is not None and getattr(compiled.estimator, "expected", None) is not None
+
+
+def parse_explain_class(args, classes):
+    """Índice da classe pedida em `?class=`, ou None (classe prevista); ValueError se desconhecida."""
+    name = args.get("class")
+    if name in (None, ""):
+        return None
+    names = [str(c) for c in classes]
+    if name not in names:
+        raise ValueError(f"class must be one of: {', '.join(names)}")
+    return names.index(name)
+
+
+# =====================================================
+# ATRIBUIÇÕES EM LOTE (COM CACHE)
+# =====================================================
+def explain_records(compiled, schema, records, cache, numeric_features):
+    """Valida e explica um lote; devolve (ValidationResult, entradas por linha).
+
+    Cada entrada é (probabilidades, bias, contribuições (saídas x campos)) ou None para
+    linhas inválidas.
+    """
+    checked = schema.validate(records)
+    entries = [None] * len(records)
+    keys = {}
+    pending = []
+    for i in np.flatnonzero(checked.valid).tolist():
+        key = canonical_key(checked.record(i), schema.features, numeric_features)
+        entry = cache.get(key)
+        if entry is None:
+            keys[i] = key
+            pending.append(i)
+        else:
+            entries[i] = entry
+
+    if pending:
+        columns = {name: values[pending] for name, values in checked.columns.items()}
+        X = compiled.transform_columns(columns, len(pending))
+        probas = compiled.predict_proba(X)
+        bias, contrib = compiled.explain(X)
+        for j, i in enumerate(pending):
+            entries[i] = (probas[j], bias, contrib[j])
+            cache.put(keys[i], entries[i])
+    return checked, entries
+
+
+# =====================================================
+# FORMATAÇÃO DA SAÍDA
+# =====================================================
+def class_attributions(bias, contrib, class_index):
+    """(valor base, contribuições por campo) de uma classe, para uma linha."""
+    if len(bias) == 1:
+        # Binário: o score é o log-odds da classe positiva; a negativa é o oposto.
+        sign = 1.0 if class_index == 1 else -1.0
+        return sign * bias[0], sign * contrib[0]
+    return bias[class_index], contrib[class_index]
+
+
+def explanation_output(entry, classes, fields, class_index=None):
+    """Resposta de uma linha: classe prevista, probabilidades e contribuições ordenadas
+    pelo módulo (maior impacto primeiro)."""
+    proba, bias, contrib = entry
+    predicted = int(np.argmax(proba))
+    k = predicted if class_index is None else class_index
+    base, values = class_attributions(bias, contrib, k)
+    order = np.argsort(-np.abs(values), kind="stable")
+    return {
+        "prediction": str(classes[predicted]),
+        "probabilities": {str(c): float(p) for c, p in zip(classes, proba)},
+        "explained_class": str(classes[k]),
+        "base_value": float(base),
+        "score": float(base + values.sum()),
+        "contributions": [{"feature": fields[j], "value": float(values[j])} for j in order],
+    }
@@ -0,0 +1,60 @@
+"""
+Configuração do Gunicorn para produção.
+
+O app é importado no processo master (`preload_app`), então modelo e dataset são
+carregados uma única vez e compartilhados copy-on-write com os workers forkados.
+Uma thread no master observa o registro de modelos (`CURRENT`/`SHADOW`, ver registry.py)
+e o `.pkl` da versão ativa: quando algo muda, a versão nova é carregada no master (com
+warm-up; os workers seguem atendendo com a antiga) e um SIGHUP faz o Gunicorn subir
+novos workers a partir dela, encerrando os antigos de forma graciosa, depois que as
+requisições em andamento terminam. Se a carga falhar, nada muda.
+
+Variáveis de ambiente: PORT, WEB_CONCURRENCY (workers), GUNICORN_THREADS,
+GUNICORN_TIMEOUT, MODEL_WATCH_INTERVAL (segundos; 0 desativa o watcher).
+"""
+
+import os
+import signal
+import threading
+import time
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = "gthread"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+accesslog = "-"
+
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "5"))
+
+
+def _watch_model(server):
+    import app as api
+
+    state = api.model_state()
+    while True:
+        time.sleep(MODEL_WATCH_INTERVAL)
+        current = api.model_state()
+        if current == state:
+            continue
+        try:
+            api.reload_models()
+        except Exception as e:
+            server.log.error("model reload failed, keeping current model: %s", e)
+            state = current
+            continue
+        # A assinatura inclui o arquivo da versão ativa, que acabou de mudar.
+        state = api.model_state()
+        server.log.info("model %s loaded, reloading workers", api.served.version)
+        os.kill(os.getpid(), signal.SIGHUP)
+
+
+def when_ready(server):
+    import app as api
+    from ingest import watch_directory
+
+    if MODEL_WATCH_INTERVAL > 0:
+        threading.Thread(target=_watch_model, args=(server,), daemon=True).start()
+    watch_directory(api.store, api.INGEST_DIR, log=server.log.info)
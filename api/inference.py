@@ -0,0 +1,229 @@
+"""
+Caminho de inferência compilado, sem pandas.
+
+O pipeline treinado (ColumnTransformer com StandardScaler + OneHotEncoder, seguido do
+classificador) é "compilado" uma única vez na inicialização: médias e escalas do scaler
+viram vetores NumPy e cada categoria do one-hot vira um índice fixo no vetor de features.
+Um registro é então convertido diretamente num vetor plano e entregue ao modelo, sem
+DataFrame, sem casamento de nomes de colunas e sem a validação de entrada do sklearn
+no pré-processamento. Para o GradientBoosting, o estimador é substituído pelas árvores
+empacotadas de `trees.py`.
+
+Executar `python inference.py` verifica a paridade com o pipeline original sobre o
+`obesity.csv`.
+"""
+
+import numpy as np
+
+from trees import PackedTrees
+
+
+class CompiledPipeline:
+    """Pré-processamento achatado em arrays + o estimador final do pipeline."""
+
+    def __init__(self, numeric_features, means, scales, categorical_features,
+                 categories, estimator, handle_unknown="ignore", feature_names_in=None):
+        self.numeric_features = list(numeric_features)
+        self.means = np.asarray(means, dtype=np.float64)
+        self.scales = np.asarray(scales, dtype=np.float64)
+        self.categorical_features = list(categorical_features)
+        self.categories = [list(values) for values in categories]
+        self.estimator = estimator
+        self.handle_unknown = handle_unknown
+        self.classes_ = np.asarray(estimator.classes_)
+
+        self.features = self.numeric_features + self.categorical_features
+        self.n_numeric = len(self.numeric_features)
+        # Ordem das colunas de entrada do pipeline original (a do dataset).
+        self.feature_names_in_ = list(feature_names_in if feature_names_in is not None else self.features)
+
+        # Tabela categoria -> coluna do vetor final, uma por feature categórica.
+        self.category_index = []
+        offset = self.n_numeric
+        for values in self.categories:
+            self.category_index.append({value: offset + i for i, value in enumerate(values)})
+            offset += len(values)
+        self.n_outputs = offset
+
+        # Campo de entrada (na ordem de feature_names_in_) de cada coluna do vetor final:
+        # as colunas do one-hot de um campo somam suas atribuições nele.
+        column_field = list(self.numeric_features) + [
+            name for name, values in zip(self.categorical_features, self.categories) for _ in values
+        ]
+        field_position = {name: i for i, name in enumerate(self.feature_names_in_)}
+        self.column_fields = np.zeros((self.n_outputs, len(self.feature_names_in_)))
+        self.column_fields[np.arange(self.n_outputs), [field_position[f] for f in column_field]] = 1.0
+
+    # =====================================================
+    # CONSTRUÇÃO A PARTIR DO PIPELINE SKLEARN
+    # =====================================================
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """Compila um Pipeline(preprocessing, model) treinado pelo notebook."""
+        from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+        steps = getattr(pipeline, "steps", None)
+        if not steps or len(steps) != 2:
+            raise TypeError("expected a Pipeline with preprocessing and model steps")
+
+        preprocessor, estimator = steps[0][1], steps[1][1]
+        transformers = [t for t in getattr(preprocessor, "transformers_", []) if t[0] != "remainder"]
+        remainder = getattr(preprocessor, "remainder", "drop")
+        if len(transformers) != 2 or remainder != "drop":
+            raise TypeError("expected a ColumnTransformer with exactly 'num' and 'cat' branches")
+
+        (_, scaler, numeric_features), (_, encoder, categorical_features) = transformers
+        if not isinstance(scaler, StandardScaler) or not isinstance(encoder, OneHotEncoder):
+            raise TypeError("expected StandardScaler + OneHotEncoder preprocessing")
+        if encoder.drop is not None:
+            raise TypeError("OneHotEncoder with drop is not supported")
+
+        # Árvores empacotadas quando o classificador é o GradientBoosting do notebook.
+        try:
+            estimator = PackedTrees.from_estimator(estimator)
+        except TypeError:
+            pass
+
+        n_numeric = len(numeric_features)
+        means = scaler.mean_ if scaler.with_mean else np.zeros(n_numeric)
+        scales = scaler.scale_ if scaler.with_std else np.ones(n_numeric)
+
+        return cls(
+            numeric_features, means, scales, categorical_features,
+            encoder.categories_, estimator, handle_unknown=encoder.handle_unknown,
+            feature_names_in=getattr(pipeline, "feature_names_in_", None),
+        )
+
+    # =====================================================
+    # PRÉ-PROCESSAMENTO
+    # =====================================================
+    def transform_record(self, record):
+        """Converte um registro (dict) no vetor de features do modelo, shape (1, n)."""
+        missing = [f for f in self.features if record.get(f) is None]
+        if missing:
+            raise ValueError(f"missing fields: {', '.join(missing)}")
+
+        row = np.zeros((1, self.n_outputs), dtype=np.float64)
+        for j, name in enumerate(self.numeric_features):
+            row[0, j] = float(record[name])
+        row[0, :self.n_numeric] -= self.means
+        row[0, :self.n_numeric] /= self.scales
+
+        for name, lookup in zip(self.categorical_features, self.category_index):
+            column = lookup.get(record[name])
+            if column is not None:
+                row[0, column] = 1.0
+            elif self.handle_unknown == "error":
+                raise ValueError(f"unknown category {record[name]!r} for {name}")
+        return row
+
+    def transform_records(self, records):
+        """Versão em lote de `transform_record`, shape (len(records), n)."""
+        X = np.zeros((len(records), self.n_outputs), dtype=np.float64)
+        for i, record in enumerate(records):
+            X[i] = self.transform_record(record)[0]
+        return X
+
+    def transform_columns(self, columns, n_rows):
+        """Monta a matriz de features a partir de colunas já validadas (ver schema.py)."""
+        X = np.zeros((n_rows, self.n_outputs), dtype=np.float64)
+        for j, name in enumerate(self.numeric_features):
+            X[:, j] = columns[name]
+        X[:, :self.n_numeric] -= self.means
+        X[:, :self.n_numeric] /= self.scales
+
+        rows = np.arange(n_rows)
+        for name, lookup in zip(self.categorical_features, self.category_index):
+            target = np.fromiter((lookup.get(v, -1) for v in columns[name]), dtype=np.int64, count=n_rows)
+            known = target >= 0
+            if self.handle_unknown == "error" and not known.all():
+                value = columns[name][np.flatnonzero(~known)[0]]
+                raise ValueError(f"unknown category {value!r} for {name}")
+            X[rows[known], target[known]] = 1.0
+        return X
+
+    def transform_sweep(self, record, columns, n_rows):
+        """Matriz de variantes de um registro: o vetor do registro repetido em `n_rows`
+        linhas, com só as colunas dos campos em `columns` (campo -> valores por linha)
+        reescritas. O registro é convertido uma única vez."""
+        X = np.repeat(self.transform_record(record), n_rows, axis=0)
+        rows = np.arange(n_rows)
+        for name, values in columns.items():
+            if name in self.numeric_features:
+                j = self.numeric_features.index(name)
+                X[:, j] = (np.asarray(values, dtype=np.float64) - self.means[j]) / self.scales[j]
+                continue
+            lookup = self.category_index[self.categorical_features.index(name)]
+            block = list(lookup.values())
+            X[:, block[0]:block[-1] + 1] = 0.0
+            target = np.fromiter((lookup.get(v, -1) for v in values), dtype=np.int64, count=n_rows)
+            known = target >= 0
+            if self.handle_unknown == "error" and not known.all():
+                raise ValueError(f"unknown category {values[np.flatnonzero(~known)[0]]!r} for {name}")
+            X[rows[known], target[known]] = 1.0
+        return X
+
+    # =====================================================
+    # INFERÊNCIA
+    # =====================================================
+    def predict_proba(self, X):
+        return self.estimator.predict_proba(X)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def predict_record(self, record):
+        return self.predict(self.transform_record(record))[0]
+
+    def explain(self, X):
+        """Atribuições do score bruto aos campos de entrada (ver PackedTrees.contributions).
+
+        Devolve (bias, contrib) com contrib shape (n, n_saídas, campos), campos na ordem
+        de `feature_names_in_`. TypeError se o estimador não for de árvores empacotadas.
+        """
+        if not isinstance(self.estimator, PackedTrees):
+            raise TypeError("attributions require the packed GradientBoosting trees")
+        bias, contrib = self.estimator.contributions(X)
+        return bias, contrib @ self.column_fields
+
+
+def compile_pipeline(pipeline):
+    """Atalho para `CompiledPipeline.from_pipeline`; levanta TypeError se não suportado."""
+    return CompiledPipeline.from_pipeline(pipeline)
+
+
+# =====================================================
+# PARIDADE COM O PIPELINE ORIGINAL
+# =====================================================
+def check_parity(pipeline, compiled, df):
+    """Compara rótulos e probabilidades do caminho compilado com o pipeline sklearn."""
+    features = compiled.features
+    X_frame = df[list(pipeline.feature_names_in_)]
+    expected_proba = pipeline.predict_proba(X_frame)
+    expected_labels = pipeline.predict(X_frame)
+
+    X = compiled.transform_records(df[features].to_dict("records"))
+    proba = compiled.predict_proba(X)
+    labels = compiled.classes_[np.argmax(proba, axis=1)]
+
+    return {
+        "rows": len(df),
+        "label_mismatches": int((labels != expected_labels).sum()),
+        "max_proba_diff": float(np.abs(proba - expected_proba).max()),
+    }
+
+
+if __name__ == "__main__":
+    import os
+
+    import joblib
+    import pandas as pd
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    pipeline = joblib.load(os.path.join(base_dir, "obesity_model.pkl"))
+    df = pd.read_csv(os.path.join(base_dir, "obesity.csv"))
+
+    report = check_parity(pipeline, compile_pipeline(pipeline), df)
+    print(report)
+    if report["label_mismatches"] or report["max_proba_diff"] > 1e-9:
+        raise SystemExit("compiled pipeline diverges from the sklearn pipeline")
@@ -0,0 +1,219 @@
+"""
+Ingestão incremental (append-only) de novos registros de pacientes.
+
+Registros chegam pelo `POST /ingest` (JSON ou CSV) ou como arquivos `.csv` deixados no
+diretório de ingestão. Cada lote é validado pelo esquema de entrada (`schema.py`, mais a
+coluna alvo `Obesity`), ganha as colunas derivadas `IMC` e `risk_score` uma única vez,
+no momento da ingestão, e é acrescentado a um log CSV append-only ao lado do
+`obesity.csv`, que nunca é reescrito.
+
+O log é a fonte da verdade compartilhada entre os workers do Gunicorn: cada processo
+guarda a posição (em bytes) até onde já leu e, ao atender `/data`, lê só o trecho novo
+e o concatena ao seu dataset em memória. Clientes que já têm N linhas pedem apenas o
+delta com `/data?offset=N`, já que a ordem das linhas nunca muda.
+"""
+
+import fcntl
+import io
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+TARGET = "Obesity"
+DERIVED_COLUMNS = ["IMC", "risk_score"]
+
+# Intervalo mínimo entre verificações do log, para não fazer stat a cada requisição.
+REFRESH_INTERVAL = 1.0
+
+# Intervalo de varredura do diretório de ingestão, em segundos (0 desativa).
+INGEST_WATCH_INTERVAL = float(os.getenv("INGEST_WATCH_INTERVAL", "5"))
+
+
+def add_derived(df):
+    """Acrescenta IMC e o score comportamental de risco do painel (mesma regra do app).
+
+    As colunas existentes não são copiadas (inclusive as de memory-map): `assign` só evita
+    a cópia com copy-on-write (pandas 3), então as novas entram numa cópia rasa.
+    """
+    weight = np.asarray(df["Weight"], dtype=np.float64)
+    height = np.asarray(df["Height"], dtype=np.float64)
+    risk = (
+        (df["family_history"] == "yes").astype(int) * 2 +
+        (df["FAF"] == 0).astype(int) * 2 +
+        (df["TUE"] >= 1.5).astype(int) +
+        (df["CH2O"] == 1).astype(int) +
+        (df["FAVC"] == "yes").astype(int)
+    )
+    out = df.copy(deep=False)
+    out["IMC"] = weight / height ** 2
+    out["risk_score"] = risk
+    return out
+
+
+def parse_csv_records(text):
+    """Registros (dicts) de um CSV com cabeçalho; valores vazios viram ausentes."""
+    frame = pd.read_csv(io.StringIO(text), dtype=str, keep_default_na=False)
+    return [
+        {k: (v if v != "" else None) for k, v in record.items()}
+        for record in frame.to_dict("records")
+    ]
+
+
+class IngestLog:
+    """Arquivo CSV append-only com as linhas ingeridas, protegido por flock."""
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = list(columns)
+
+    def append(self, frame):
+        with open(self.path, "a", encoding="utf-8", newline="") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                header = f.tell() == 0
+                f.write(frame[self.columns].to_csv(index=False, header=header))
+                f.flush()
+                os.fsync(f.fileno())
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def read_from(self, position):
+        """Linhas completas a partir de `position`; devolve (frame, nova posição)."""
+        with open(self.path, "rb") as f:
+            f.seek(position)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return None, position
+        text = data[:end].decode("utf-8")
+        frame = pd.read_csv(io.StringIO(text), header=0 if position == 0 else None,
+                            names=None if position == 0 else self.columns)
+        return frame, position + end
+
+
+class IncrementalDataset:
+    """Dataset base + linhas ingeridas, com as colunas derivadas já calculadas."""
+
+    def __init__(self, base, schema, log_path, on_append=None):
+        self.schema = schema
+        self.frame = add_derived(base)
+        self.columns = list(self.frame.columns)
+        self.log = IngestLog(log_path, self.columns)
+        self.on_append = on_append
+        # Posição no log, leitura do delta e concatenação andam juntas: sem a trava, duas
+        # threads leem o mesmo trecho a partir da mesma posição e o acrescentam duas vezes.
+        self._lock = threading.Lock()
+        self._position = 0
+        self._next_check = 0.0
+        self.refresh(force=True)
+
+    @property
+    def rows(self):
+        return len(self.frame)
+
+    # =====================================================
+    # LEITURA DO DELTA
+    # =====================================================
+    def refresh(self, force=False):
+        """Incorpora as linhas que outros processos acrescentaram ao log."""
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return 0
+        self._next_check = now + REFRESH_INTERVAL
+        with self._lock:
+            return self._read_delta()
+
+    def _read_delta(self):
+        """Lê e incorpora o trecho novo do log; chamar com `_lock` adquirida."""
+        if self.log.size() <= self._position:
+            return 0
+        delta, self._position = self.log.read_from(self._position)
+        if delta is None or delta.empty:
+            return 0
+        self._extend(delta)
+        return len(delta)
+
+    def _extend(self, delta):
+        self.frame = pd.concat([self.frame, delta[self.columns]], ignore_index=True)
+        if self.on_append is not None:
+            self.on_append(self.frame)
+
+    # =====================================================
+    # INGESTÃO
+    # =====================================================
+    def ingest(self, records):
+        """Valida, deriva e acrescenta; devolve {"accepted", "rejected", "rows"}."""
+        checked = self.schema.validate(records)
+        rejected = []
+        for i, fields in sorted(checked.errors.items()):
+            error = {"index": i, "error": checked.error_message(i)}
+            if "_record" not in fields:
+                error["fields"] = fields
+            rejected.append(error)
+
+        accepted = int(checked.valid.sum())
+        if accepted:
+            delta = add_derived(pd.DataFrame(checked.valid_columns(), columns=self.schema.features))
+            with self._lock:
+                self.log.append(delta)
+                # Lê de volta pelo log (inclusive o que outros processos gravaram antes).
+                self._read_delta()
+        return {"accepted": accepted, "rejected": rejected, "rows": self.rows}
+
+    def scan_directory(self, directory):
+        """Ingere os `.csv` deixados em `directory`; renomeia para `.done` ou `.failed`.
+
+        O arquivo é reivindicado por rename atômico, então vários processos podem varrer
+        o mesmo diretório sem ingerir duas vezes.
+        """
+        results = {}
+        try:
+            names = sorted(os.listdir(directory))
+        except OSError:
+            return results
+        for name in names:
+            if not name.endswith(".csv"):
+                continue
+            path = os.path.join(directory, name)
+            claimed = path + ".processing"
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue
+            try:
+                with open(claimed, encoding="utf-8") as f:
+                    result = self.ingest(parse_csv_records(f.read()))
+                os.rename(claimed, path + ".done")
+            except Exception as e:
+                result = {"accepted": 0, "rejected": [], "error": str(e)}
+                os.rename(claimed, path + ".failed")
+            results[name] = result
+        return results
+
+
+def watch_directory(store, directory, interval=INGEST_WATCH_INTERVAL, log=None):
+    """Thread daemon que varre `directory` a cada `interval` segundos."""
+    if interval <= 0:
+        return None
+    os.makedirs(directory, exist_ok=True)
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            for name, result in store.scan_directory(directory).items():
+                if log is not None:
+                    log(f"ingested {name}: {result.get('accepted', 0)} accepted, "
+                        f"{len(result.get('rejected', []))} rejected")
+
+    thread = threading.Thread(target=loop, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,181 @@
+"""
+Métricas da API no formato texto do Prometheus (`/metrics`).
+
+Sempre ativos (custo de um contador por requisição): requisições por endpoint e status,
+erros por endpoint e tempo/quantidade de carregamentos do modelo.
+
+Opcional (`METRICS_STAGE_TIMING=1`): tempo de cada etapa do `/predict` (decode,
+validation, preprocessing, model, encode; no `/predict/batch` em JSON, decode, inference e
+encode) e a duração total, agregados em histogramas
+de buckets fixos. Desligado, `timer()` devolve um cronômetro nulo cujo `mark` não faz
+nada, então o caminho quente não paga por leituras de relógio nem locks.
+
+Com Gunicorn cada worker mantém e expõe as próprias métricas.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+# Limites superiores dos buckets, em segundos (de 50 µs a 5 s).
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+PREFIX = "obesity_api"
+
+
+class Histogram:
+    """Histograma de buckets fixos (contagens não cumulativas; acumula na exportação)."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            total += n
+            yield bound, total
+
+
+class StageTimer:
+    """Cronômetro de uma requisição: cada `mark` registra o tempo desde a etapa anterior."""
+
+    __slots__ = ("metrics", "endpoint", "started", "last")
+
+    def __init__(self, metrics, endpoint):
+        self.metrics = metrics
+        self.endpoint = endpoint
+        self.started = self.last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.metrics.observe_stage(self.endpoint, stage, now - self.last)
+        self.last = now
+
+    def done(self):
+        self.metrics.observe_stage(self.endpoint, "total", time.perf_counter() - self.started)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def mark(self, stage):
+        pass
+
+    def done(self):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """Registro de contadores e histogramas da API."""
+
+    def __init__(self, stage_timing=False, buckets=DEFAULT_BUCKETS):
+        self.stage_timing = stage_timing
+        self.buckets = buckets
+
+        self._lock = threading.Lock()
+        self.requests = defaultdict(int)    # (endpoint, status) -> n
+        self.errors = defaultdict(int)      # endpoint -> n
+        self.stages = {}                    # (endpoint, stage) -> Histogram
+        self.model_loads = 0
+        self.model_load_seconds = None
+        self.model_loaded_at = None
+
+    # =====================================================
+    # COLETA
+    # =====================================================
+    def timer(self, endpoint):
+        return StageTimer(self, endpoint) if self.stage_timing else NULL_TIMER
+
+    def observe_stage(self, endpoint, stage, seconds):
+        key = (endpoint, stage)
+        with self._lock:
+            histogram = self.stages.get(key)
+            if histogram is None:
+                histogram = self.stages[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def observe_request(self, endpoint, status):
+        with self._lock:
+            self.requests[(endpoint, status)] += 1
+            if status >= 400:
+                self.errors[endpoint] += 1
+
+    def observe_model_load(self, seconds):
+        with self._lock:
+            self.model_loads += 1
+            self.model_load_seconds = seconds
+            self.model_loaded_at = time.time()
+
+    # =====================================================
+    # EXPORTAÇÃO
+    # =====================================================
+    def render(self, extra_gauges=None):
+        """Texto no formato de exposição do Prometheus (version 0.0.4).
+
+        `extra_gauges`: {nome: (ajuda, valor)} lidos na hora pela aplicação.
+        """
+        with self._lock:
+            requests = sorted(self.requests.items())
+            errors = sorted(self.errors.items())
+            stages = sorted(
+                (key, list(h.cumulative()), h.sum, h.count) for key, h in self.stages.items()
+            )
+            model_loads = self.model_loads
+            model_load_seconds = self.model_load_seconds
+            model_loaded_at = self.model_loaded_at
+
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+        header("requests_total", "counter", "HTTP requests by endpoint and status code.")
+        for (endpoint, status), n in requests:
+            lines.append(f'{PREFIX}_requests_total{{endpoint="{endpoint}",status="{status}"}} {n}')
+
+        header("errors_total", "counter", "HTTP responses with status >= 400 by endpoint.")
+        for endpoint, n in errors:
+            lines.append(f'{PREFIX}_errors_total{{endpoint="{endpoint}"}} {n}')
+
+        header("model_loads_total", "counter", "Model loads, including hot reloads.")
+        lines.append(f"{PREFIX}_model_loads_total {model_loads}")
+        if model_load_seconds is not None:
+            header("model_load_seconds", "gauge", "Duration of the last model load, including warm-up.")
+            lines.append(f"{PREFIX}_model_load_seconds {model_load_seconds:.6f}")
+            header("model_loaded_timestamp_seconds", "gauge", "Unix time of the last model load.")
+            lines.append(f"{PREFIX}_model_loaded_timestamp_seconds {model_loaded_at:.3f}")
+
+        header("stage_timing_enabled", "gauge", "1 when per-stage timing is enabled.")
+        lines.append(f"{PREFIX}_stage_timing_enabled {int(self.stage_timing)}")
+
+        for name, (help_text, value) in (extra_gauges or {}).items():
+            header(name, "gauge", help_text)
+            lines.append(f"{PREFIX}_{name} {value}")
+
+        if stages:
+            header("stage_duration_seconds", "histogram", "Time spent in each request stage.")
+        for (endpoint, stage), buckets, total, count in stages:
+            labels = f'endpoint="{endpoint}",stage="{stage}"'
+            for bound, n in buckets:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{PREFIX}_stage_duration_seconds_bucket{{{labels},le="{le}"}} {n}')
+            lines.append(f"{PREFIX}_stage_duration_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"{PREFIX}_stage_duration_seconds_count{{{labels}}} {count}")
+
+        return "\n".join(lines) + "\n"
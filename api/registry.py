@@ -0,0 +1,217 @@
+"""
+Registro local de versões do modelo.
+
+    registry/
+        CURRENT                    versão ativa (uma linha)
+        SHADOW                     opcional: {"version": ..., "fraction": ...} da candidata em sombra
+        v1/obesity_model.pkl       (+ obesity_model.artifact, quando compilável)
+        v2/obesity_model.pkl
+        ...
+
+Uma versão publicada nunca é alterada: `publish` grava numa pasta temporária e a renomeia
+para o nome da versão. `CURRENT` e `SHADOW` são trocados por rename atômico; a API observa
+os dois arquivos (thread no master do Gunicorn ou no processo do `python app.py`) e
+carrega a versão nova em segundo plano, com warm-up, antes de colocá-la em serviço.
+
+Sem registro (pasta ausente ou sem `CURRENT`), a API usa o `obesity_model.pkl` da imagem.
+
+CLI:
+    python registry.py list
+    python registry.py publish novo_modelo.pkl [--version v3] [--activate]
+    python registry.py activate v3
+    python registry.py shadow v3 --fraction 0.1     # --off desativa
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+
+MODEL_FILENAME = "obesity_model.pkl"
+CURRENT_FILE = "CURRENT"
+SHADOW_FILE = "SHADOW"
+
+_VERSION_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$")
+
+
+class RegistryError(ValueError):
+    """Versão inexistente ou inválida, ou estado do registro ilegível."""
+
+
+def _natural_key(name):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+class ModelRegistry:
+    """Pasta de versões imutáveis do modelo + ponteiros CURRENT/SHADOW."""
+
+    def __init__(self, root):
+        self.root = root
+
+    # =====================================================
+    # LEITURA
+    # =====================================================
+    def versions(self):
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return []
+        return sorted(
+            (name for name in names
+             if _VERSION_NAME.match(name) and os.path.isfile(os.path.join(self.root, name, MODEL_FILENAME))),
+            key=_natural_key,
+        )
+
+    def model_path(self, version):
+        if not isinstance(version, str) or not _VERSION_NAME.match(version):
+            raise RegistryError(f"invalid model version: {version!r}")
+        path = os.path.join(self.root, version, MODEL_FILENAME)
+        if not os.path.isfile(path):
+            raise RegistryError(f"unknown model version: {version}")
+        return path
+
+    def _read(self, name):
+        try:
+            with open(os.path.join(self.root, name), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def current(self):
+        """Versão ativa, ou None quando o registro não está em uso."""
+        return self._read(CURRENT_FILE)
+
+    def shadow(self):
+        """{"version", "fraction"} da candidata em sombra, ou None."""
+        raw = self._read(SHADOW_FILE)
+        if raw is None:
+            return None
+        try:
+            config = json.loads(raw)
+            return {"version": str(config["version"]), "fraction": float(config["fraction"])}
+        except (ValueError, KeyError, TypeError) as e:
+            raise RegistryError(f"invalid {SHADOW_FILE} file: {e}")
+
+    def state(self):
+        """Conteúdo bruto de CURRENT e SHADOW, para os watchers compararem."""
+        return self._read(CURRENT_FILE), self._read(SHADOW_FILE)
+
+    # =====================================================
+    # ESCRITA
+    # =====================================================
+    def _write(self, name, text):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = os.path.join(self.root, f".{name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.root, name))
+
+    def _next_version(self):
+        numbers = [int(v[1:]) for v in self.versions() if re.fullmatch(r"v\d+", v)]
+        return f"v{max(numbers, default=0) + 1}"
+
+    def publish(self, source, version=None):
+        """Copia um pipeline `.pkl` para uma nova versão (e exporta o artefato); devolve o nome."""
+        version = version or self._next_version()
+        if not _VERSION_NAME.match(version):
+            raise RegistryError(f"invalid model version: {version!r}")
+        target = os.path.join(self.root, version)
+        if os.path.exists(target):
+            raise RegistryError(f"model version already exists: {version}")
+
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f".{version}.", dir=self.root)
+        try:
+            model_path = os.path.join(staging, MODEL_FILENAME)
+            shutil.copy2(source, model_path)
+            _export_artifact(model_path)
+            os.rename(staging, target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return version
+
+    def activate(self, version):
+        self.model_path(version)
+        self._write(CURRENT_FILE, version)
+
+    def set_shadow(self, version, fraction):
+        self.model_path(version)
+        if not 0.0 < float(fraction) <= 1.0:
+            raise RegistryError("shadow fraction must be in (0, 1]")
+        self._write(SHADOW_FILE, json.dumps({"version": version, "fraction": float(fraction)}))
+
+    def clear_shadow(self):
+        try:
+            os.remove(os.path.join(self.root, SHADOW_FILE))
+        except FileNotFoundError:
+            pass
+
+
+def _export_artifact(model_path):
+    """Artefato compacto ao lado do `.pkl`, quando o pipeline é compilável."""
+    import joblib
+
+    from artifact import artifact_path, export_artifact
+    from inference import compile_pipeline
+
+    try:
+        compiled = compile_pipeline(joblib.load(model_path))
+        export_artifact(compiled, artifact_path(model_path), source=model_path)
+    except TypeError:
+        pass
+
+
+# =====================================================
+# CLI
+# =====================================================
+def main(argv=None):
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Registro de versões do modelo.")
+    parser.add_argument("--root", default=os.getenv("MODEL_REGISTRY_DIR", os.path.join(base_dir, "registry")))
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list")
+    publish = commands.add_parser("publish")
+    publish.add_argument("source")
+    publish.add_argument("--version", default=None)
+    publish.add_argument("--activate", action="store_true")
+    activate = commands.add_parser("activate")
+    activate.add_argument("version")
+    shadow = commands.add_parser("shadow")
+    shadow.add_argument("version", nargs="?")
+    shadow.add_argument("--fraction", type=float, default=0.1)
+    shadow.add_argument("--off", action="store_true")
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.root)
+    if args.command == "publish":
+        version = registry.publish(args.source, args.version)
+        print(f"publicada: {version}")
+        if args.activate:
+            registry.activate(version)
+            print(f"ativa: {version}")
+    elif args.command == "activate":
+        registry.activate(args.version)
+        print(f"ativa: {args.version}")
+    elif args.command == "shadow":
+        if args.off:
+            registry.clear_shadow()
+            print("sombra desativada")
+        else:
+            registry.set_shadow(args.version, args.fraction)
+            print(f"sombra: {args.version} ({args.fraction:.0%} do tráfego)")
+    else:
+        current, shadow_config = registry.current(), registry.shadow()
+        for version in registry.versions():
+            marks = [m for m, on in (("ativa", version == current),
+                                     ("sombra", shadow_config and version == shadow_config["version"])) if on]
+            print(version + (f"  ({', '.join(marks)})" if marks else ""))
+
+
+if __name__ == "__main__":
+    main()
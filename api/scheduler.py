@@ -0,0 +1,158 @@
+"""
+Agendador de micro-lotes para o `/predict`.
+
+Requisições concorrentes colocam seu vetor de features numa fila; uma thread
+consumidora junta o que chegar até atingir `max_batch_size` itens ou `max_wait_ms`
+desde o primeiro item do lote e faz uma única chamada `predict_proba` para todos.
+Cada requisição recebe sua linha de probabilidades por um `Future`.
+
+As métricas (tamanho dos lotes e atraso na fila) servem para ajustar o compromisso
+entre vazão e latência de cauda.
+"""
+
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from workers import ProcessThread
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 2.0
+DEFAULT_RESULT_TIMEOUT = 10.0
+
+DELAY_WINDOW = 2048
+
+# Marca de parada da thread consumidora (ver `close`).
+_STOP = object()
+
+
+class MicroBatcher:
+    """Junta vetores de features concorrentes em chamadas únicas de predict_proba."""
+
+    def __init__(self, predict_proba, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.predict_proba = predict_proba
+        self.max_batch_size = int(max_batch_size)
+        self.max_wait = float(max_wait_ms) / 1000.0
+
+        self._queue = queue.SimpleQueue()
+        self._worker = ProcessThread("micro-batcher")
+        self._closed = False
+        # Protege a troca de fila/thread: nenhum item entra numa fila depois do _STOP.
+        self._queue_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+        self.batch_sizes = Counter()
+        self.queue_delays_ms = deque(maxlen=DELAY_WINDOW)
+
+    def _ensure_worker(self):
+        """Fila da thread consumidora deste processo; chamar com `_queue_lock` adquirida."""
+        # Threads não sobrevivem ao fork dos workers do Gunicorn: sobe uma por processo, e
+        # outra depois de um `close`.
+        if not self._closed and self._worker.running():
+            return self._queue
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._worker.start(self._run, self._queue)
+        return self._queue
+
+    def submit(self, vector):
+        """Enfileira um vetor (1, n_features) e retorna o Future da linha de probabilidades."""
+        future = Future()
+        item = (vector, future, time.perf_counter())
+        with self._queue_lock:
+            self._ensure_worker().put(item)
+        return future
+
+    def predict_proba_one(self, vector, timeout=DEFAULT_RESULT_TIMEOUT):
+        return self.submit(vector).result(timeout=timeout)
+
+    def close(self):
+        """Encerra a thread depois dos itens já enfileirados (ex.: modelo substituído).
+
+        `submit` e `close` trocam a fila sob a mesma trava: o que foi enfileirado antes
+        fica à frente do _STOP, e um `submit` tardio sobe outra fila e outra thread.
+        """
+        with self._queue_lock:
+            if self._worker.running() and not self._closed:
+                self._queue.put(_STOP)
+                self._closed = True
+
+    # =====================================================
+    # LOOP DA THREAD CONSUMIDORA
+    # =====================================================
+    def _collect(self, items):
+        """Próximo lote da fila `items` e se a marca de parada foi vista."""
+        first = items.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = items.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self, items):
+        stop = False
+        while not stop:
+            batch, stop = self._collect(items)
+            if not batch:
+                continue
+            started = time.perf_counter()
+            vectors, futures, enqueued = zip(*batch)
+
+            try:
+                proba = self.predict_proba(np.vstack(vectors))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                with self._stats_lock:
+                    self.errors += 1
+                continue
+
+            for future, row in zip(futures, proba):
+                future.set_result(row)
+
+            with self._stats_lock:
+                self.batches += 1
+                self.items += len(batch)
+                self.batch_sizes[len(batch)] += 1
+                self.queue_delays_ms.extend((started - t) * 1000 for t in enqueued)
+
+    # =====================================================
+    # MÉTRICAS
+    # =====================================================
+    def stats(self):
+        with self._stats_lock:
+            delays = np.array(self.queue_delays_ms) if self.queue_delays_ms else None
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self.batches,
+                "requests": self.items,
+                "errors": self.errors,
+                "mean_batch_size": round(self.items / self.batches, 3) if self.batches else 0.0,
+                "batch_size_counts": {str(k): v for k, v in sorted(self.batch_sizes.items())},
+                "queue_delay_ms": None if delays is None else {
+                    "p50": round(float(np.percentile(delays, 50)), 3),
+                    "p95": round(float(np.percentile(delays, 95)), 3),
+                    "p99": round(float(np.percentile(delays, 99)), 3),
+                    "max": round(float(delays.max()), 3),
+                },
+            }
@@ -0,0 +1,224 @@
+"""
+Esquema de entrada da API: validação e coerção coluna a coluna.
+
+O esquema é derivado do `obesity.csv` (categorias permitidas de cada campo categórico)
+e das faixas do formulário do `app/app.py` (limites dos `number_input`/`slider` de
+Age, Height, Weight, FCVC, NCP, CH2O, FAF e TUE). Um lote de registros é separado em
+colunas e cada coluna é validada de uma vez com NumPy:
+
+- numéricos: aceitam números ou textos numéricos, viram float64 e precisam ser finitos
+  e estar dentro da faixa;
+- categóricos: aceitam a categoria com qualquer caixa/espaços nas pontas e viram a
+  grafia canônica do dataset.
+
+Linhas inválidas são rejeitadas antes da inferência, com uma mensagem por campo.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Faixas do formulário de predição (app/app.py).
+FORM_RANGES = {
+    "Age": (0, 120),
+    "Height": (1.0, 2.5),
+    "Weight": (30.0, 300.0),
+    "FCVC": (1.0, 3.0),
+    "NCP": (1.0, 4.0),
+    "CH2O": (1.0, 3.0),
+    "FAF": (0.0, 3.0),
+    "TUE": (0.0, 2.0),
+}
+
+
+class ValidationResult:
+    """Colunas coeridas de um lote e os erros por linha e campo."""
+
+    def __init__(self, columns, valid, errors):
+        self.columns = columns    # campo -> array (float64 ou object), inclusive linhas inválidas
+        self.valid = valid        # máscara booleana das linhas utilizáveis
+        self.errors = errors      # linha -> {campo: mensagem}
+
+    def __len__(self):
+        return len(self.valid)
+
+    def record(self, i):
+        """Registro coerido da linha i, como dict."""
+        return {name: _plain(values[i]) for name, values in self.columns.items()}
+
+    def valid_columns(self):
+        """Colunas restritas às linhas válidas, na mesma ordem."""
+        return {name: values[self.valid] for name, values in self.columns.items()}
+
+    def error_message(self, i):
+        fields = self.errors[i]
+        if "_record" in fields:
+            return fields["_record"]
+        return "invalid fields: " + ", ".join(fields)
+
+
+class RecordSchema:
+    """Campos de entrada com seus tipos, faixas numéricas e categorias permitidas."""
+
+    def __init__(self, features, numeric_ranges, categories):
+        self.features = list(features)
+        self.numeric_ranges = dict(numeric_ranges)
+        self.categories = {name: list(values) for name, values in categories.items()}
+        # Categoria normalizada (minúsculas, sem espaços nas pontas) -> grafia canônica.
+        self._lookup = {
+            name: {str(v).strip().lower(): v for v in values}
+            for name, values in self.categories.items()
+        }
+
+    @classmethod
+    def from_frame(cls, frame, features=None, ranges=FORM_RANGES):
+        """Deriva o esquema do dataset: faixas do formulário (ampliadas para cobrir os
+        valores observados) nas numéricas e os valores distintos nas categóricas."""
+        features = list(features) if features is not None else list(frame.columns)
+        numeric_ranges, categories = {}, {}
+        for name in features:
+            column = frame[name]
+            if pd.api.types.is_numeric_dtype(column):
+                low, high = ranges.get(name, (-np.inf, np.inf))
+                numeric_ranges[name] = (min(low, float(column.min())), max(high, float(column.max())))
+            else:
+                categories[name] = sorted(str(v) for v in pd.unique(column.dropna()))
+        return cls(features, numeric_ranges, categories)
+
+    def describe(self):
+        """Esquema em formato JSON (para documentação e clientes)."""
+        return {
+            name: {"type": "number", "min": self.numeric_ranges[name][0], "max": self.numeric_ranges[name][1]}
+            if name in self.numeric_ranges else {"type": "category", "values": self.categories[name]}
+            for name in self.features
+        }
+
+    # =====================================================
+    # VALIDAÇÃO
+    # =====================================================
+    def validate(self, records):
+        """Valida e converte uma sequência de registros (dicts) coluna a coluna.
+
+        Entradas que não são objetos (ou exceções vindas da leitura do NDJSON) viram erro
+        de registro inteiro.
+        """
+        n = len(records)
+        errors = {}
+        is_dict = np.fromiter((isinstance(r, dict) for r in records), dtype=bool, count=n)
+        for i in np.flatnonzero(~is_dict):
+            record = records[i]
+            message = str(record) if isinstance(record, Exception) else "record must be a JSON object"
+            errors[int(i)] = {"_record": message}
+
+        dicts = records if is_dict.all() else [r if isinstance(r, dict) else {} for r in records]
+        raw_columns = {name: [r.get(name) for r in dicts] for name in self.features}
+        return self._validate(raw_columns, is_dict, errors)
+
+    def validate_columns(self, raw_columns, n):
+        """Valida colunas já separadas (ex.: blocos de um CSV): campo -> sequência de
+        valores, com None nos ausentes; um campo que falta no dict é ausente em todas as
+        linhas."""
+        missing = [None] * n
+        raw_columns = {name: raw_columns.get(name, missing) for name in self.features}
+        return self._validate(raw_columns, np.ones(n, dtype=bool), {})
+
+    def _validate(self, raw_columns, is_dict, errors):
+        columns = {}
+        for name, raw in raw_columns.items():
+            if name in self.numeric_ranges:
+                values, problems = self._numeric(name, raw)
+            else:
+                values, problems = self._categorical(name, raw)
+            columns[name] = values
+            for i, message in problems:
+                if is_dict[i]:
+                    errors.setdefault(int(i), {})[name] = message
+
+        valid = is_dict.copy()
+        if errors:
+            valid[list(errors)] = False
+        return ValidationResult(columns, valid, errors)
+
+    def _numeric(self, name, raw):
+        low, high = self.numeric_ranges[name]
+        if set(map(type, raw)) <= _PLAIN_NUMBERS:
+            # Caso comum: só int/float do JSON, conversão direta.
+            missing = np.zeros(len(raw), dtype=bool)
+            try:
+                values = np.array(raw, dtype=np.float64)
+            except OverflowError:
+                values = np.array(_without_huge_ints(raw), dtype=np.float64)
+        else:
+            missing = _is_none(raw)
+            # bool é subclasse de int em Python, mas não é um valor aceitável aqui.
+            is_bool = np.fromiter((isinstance(v, (bool, np.bool_)) for v in raw), dtype=bool, count=len(raw))
+            try:
+                values = pd.to_numeric(pd.Series(raw, dtype=object), errors="coerce").to_numpy(
+                    dtype=np.float64, copy=True)
+            except OverflowError:
+                values = pd.to_numeric(pd.Series(_without_huge_ints(raw), dtype=object),
+                                       errors="coerce").to_numpy(dtype=np.float64, copy=True)
+            values[is_bool] = np.nan
+
+        not_number = ~missing & ~np.isfinite(values)
+        with np.errstate(invalid="ignore"):
+            out_of_range = np.isfinite(values) & ((values < low) | (values > high))
+
+        problems = [(i, "is required") for i in np.flatnonzero(missing)]
+        problems += [(i, "must be a finite number") for i in np.flatnonzero(not_number)]
+        problems += [(i, f"must be between {_fmt(low)} and {_fmt(high)}") for i in np.flatnonzero(out_of_range)]
+        return values, problems
+
+    def _categorical(self, name, raw):
+        allowed_values = self.categories[name]
+        # Caso comum: grafia canônica, resolvida de uma vez; só o resto é normalizado.
+        try:
+            codes = pd.Categorical(raw, categories=allowed_values).codes
+        except TypeError:
+            # Valores não hasheáveis (listas, objetos): tudo pelo caminho lento.
+            codes = np.full(len(raw), -1, dtype=np.int8)
+        values = np.asarray(allowed_values, dtype=object)[codes]
+        missing = np.zeros(len(raw), dtype=bool)
+        unknown = np.zeros(len(raw), dtype=bool)
+        lookup = self._lookup[name]
+        for i in np.flatnonzero(codes < 0):
+            value = raw[i]
+            if value is None:
+                missing[i] = True
+            else:
+                values[i] = lookup.get(str(value).strip().lower())
+                unknown[i] = values[i] is None
+
+        allowed = ", ".join(allowed_values)
+        problems = [(i, "is required") for i in np.flatnonzero(missing)]
+        problems += [(i, f"must be one of: {allowed}") for i in np.flatnonzero(unknown)]
+        return values, problems
+
+
+_PLAIN_NUMBERS = {int, float}
+
+
+def _is_none(raw):
+    return np.fromiter((v is None for v in raw), dtype=bool, count=len(raw))
+
+
+def _without_huge_ints(raw):
+    """Cópia de `raw` com os inteiros grandes demais para float trocados por NaN.
+
+    O JSON aceita inteiros de qualquer tamanho; eles viram "must be a finite number".
+    """
+    values = list(raw)
+    for i, value in enumerate(values):
+        if isinstance(value, int):
+            try:
+                float(value)
+            except OverflowError:
+                values[i] = np.nan
+    return values
+
+
+def _fmt(value):
+    return f"{value:g}"
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
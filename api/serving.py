@@ -0,0 +1,160 @@
+"""
+Modelo em serviço e modo sombra.
+
+`ServedModel` reúne tudo que as rotas usam de uma versão carregada: o modelo, o caminho
+compilado, as features, o esquema de entrada, os caches de predição e de explicação e o
+micro-batcher. As rotas leem a referência ativa uma única vez no início da requisição; a
+troca de versão é a atribuição dessa referência, então requisições em andamento terminam
+no modelo antigo e as novas já chegam no novo, sem janela com estado misturado.
+
+`ShadowScorer` pontua uma fração do tráfego do `/predict` numa versão candidata, numa
+thread própria e fora do caminho da requisição (fila limitada; o excedente é descartado),
+e acumula a concordância de rótulos, a diferença média de probabilidades e a latência
+das duas versões em janelas de tamanho fixo.
+"""
+
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from workers import ProcessThread
+
+SHADOW_QUEUE_SIZE = 256
+LATENCY_WINDOW = 2048
+
+# Tempo para as requisições que ainda usam o modelo antigo terminarem antes de liberá-lo.
+RETIRE_GRACE_SECONDS = 30.0
+
+
+class ServedModel:
+    """Uma versão do modelo carregada, aquecida e pronta para atender."""
+
+    def __init__(self, version, path, model, compiled, model_format, schema, numeric_features,
+                 prediction_cache, explanation_cache, batcher=None):
+        self.version = version
+        self.path = path
+        self.model = model
+        self.compiled = compiled
+        self.predictor = compiled if compiled is not None else model
+        self.format = model_format
+        self.schema = schema
+        self.features = list(schema.features)
+        self.numeric_features = frozenset(numeric_features)
+        self.prediction_cache = prediction_cache
+        self.explanation_cache = explanation_cache
+        self.batcher = batcher
+        self.loaded_at = time.time()
+
+    @property
+    def classes_(self):
+        return self.predictor.classes_
+
+    def predict_proba_record(self, record):
+        """Linha de probabilidades de um registro já validado."""
+        if self.compiled is not None:
+            return self.compiled.predict_proba(self.compiled.transform_record(record))[0]
+        return self.model.predict_proba(pd.DataFrame([record], columns=self.features))[0]
+
+    def retire(self, delay=RETIRE_GRACE_SECONDS):
+        """Libera recursos depois que as requisições em andamento terminarem."""
+        if self.batcher is not None:
+            timer = threading.Timer(delay, self.batcher.close)
+            timer.daemon = True
+            timer.start()
+
+
+def _percentiles_ms(samples):
+    if not samples:
+        return None
+    values = np.asarray(samples) * 1000
+    return {
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+    }
+
+
+class ShadowScorer:
+    """Compara uma versão candidata com a ativa numa fração do tráfego."""
+
+    def __init__(self, candidate, fraction, queue_size=SHADOW_QUEUE_SIZE):
+        self.candidate = candidate
+        self.fraction = float(fraction)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._worker = ProcessThread("shadow-scorer")
+
+        self._stats_lock = threading.Lock()
+        self.submitted = 0
+        self.dropped = 0
+        self.scored = 0
+        self.agreements = 0
+        self.errors = 0
+        self.abs_diff_sum = 0.0
+        self.primary_seconds = deque(maxlen=LATENCY_WINDOW)
+        self.shadow_seconds = deque(maxlen=LATENCY_WINDOW)
+
+    def _new_queue(self):
+        # A fila herdada do fork pode ter a trava interna presa: cada thread nova tem a sua.
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+
+    def maybe_submit(self, record, primary_classes, primary_proba, primary_seconds=None):
+        """Sorteia a requisição e, se escolhida, enfileira sem bloquear."""
+        if random.random() >= self.fraction:
+            return
+        self._worker.ensure(self._run, setup=self._new_queue)
+        try:
+            self._queue.put_nowait((record, primary_classes, primary_proba, primary_seconds))
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            return
+        with self._stats_lock:
+            self.submitted += 1
+
+    def _run(self):
+        while True:
+            record, primary_classes, primary_proba, primary_seconds = self._queue.get()
+            started = time.perf_counter()
+            try:
+                proba = self.candidate.predict_proba_record(record)
+            except Exception:
+                with self._stats_lock:
+                    self.errors += 1
+                continue
+            elapsed = time.perf_counter() - started
+
+            # Compara por nome de classe: as versões podem ordenar as classes de outro jeito.
+            primary = dict(zip(map(str, primary_classes), primary_proba))
+            shadow = dict(zip(map(str, self.candidate.classes_), proba))
+            agree = max(primary, key=primary.get) == max(shadow, key=shadow.get)
+            diff = float(np.mean([abs(primary[c] - shadow.get(c, 0.0)) for c in primary]))
+
+            with self._stats_lock:
+                self.scored += 1
+                self.agreements += int(agree)
+                self.abs_diff_sum += diff
+                self.shadow_seconds.append(elapsed)
+                if primary_seconds is not None:
+                    self.primary_seconds.append(primary_seconds)
+
+    def stats(self):
+        with self._stats_lock:
+            scored = self.scored
+            return {
+                "version": self.candidate.version,
+                "fraction": self.fraction,
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "scored": scored,
+                "errors": self.errors,
+                "agreement": round(self.agreements / scored, 4) if scored else None,
+                "mean_abs_proba_diff": round(self.abs_diff_sum / scored, 6) if scored else None,
+                "latency_ms": {
+                    "active": _percentiles_ms(list(self.primary_seconds)),
+                    "shadow": _percentiles_ms(list(self.shadow_seconds)),
+                },
+            }
@@ -0,0 +1,148 @@
+"""
+Simulação "e se?" para o endpoint `/predict/sweep`.
+
+Um pedido traz um registro e um ou dois campos a variar:
+
+    {"record": {...}, "sweep": {"FAF": {"min": 0, "max": 3, "points": 13}, "CH2O": {}}}
+    {"record": {...}, "sweep": ["FAF"]}                  # faixa permitida, 21 pontos
+
+Numéricos variam em pontos igualmente espaçados (por padrão, a faixa do esquema de
+entrada); categóricos, em todas as categorias (ou em `"values"`, nos dois casos). A
+grade completa (produto dos eixos) é montada de uma vez: o registro é convertido uma
+única vez no vetor do modelo, repetido em todas as linhas, e só as colunas dos campos
+variados são reescritas (`CompiledPipeline.transform_sweep`). Grade e registro original
+são pontuados numa única chamada de `predict_proba`.
+
+A resposta traz os valores de cada eixo, a classe prevista em cada ponto e a superfície
+de probabilidades por classe (listas aninhadas no formato da grade), prontas para uma
+curva (um campo) ou um mapa de calor (dois campos).
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_POINTS = 21
+MAX_POINTS = 101
+MAX_FEATURES = 2
+DECIMALS = 6
+
+
+class SweepError(ValueError):
+    """Pedido inválido; `fields` traz os erros por campo do registro, quando houver."""
+
+    def __init__(self, message, fields=None):
+        super().__init__(message)
+        self.fields = fields
+
+
+# =====================================================
+# LEITURA E VALIDAÇÃO DO PEDIDO
+# =====================================================
+def parse_sweep(body, schema):
+    """(registro coerido, {campo: valores coeridos}) de um pedido; SweepError se inválido."""
+    if not isinstance(body, dict) or not isinstance(body.get("record"), dict):
+        raise SweepError('expected a JSON object with "record" and "sweep"')
+    spec = body.get("sweep")
+    if isinstance(spec, list) and all(isinstance(name, str) for name in spec):
+        spec = {name: {} for name in spec}
+    if not isinstance(spec, dict) or not 1 <= len(spec) <= MAX_FEATURES:
+        raise SweepError(f'"sweep" must name 1 to {MAX_FEATURES} features')
+
+    axes = {}
+    for name, options in spec.items():
+        if name not in schema.features:
+            raise SweepError(f"unknown sweep feature: {name}")
+        if options is None:
+            options = {}
+        if not isinstance(options, dict):
+            raise SweepError(f"sweep options for {name} must be an object")
+        axes[name] = _axis_values(schema, name, options)
+
+    # Campos variados podem faltar no registro: valem o primeiro ponto do eixo.
+    record = dict(body["record"])
+    for name, values in axes.items():
+        if record.get(name) is None:
+            record[name] = values[0]
+    checked = schema.validate([record])
+    if checked.errors:
+        fields = checked.errors[0]
+        raise SweepError(checked.error_message(0), None if "_record" in fields else fields)
+    record = checked.record(0)
+
+    for name, values in axes.items():
+        checked = schema.validate([dict(record, **{name: value}) for value in values])
+        if checked.errors:
+            i = min(checked.errors)
+            raise SweepError(f"sweep value {values[i]!r} for {name} {checked.errors[i][name]}")
+        axes[name] = checked.columns[name]
+    return record, axes
+
+
+def _axis_values(schema, name, options):
+    if "values" in options:
+        values = options["values"]
+        if not isinstance(values, list) or not 1 <= len(values) <= MAX_POINTS:
+            raise SweepError(f"values for {name} must be a list of 1 to {MAX_POINTS} items")
+        return values
+    if name not in schema.numeric_ranges:
+        return list(schema.categories[name])
+
+    low, high = schema.numeric_ranges[name]
+    try:
+        low = float(options.get("min", low))
+        high = float(options.get("max", high))
+        points = int(options.get("points", DEFAULT_POINTS))
+    except (TypeError, ValueError, OverflowError):
+        raise SweepError(f"min, max and points for {name} must be numbers")
+    if not (np.isfinite(low) and np.isfinite(high)):
+        raise SweepError(f"min and max for {name} must be finite numbers")
+    if not 2 <= points <= MAX_POINTS:
+        raise SweepError(f"points for {name} must be between 2 and {MAX_POINTS}")
+    if not low < high:
+        raise SweepError(f"min must be less than max for {name}")
+    return np.linspace(low, high, points).tolist()
+
+
+# =====================================================
+# GRADE E PONTUAÇÃO
+# =====================================================
+def sweep_probabilities(current, record, axes):
+    """Probabilidades do registro original e da grade, numa única chamada do modelo.
+
+    Devolve (probabilidades do registro, probabilidades da grade no formato
+    (len(eixo 1), [len(eixo 2),] classes)).
+    """
+    shape = tuple(len(values) for values in axes.values())
+    grid = np.meshgrid(*[np.arange(n) for n in shape], indexing="ij")
+    # Linha 0: o registro como veio; linhas 1..n: os pontos da grade.
+    columns = {
+        name: np.concatenate([np.asarray([record[name]], dtype=values.dtype), values[index.ravel()]])
+        for (name, values), index in zip(axes.items(), grid)
+    }
+    n_rows = int(np.prod(shape)) + 1
+
+    if current.compiled is not None:
+        proba = current.compiled.predict_proba(current.compiled.transform_sweep(record, columns, n_rows))
+    else:
+        frame = pd.DataFrame([record] * n_rows, columns=current.features).assign(**columns)
+        proba = current.model.predict_proba(frame)
+    return proba[0], proba[1:].reshape(shape + (proba.shape[1],))
+
+
+def sweep_output(record, axes, baseline, surface, classes):
+    classes = [str(c) for c in classes]
+    labels = np.asarray(classes, dtype=object)[surface.argmax(axis=-1)]
+    return {
+        "features": list(axes),
+        "values": {name: values.tolist() for name, values in axes.items()},
+        "classes": classes,
+        "baseline": {
+            "values": {name: record[name] for name in axes},
+            "prediction": classes[int(np.argmax(baseline))],
+            "probabilities": {c: float(p) for c, p in zip(classes, baseline)},
+        },
+        "prediction": labels.tolist(),
+        "probabilities": {
+            c: np.round(surface[..., k], DECIMALS).tolist() for k, c in enumerate(classes)
+        },
+    }
@@ -0,0 +1,235 @@
+"""
+Motor de avaliação em arrays para o GradientBoostingClassifier.
+
+Todas as árvores do ensemble (100 estágios x 7 classes = 700 DecisionTreeRegressor no
+modelo do notebook) são empacotadas em arrays NumPy contíguos: feature, limiar, filho
+esquerdo, filho direito e valor de cada nó. A avaliação percorre todas as árvores para
+o lote inteiro nível a nível, com indexação vetorizada, em vez de visitar cada objeto
+de árvore separadamente.
+
+Folhas apontam para si mesmas (feature 0, limiar +inf), então basta avançar
+`max_depth` passos para que todas as linhas cheguem a uma folha.
+
+Cada nó guarda também o valor esperado da sua subárvore (média dos valores das folhas
+abaixo dele, ponderada pelas amostras de treino). Com isso, `contributions` atribui a
+cada feature a soma das variações de valor esperado nos nós em que ela decidiu o
+caminho (atribuição por caminho, à la Saabas), no mesmo passo nível a nível da predição.
+
+Executar `python trees.py` verifica a paridade com `model.predict_proba` sobre o
+`obesity.csv`.
+"""
+
+import numpy as np
+
+# Blocos pequenos mantêm a matriz (linhas x árvores) de índices no cache da CPU.
+DEFAULT_EVAL_CHUNK = 128
+
+
+class PackedTrees:
+    """Ensemble de árvores de regressão empacotado em arrays planos."""
+
+    def __init__(self, feature, threshold, left, right, value, roots,
+                 classes, learning_rate, init_raw, depth, expected=None):
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int32)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.classes_ = np.asarray(classes)
+        self.learning_rate = float(learning_rate)
+        self.init_raw = np.asarray(init_raw, dtype=np.float64)
+        self.depth = int(depth)
+        # Valor esperado da subárvore de cada nó (None: sem atribuições).
+        self.expected = None if expected is None else np.asarray(expected, dtype=np.float64)
+
+        # Limiar arredondado para baixo em float32: x <= t  <=>  x <= t32 para x em float32,
+        # o que evita promover o lote inteiro para float64 a cada nível.
+        self.threshold32 = self.threshold.astype(np.float32)
+        rounded_up = self.threshold32.astype(np.float64) > self.threshold
+        self.threshold32[rounded_up] = np.nextafter(self.threshold32[rounded_up], np.float32(-np.inf))
+
+        # children[2 * no + 1] é o filho esquerdo e children[2 * no] o direito.
+        self.children = np.stack([self.right, self.left], axis=1).ravel()
+
+        # Multiclasse: uma árvore por classe em cada estágio; binário: uma só.
+        self.n_tree_outputs = 1 if len(self.classes_) == 2 else len(self.classes_)
+        self.n_stages = len(self.roots) // self.n_tree_outputs
+
+    # =====================================================
+    # EXPORTAÇÃO A PARTIR DO SKLEARN
+    # =====================================================
+    @classmethod
+    def from_estimator(cls, estimator):
+        """Empacota um GradientBoostingClassifier treinado."""
+        from sklearn.ensemble import GradientBoostingClassifier
+
+        if not isinstance(estimator, GradientBoostingClassifier):
+            raise TypeError("expected a fitted GradientBoostingClassifier")
+        if estimator.loss != "log_loss":
+            raise TypeError(f"unsupported loss: {estimator.loss}")
+
+        features, thresholds, lefts, rights, values, roots, expected = [], [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for stage in estimator.estimators_:
+            for regressor in stage:
+                tree = regressor.tree_
+                n_nodes = tree.node_count
+                is_leaf = tree.children_left == -1
+                node_ids = np.arange(offset, offset + n_nodes, dtype=np.int32)
+
+                features.append(np.where(is_leaf, 0, tree.feature))
+                thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+                lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+                rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+                values.append(tree.value[:, 0, 0])
+                expected.append(_subtree_means(tree))
+                roots.append(offset)
+
+                depth = max(depth, tree.max_depth)
+                offset += n_nodes
+
+        packed = cls(
+            np.concatenate(features), np.concatenate(thresholds),
+            np.concatenate(lefts), np.concatenate(rights), np.concatenate(values),
+            roots, estimator.classes_, estimator.learning_rate,
+            np.zeros(1 if len(estimator.classes_) == 2 else len(estimator.classes_)),
+            depth, np.concatenate(expected),
+        )
+
+        # O valor inicial (prior do init_) é o que sobra da decision_function sem as árvores.
+        X0 = np.zeros((1, estimator.n_features_in_))
+        raw = np.asarray(estimator.decision_function(X0), dtype=np.float64).reshape(1, -1)
+        packed.init_raw = (raw - packed._tree_sum(X0))[0]
+        return packed
+
+    # =====================================================
+    # AVALIAÇÃO VETORIZADA
+    # =====================================================
+    def apply(self, X):
+        """Índice da folha alcançada por cada linha em cada árvore, shape (n, n_trees)."""
+        # Mesmo cast do sklearn: as árvores comparam as features em float32.
+        X32 = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X32.shape
+        flat = X32.ravel()
+        row_base = (np.arange(n_rows, dtype=np.int32) * n_features)[:, None]
+
+        node = np.broadcast_to(self.roots, (n_rows, len(self.roots))).copy()
+        for _ in range(self.depth):
+            go_left = flat.take(row_base + self.feature.take(node)) <= self.threshold32.take(node)
+            node = self.children.take(node * 2 + go_left)
+        return node
+
+    def contributions(self, X, chunk_size=DEFAULT_EVAL_CHUNK):
+        """Atribuição por caminho do score bruto a cada coluna de X.
+
+        Devolve (bias, contrib), com bias shape (n_outputs,) e contrib shape
+        (n, n_outputs, n_features), tais que `bias + contrib.sum(axis=2)` é a
+        `decision_function(X)`.
+        """
+        if self.expected is None:
+            raise TypeError("packed trees have no node expectations for attributions")
+        X = np.asarray(X)
+        n_rows, n_features = X.shape
+        n_out = self.n_tree_outputs
+        tree_output = np.arange(len(self.roots), dtype=np.int64) % n_out
+        contrib = np.empty((n_rows, n_out, n_features), dtype=np.float64)
+
+        for start in range(0, n_rows, chunk_size):
+            X32 = np.ascontiguousarray(X[start:start + chunk_size], dtype=np.float32)
+            m = len(X32)
+            flat = X32.ravel()
+            row_base = (np.arange(m, dtype=np.int32) * n_features)[:, None]
+            # Posição (linha, saída, 0) de cada árvore no acumulador achatado.
+            slot = ((np.arange(m, dtype=np.int64)[:, None] * n_out + tree_output) * n_features).ravel()
+
+            total = np.zeros(m * n_out * n_features, dtype=np.float64)
+            node = np.broadcast_to(self.roots, (m, len(self.roots))).copy()
+            for _ in range(self.depth):
+                feature = self.feature.take(node)
+                go_left = flat.take(row_base + feature) <= self.threshold32.take(node)
+                child = self.children.take(node * 2 + go_left)
+                # Em folhas o filho é o próprio nó: variação zero.
+                delta = self.expected.take(child) - self.expected.take(node)
+                total += np.bincount(slot + feature.ravel(), weights=delta.ravel(), minlength=len(total))
+                node = child
+            contrib[start:start + m] = total.reshape(m, n_out, n_features)
+
+        contrib *= self.learning_rate
+        root_means = self.expected.take(self.roots).reshape(self.n_stages, n_out)
+        bias = self.init_raw + self.learning_rate * root_means.sum(axis=0)
+        return bias, contrib
+
+    def _tree_sum(self, X):
+        leaves = self.value.take(self.apply(X))
+        per_stage = leaves.reshape(len(X), self.n_stages, self.n_tree_outputs)
+        return self.learning_rate * per_stage.sum(axis=1)
+
+    def decision_function(self, X, chunk_size=DEFAULT_EVAL_CHUNK):
+        X = np.asarray(X)
+        raw = np.empty((len(X), self.n_tree_outputs), dtype=np.float64)
+        for start in range(0, len(X), chunk_size):
+            stop = start + chunk_size
+            raw[start:stop] = self.init_raw + self._tree_sum(X[start:stop])
+        return raw
+
+    def predict_proba(self, X):
+        raw = self.decision_function(X)
+        if self.n_tree_outputs == 1:
+            positive = 1.0 / (1.0 + np.exp(-raw[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+        raw = raw - raw.max(axis=1, keepdims=True)
+        exp = np.exp(raw)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def _subtree_means(tree):
+    """Valor esperado de cada nó: média das folhas abaixo dele, ponderada pelas amostras.
+
+    Nas folhas é o próprio valor (o GradientBoosting reajusta só as folhas, então os
+    valores dos nós internos guardados pelo sklearn não servem)."""
+    left, right = tree.children_left, tree.children_right
+    weight = tree.weighted_n_node_samples
+    means = tree.value[:, 0, 0].astype(np.float64).copy()
+    # Filhos têm índice maior que o pai (pré-ordem): de trás para frente, os filhos já estão prontos.
+    for node in range(tree.node_count - 1, -1, -1):
+        l, r = left[node], right[node]
+        if l != -1:
+            w = weight[l] + weight[r]
+            means[node] = (weight[l] * means[l] + weight[r] * means[r]) / w if w else 0.5 * (means[l] + means[r])
+    return means
+
+
+def check_parity(estimator, packed, X):
+    """Compara o motor empacotado com `estimator.predict_proba` sobre a matriz X."""
+    expected = estimator.predict_proba(X)
+    proba = packed.predict_proba(X)
+    return {
+        "rows": len(X),
+        "trees": len(packed.roots),
+        "label_mismatches": int((proba.argmax(axis=1) != expected.argmax(axis=1)).sum()),
+        "max_proba_diff": float(np.abs(proba - expected).max()),
+    }
+
+
+if __name__ == "__main__":
+    import os
+
+    import joblib
+    import pandas as pd
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    pipeline = joblib.load(os.path.join(base_dir, "obesity_model.pkl"))
+    df = pd.read_csv(os.path.join(base_dir, "obesity.csv"))
+
+    preprocessor, estimator = pipeline.steps[0][1], pipeline.steps[-1][1]
+    X = np.asarray(preprocessor.transform(df[list(pipeline.feature_names_in_)]))
+
+    report = check_parity(estimator, PackedTrees.from_estimator(estimator), X)
+    print(report)
+    if report["label_mismatches"] or report["max_proba_diff"] > 1e-9:
+        raise SystemExit("packed trees diverge from model.predict_proba")
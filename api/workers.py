@@ -0,0 +1,57 @@
+"""
+Threads de fundo por processo, seguras para o fork dos workers do Gunicorn.
+
+Com `preload_app`, os objetos da API (micro-lotes, modo sombra, monitor de drift) são
+criados no master e herdados pelos workers, mas as threads não sobrevivem ao fork.
+`ProcessThread` guarda o pid em que a thread foi criada e a recria sob demanda: num
+processo novo ou quando a anterior morreu. Uma exceção que escape do alvo é registrada
+no log em vez de matar a thread em silêncio.
+"""
+
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessThread:
+    """Uma thread daemon por processo, (re)criada sob demanda."""
+
+    def __init__(self, name):
+        self.name = name
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def running(self):
+        """Há uma thread viva criada neste processo?"""
+        return self._pid == os.getpid() and self._thread is not None and self._thread.is_alive()
+
+    def ensure(self, target, *args, setup=None):
+        """Sobe `target(*args)` se não houver thread viva neste processo; True se subiu.
+
+        `setup` roda antes da thread nova, sob a mesma trava (ex.: recriar a fila).
+        """
+        if self.running():
+            return False
+        with self._lock:
+            if self.running():
+                return False
+            if setup is not None:
+                setup()
+            self.start(target, *args)
+            return True
+
+    def start(self, target, *args):
+        """Sobe uma thread nova sem verificar a atual (quem chama cuida da trava)."""
+        self._thread = threading.Thread(target=self._guarded, args=(target, args), daemon=True,
+                                        name=self.name)
+        self._pid = os.getpid()
+        self._thread.start()
+
+    def _guarded(self, target, args):
+        try:
+            target(*args)
+        except Exception:
+            logger.exception("background thread %s died; it restarts on next use", self.name)
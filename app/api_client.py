@@ -0,0 +1,151 @@
+"""
+Cliente HTTP compartilhado para a API de predição.
+
+Uma única instância por processo (via `st.cache_resource`) mantém uma `requests.Session`
+com pool de conexões keep-alive, aplica timeouts de conexão e leitura, repete com
+backoff exponencial em erros 5xx e falhas de conexão, aquece a API em segundo plano
+no carregamento da página (o Render gratuito hiberna) e registra a latência de ida e
+volta de cada chamada.
+
+Este arquivo é idêntico em `app/` e `frontend/`.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "30"))
+MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.getenv("API_BACKOFF_FACTOR", "0.5"))
+POOL_SIZE = int(os.getenv("API_POOL_SIZE", "10"))
+
+# Intervalo mínimo entre aquecimentos; abaixo disso a API ainda deve estar acordada.
+WARM_UP_INTERVAL = float(os.getenv("API_WARM_UP_INTERVAL", "300"))
+
+LATENCY_WINDOW = 50
+
+
+class ApiClient:
+    """Sessão keep-alive com timeouts, retries e registro de latência."""
+
+    def __init__(self, predict_url):
+        self.predict_url = predict_url
+        self.base_url = predict_url.rsplit("/predict", 1)[0] + "/"
+        self.timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+        # /predict é idempotente, então POST também pode ser repetido com segurança.
+        retry = Retry(
+            total=MAX_RETRIES,
+            connect=MAX_RETRIES,
+            read=MAX_RETRIES,
+            status=MAX_RETRIES,
+            backoff_factor=BACKOFF_FACTOR,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "POST"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.latencies_ms = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self._warm_up_thread = None
+        self._last_warm_up = None
+        self.warm = False
+
+    # =====================================================
+    # CHAMADAS
+    # =====================================================
+    def _request(self, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.session.request(method, url, timeout=self.timeout, **kwargs)
+        finally:
+            with self._lock:
+                self.latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    def predict(self, record):
+        """POST /predict; devolve (resposta, latência em ms) desta chamada.
+
+        A latência volta com a resposta, e não num atributo, porque a instância é
+        compartilhada por todas as sessões. Levanta requests.RequestException após
+        esgotar os retries.
+        """
+        start = time.perf_counter()
+        response = self._request("POST", self.predict_url, json=record)
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.warm = True
+        return response, latency_ms
+
+    def explain(self, record):
+        """POST /explain: contribuição de cada campo para a classe prevista."""
+        return self._request("POST", self.base_url + "explain", json=record)
+
+    def sweep(self, record, features, points=None):
+        """POST /predict/sweep: probabilidades do registro variando um ou dois campos."""
+        options = {} if points is None else {"points": points}
+        return self._request(
+            "POST", self.base_url + "predict/sweep",
+            json={"record": record, "sweep": {name: options for name in features}}
+        )
+
+    def fetch_rows(self, offset):
+        """GET /data?offset=N: linhas do dataset da API a partir da posição N.
+
+        O dataset da API só cresce (ingestão append-only), então quem já tem N linhas
+        busca apenas o delta.
+        """
+        response = self._request("GET", self.base_url + "data", params={"offset": offset})
+        response.raise_for_status()
+        return response.json()
+
+    def drift(self):
+        """GET /drift: drift das entradas e das predições em relação ao dataset de treino."""
+        response = self._request("GET", self.base_url + "drift")
+        response.raise_for_status()
+        return response.json()
+
+    # =====================================================
+    # AQUECIMENTO EM SEGUNDO PLANO
+    # =====================================================
+    def warm_up(self):
+        """Dispara um GET / em background, no máximo uma vez por WARM_UP_INTERVAL."""
+        now = time.monotonic()
+        with self._lock:
+            if self._warm_up_thread is not None and self._warm_up_thread.is_alive():
+                return
+            if self._last_warm_up is not None and now - self._last_warm_up < WARM_UP_INTERVAL:
+                return
+            self._last_warm_up = now
+            self._warm_up_thread = threading.Thread(target=self._warm_up, daemon=True)
+            self._warm_up_thread.start()
+
+    def _warm_up(self):
+        try:
+            self.warm = self._request("GET", self.base_url).ok
+        except requests.exceptions.RequestException:
+            self.warm = False
+
+    # =====================================================
+    # LATÊNCIA
+    # =====================================================
+    def latency_summary(self):
+        with self._lock:
+            last = self.latencies_ms[-1] if self.latencies_ms else None
+            samples = sorted(self.latencies_ms)
+        if not samples:
+            return None
+        return {
+            "last_ms": last,
+            "median_ms": samples[len(samples) // 2],
+            "max_ms": samples[-1],
+            "count": len(samples),
+        }
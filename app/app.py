@@ -23,7 +23,12 @@ import pandas as pd
 import numpy as np
 import requests
 import os
-import plotly.express as px
+import threading
+import time
+
+from api_client import ApiClient
+from columnar import load_dataset
+from cube import DashboardCube
 
 # =====================================================
 # CONFIGURAÇÃO
@@ -33,6 +38,19 @@ st.set_page_config(page_title="Sistema Estratégico de Obesidade", layout="wide"
 st.title("🏥 Sistema Estratégico de Análise de Obesidade")
 st.markdown("Plataforma de apoio à decisão clínica baseada em Machine Learning e análise populacional.")
 
+# =====================================================
+# CLIENTE DA API
+# =====================================================
+API_URL = os.getenv("API_URL", "http://api:5000/predict")
+
+
+@st.cache_resource
+def get_api_client():
+    return ApiClient(API_URL)
+
+api_client = get_api_client()
+api_client.warm_up()
+
 # =====================================================
 # MAPAS DE TRADUÇÃO
 # =====================================================
@@ -66,161 +84,450 @@ obesity_map_pt = {
     "Obesity_Type_III": "Obesidade Tipo III"
 }
 
+# Rótulos dos campos nas explicações da predição.
+campos_pt = {
+    "Gender": "Gênero",
+    "Age": "Idade",
+    "Height": "Altura",
+    "Weight": "Peso",
+    "family_history": "Histórico familiar",
+    "FAVC": "Alimentos calóricos",
+    "FCVC": "Consumo de vegetais",
+    "NCP": "Refeições por dia",
+    "CAEC": "Alimentação entre refeições",
+    "SMOKE": "Tabagismo",
+    "CH2O": "Consumo de água",
+    "SCC": "Monitora calorias",
+    "FAF": "Atividade física",
+    "TUE": "Tempo de tela",
+    "CALC": "Consumo de álcool",
+    "MTRANS": "Meio de transporte"
+}
+
+
+def mostrar_explicacao(explicacao, n=6):
+    """Campos que mais pesaram na classificação (contribuições do `/explain`)."""
+    principais = explicacao["contributions"][:n]
+    st.markdown("**Fatores que mais influenciaram a classificação**")
+    st.bar_chart(
+        pd.DataFrame({
+            "Campo": [campos_pt.get(c["feature"], c["feature"]) for c in principais],
+            "Contribuição": [c["value"] for c in principais]
+        }),
+        x="Campo",
+        y="Contribuição",
+        horizontal=True,
+        sort=False
+    )
+    st.caption("Valores positivos aproximam o paciente da classe prevista; negativos o afastam.")
+
+
+# Campos que a simulação "e se?" pode variar (/predict/sweep).
+CAMPOS_SIMULACAO = ["FAF", "CH2O", "FCVC", "NCP", "TUE", "Weight"]
+
+
+def mostrar_simulacao(simulacao):
+    """Curva de probabilidades (um campo) ou mapa de calor (dois campos) do /predict/sweep."""
+    campos = simulacao["features"]
+    base = simulacao["baseline"]
+    classes_pt = [obesity_map_pt.get(c, c) for c in simulacao["classes"]]
+    atual = ", ".join(f"{campos_pt[c]} = {base['values'][c]:g}" for c in campos)
+
+    if len(campos) == 1:
+        campo = campos[0]
+        curvas = pd.DataFrame(
+            {nome: simulacao["probabilities"][c] for nome, c in zip(classes_pt, simulacao["classes"])},
+            index=pd.Index(simulacao["values"][campo], name=campos_pt[campo])
+        )
+        st.line_chart(curvas, x_label=campos_pt[campo], y_label="Probabilidade")
+    else:
+        import plotly.graph_objects as go
+
+        # Probabilidade da classe prevista hoje em cada combinação; o rótulo de cada
+        # célula é a classe que o modelo preveria nela.
+        linha, coluna = campos
+        fig = go.Figure(
+            data=[go.Heatmap(
+                z=simulacao["probabilities"][base["prediction"]],
+                x=simulacao["values"][coluna],
+                y=simulacao["values"][linha],
+                text=[[obesity_map_pt.get(c, c) for c in previsoes] for previsoes in simulacao["prediction"]],
+                colorscale="Blues",
+                colorbar={"title": "Prob."},
+                hovertemplate=(
+                    f"{campos_pt[linha]}=%{{y:g}}<br>{campos_pt[coluna]}=%{{x:g}}"
+                    "<br>Prevista: %{text}<br>Prob. da classe atual: %{z:.0%}<extra></extra>"
+                )
+            )],
+            layout={
+                "xaxis_title": campos_pt[coluna],
+                "yaxis_title": campos_pt[linha],
+                "title": f"Probabilidade de {obesity_map_pt.get(base['prediction'], base['prediction'])}"
+            }
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    mudancas = sorted({c for previsoes in np.atleast_2d(simulacao["prediction"]) for c in previsoes} - {base["prediction"]})
+    st.caption(
+        f"Valores atuais: {atual} → {obesity_map_pt.get(base['prediction'], base['prediction'])}. "
+        + (f"Na faixa simulada, a classificação pode mudar para: "
+           f"{', '.join(obesity_map_pt.get(c, c) for c in mudancas)}." if mudancas
+           else "A classificação não muda na faixa simulada.")
+    )
+
+
 # =====================================================
 # CARREGAR DADOS
 # =====================================================
+# Intervalo mínimo (s) entre buscas de linhas novas na API (GET /data?offset=N); 0 desativa.
+DASHBOARD_SYNC_INTERVAL = float(os.getenv("DASHBOARD_SYNC_INTERVAL", "30"))
+
+
+def add_derived(df):
+    """IMC e nível traduzido; o IMC que já vem calculado da API é mantido."""
+    if "IMC" not in df:
+        df["IMC"] = df["Weight"] / (df["Height"] ** 2)
+    df["Nível de Obesidade"] = df["Obesity"].map(obesity_map_pt)
+    return df
+
+
 @st.cache_data
 def load_data():
     base_dir = os.path.dirname(os.path.abspath(__file__))
     data_path = os.path.join(base_dir, "obesity.csv")
-    return pd.read_csv(data_path)
+    # Colunas derivadas calculadas uma vez, dentro do cache, e não a cada rerun.
+    return add_derived(load_dataset(data_path))
 
 df = load_data()
-df["IMC"] = df["Weight"] / (df["Height"] ** 2)
-df["Nível de Obesidade"] = df["Obesity"].map(obesity_map_pt)
+
+# Colunas dos painéis: contagens por valor (barras) e histogramas finos (box-plots).
+COLUNAS_HIST = ["family_history", "FAVC", "CAEC", "CALC", "SMOKE", "SCC", "MTRANS", "Gender"]
+COLUNAS_BOX = ["IMC", "Age", "FCVC", "NCP", "CH2O", "FAF", "TUE"]
+NIVEIS_OBESIDADE = [obesity_map_pt[k] for k in obesity_map_pt if "Obesity" in k]
+
+
+@st.cache_resource
+def load_cube():
+    return DashboardCube(
+        df,
+        level_column="Nível de Obesidade",
+        levels=list(obesity_map_pt.values()),
+        categorical_columns=COLUNAS_HIST,
+        numeric_columns=COLUNAS_BOX
+    )
+
+cube = load_cube()
+
+
+@st.cache_resource
+def get_cube_lock():
+    return threading.Lock()
+
+cube_lock = get_cube_lock()
+
+
+def sync_cube():
+    """Soma ao cubo as linhas ingeridas na API desde a última busca.
+
+    O cubo começa com o `obesity.csv` local, que é o mesmo dataset base da API, então
+    `cube.rows` é a posição a partir da qual pedir o delta.
+    """
+    if DASHBOARD_SYNC_INTERVAL <= 0 or not api_client.warm:
+        return
+    if not cube_lock.acquire(blocking=False):
+        return
+    try:
+        now = time.monotonic()
+        if now - getattr(cube, "synced_at", 0.0) < DASHBOARD_SYNC_INTERVAL:
+            return
+        cube.synced_at = now
+        try:
+            novas = api_client.fetch_rows(cube.rows)
+        except (requests.exceptions.RequestException, ValueError):
+            return
+        if novas:
+            cube.append(add_derived(pd.DataFrame(novas)))
+    finally:
+        cube_lock.release()
+
+sync_cube()
+
+
+# =====================================================
+# FIGURAS DO PAINEL (CACHE)
+# =====================================================
+# Figuras prontas por estado dos filtros, compartilhadas entre sessões: a visão sem
+# filtro é montada uma vez por processo e um filtro já visitado não refaz os gráficos.
+# `linhas` (tamanho do cubo) troca a chave quando chegam linhas novas da API, e o
+# max_entries limita a memória (LRU). O plotly só é importado quando um gráfico é
+# montado, então quem fica no formulário de predição não paga por ele.
+DASHBOARD_FIGURE_CACHE_SIZE = int(os.getenv("DASHBOARD_FIGURE_CACHE_SIZE", "256"))
+
+
+@st.cache_resource(max_entries=DASHBOARD_FIGURE_CACHE_SIZE, show_spinner=False)
+def figura_hist(coluna, idade_min, idade_max, genero, linhas):
+    # Traços montados direto (sem plotly.express, que custa ~70 ms por figura).
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    contagens = cube.select(idade_min, idade_max, genero).counts_frame(coluna)
+    cores = px.colors.sequential.Blues
+    barras = [
+        go.Bar(
+            name=nivel,
+            x=grupo[coluna].tolist(),
+            y=grupo["Contagem"].tolist(),
+            marker_color=cores[i % len(cores)],
+            hovertemplate=f"Nível de Obesidade={nivel}<br>{coluna}=%{{x}}<br>Contagem=%{{y}}<extra></extra>"
+        )
+        for i, (nivel, grupo) in enumerate(contagens.groupby("Nível de Obesidade", sort=False))
+    ]
+    return go.Figure(
+        data=barras,
+        layout={
+            "barmode": "group",
+            "xaxis_title": coluna,
+            "yaxis_title": "Contagem",
+            "legend_title_text": "Nível de Obesidade"
+        }
+    )
+
+
+@st.cache_resource(max_entries=DASHBOARD_FIGURE_CACHE_SIZE, show_spinner=False)
+def figura_box(coluna, idade_min, idade_max, genero, linhas):
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    cores = px.colors.sequential.Blues
+    caixas = [
+        go.Box(
+            name=nivel,
+            x=[nivel],
+            q1=[stats["q1"]],
+            median=[stats["median"]],
+            q3=[stats["q3"]],
+            lowerfence=[stats["lowerfence"]],
+            upperfence=[stats["upperfence"]],
+            marker_color=cores[i % len(cores)]
+        )
+        for i, (nivel, stats) in enumerate(cube.select(idade_min, idade_max, genero).box_stats(coluna).items())
+    ]
+    return go.Figure(
+        data=caixas,
+        layout={
+            "xaxis_title": "Nível de Obesidade",
+            "yaxis_title": coluna,
+            "legend_title_text": "Nível de Obesidade"
+        }
+    )
 
 
 # =====================================================
-# ABAS
+# MONITORAMENTO (DRIFT)
 # =====================================================
-tab1, tab2 = st.tabs(["🔍 Predição Individual", "📊 Painel Analítico"])
+# Intervalo (s) em que o relatório do /drift é reaproveitado entre reruns.
+DRIFT_REFRESH_INTERVAL = float(os.getenv("DRIFT_REFRESH_INTERVAL", "30"))
+
+status_pt = {
+    "stable": "🟢 Estável",
+    "moderate": "🟡 Moderado",
+    "significant": "🔴 Significativo",
+    "insufficient_data": "⚪ Poucos dados"
+}
+
+
+@st.cache_data(ttl=DRIFT_REFRESH_INTERVAL, show_spinner=False)
+def carregar_drift():
+    return api_client.drift()
+
+
+# =====================================================
+# NAVEGAÇÃO
+# =====================================================
+# Uma seção por vez: ao contrário de st.tabs, que executa o conteúdo de todas as abas a
+# cada rerun, só a seção visível monta widgets e gráficos.
+SECAO_PREDICAO = "🔍 Predição Individual"
+SECAO_PAINEL = "📊 Painel Analítico"
+SECAO_MONITORAMENTO = "📡 Monitoramento do Modelo"
+
+# Widgets de seções ocultas perdem o estado; os valores do formulário e dos filtros
+# ficam em st.session_state (reatribuídos a cada rerun) e sobrevivem à troca de seção.
+VALORES_INICIAIS = {
+    "form_gender": "Masculino",
+    "form_age": 30,
+    "form_height": 1.70,
+    "form_weight": 70.0,
+    "form_family_history": "Sim",
+    "form_favc": "Sim",
+    "form_fcvc": 2.0,
+    "form_ncp": 3.0,
+    "form_caec": "Não",
+    "form_ch2o": 2.0,
+    "form_calc": "Não",
+    "form_smoke": "Sim",
+    "form_scc": "Sim",
+    "form_faf": 1.0,
+    "form_tue": 1.0,
+    "form_mtrans": "Transporte Público",
+    "form_simulacao": ["FAF", "CH2O"],
+    "filtro_idade": tuple(cube.age_range),
+    "filtro_genero": "Todos"
+}
+for chave, valor in VALORES_INICIAIS.items():
+    st.session_state[chave] = st.session_state.get(chave, valor)
+
+secao = st.radio(
+    "Seção",
+    [SECAO_PREDICAO, SECAO_PAINEL, SECAO_MONITORAMENTO],
+    horizontal=True,
+    label_visibility="collapsed"
+)
 
 # =====================================================
 # 🔍 PREDIÇÃO INDIVIDUAL
 # =====================================================
-with tab1:
+if secao == SECAO_PREDICAO:
 
     st.header("Avaliação Clínica Individual")
 
     st.subheader("1️⃣ Dados Corporais")
-    gender_pt = st.selectbox("Gênero", ["Masculino", "Feminino"])
-    age = st.number_input("Idade", 0, 120, 30)
-    height = st.number_input("Altura (m)", 1.0, 2.5, 1.70)
-    weight = st.number_input("Peso (kg)", 30.0, 300.0, 70.0)
+    gender_pt = st.selectbox("Gênero", ["Masculino", "Feminino"], key="form_gender")
+    age = st.number_input("Idade", 0, 120, key="form_age")
+    height = st.number_input("Altura (m)", 1.0, 2.5, key="form_height")
+    weight = st.number_input("Peso (kg)", 30.0, 300.0, key="form_weight")
 
     st.divider()
 
     st.subheader("2️⃣ Hábitos Alimentares")
-    family_history_pt = st.selectbox("Histórico familiar?", ["Sim", "Não"])
-    favc_pt = st.selectbox("Alimentos calóricos frequentes?", ["Sim", "Não"])
-    fcvc = st.slider("Consumo de vegetais (1=baixo, 3=alto)", 1.0, 3.0, 2.0)
-    ncp = st.slider("Refeições principais por dia", 1.0, 4.0, 3.0)
-    caec_pt = st.selectbox("Alimentação entre refeições", ["Não", "Às vezes", "Frequentemente", "Sempre"])
-    ch2o = st.slider("Consumo de água (1=baixo, 3=alto)", 1.0, 3.0, 2.0)
-    calc_pt = st.selectbox("Consumo de álcool", ["Não", "Às vezes", "Frequentemente", "Sempre"])
+    family_history_pt = st.selectbox("Histórico familiar?", ["Sim", "Não"], key="form_family_history")
+    favc_pt = st.selectbox("Alimentos calóricos frequentes?", ["Sim", "Não"], key="form_favc")
+    fcvc = st.slider("Consumo de vegetais (1=baixo, 3=alto)", 1.0, 3.0, key="form_fcvc")
+    ncp = st.slider("Refeições principais por dia", 1.0, 4.0, key="form_ncp")
+    caec_pt = st.selectbox("Alimentação entre refeições", ["Não", "Às vezes", "Frequentemente", "Sempre"], key="form_caec")
+    ch2o = st.slider("Consumo de água (1=baixo, 3=alto)", 1.0, 3.0, key="form_ch2o")
+    calc_pt = st.selectbox("Consumo de álcool", ["Não", "Às vezes", "Frequentemente", "Sempre"], key="form_calc")
 
     st.divider()
 
     st.subheader("3️⃣ Estilo de Vida")
-    smoke_pt = st.selectbox("Fuma?", ["Sim", "Não"])
-    scc_pt = st.selectbox("Monitora calorias?", ["Sim", "Não"])
-    faf = st.slider("Atividade física (0=nenhuma, 3=alta)", 0.0, 3.0, 1.0)
-    tue = st.slider("Tempo de tela (0=baixo, 2=alto)", 0.0, 2.0, 1.0)
+    smoke_pt = st.selectbox("Fuma?", ["Sim", "Não"], key="form_smoke")
+    scc_pt = st.selectbox("Monitora calorias?", ["Sim", "Não"], key="form_scc")
+    faf = st.slider("Atividade física (0=nenhuma, 3=alta)", 0.0, 3.0, key="form_faf")
+    tue = st.slider("Tempo de tela (0=baixo, 2=alto)", 0.0, 2.0, key="form_tue")
     mtrans_pt = st.selectbox("Meio de transporte",
-                             ["Transporte Público", "Caminhada", "Automóvel", "Motocicleta", "Bicicleta"])
+                             ["Transporte Público", "Caminhada", "Automóvel", "Motocicleta", "Bicicleta"],
+                             key="form_mtrans")
+
+    input_data = {
+        "Gender": gender_map[gender_pt],
+        "Age": age,
+        "Height": height,
+        "Weight": weight,
+        "family_history": yes_no_map[family_history_pt],
+        "FAVC": yes_no_map[favc_pt],
+        "FCVC": fcvc,
+        "NCP": ncp,
+        "CAEC": caec_map[caec_pt],
+        "SMOKE": yes_no_map[smoke_pt],
+        "CH2O": ch2o,
+        "SCC": yes_no_map[scc_pt],
+        "FAF": faf,
+        "TUE": tue,
+        "CALC": calc_map[calc_pt],
+        "MTRANS": mtrans_map[mtrans_pt]
+    }
 
     if st.button("🔎 Calcular Classificação"):
 
-        input_data = {
-            "Gender": gender_map[gender_pt],
-            "Age": age,
-            "Height": height,
-            "Weight": weight,
-            "family_history": yes_no_map[family_history_pt],
-            "FAVC": yes_no_map[favc_pt],
-            "FCVC": fcvc,
-            "NCP": ncp,
-            "CAEC": caec_map[caec_pt],
-            "SMOKE": yes_no_map[smoke_pt],
-            "CH2O": ch2o,
-            "SCC": yes_no_map[scc_pt],
-            "FAF": faf,
-            "TUE": tue,
-            "CALC": calc_map[calc_pt],
-            "MTRANS": mtrans_map[mtrans_pt]
-        }
-        API_URL = os.getenv("API_URL", "http://api:5000/predict")
         try:
-            response = requests.post(API_URL, json=input_data)
+            response, latencia_ms = api_client.predict(input_data)
 
             if response.status_code == 200:
-                prediction = response.json().get("prediction")
+                result = response.json()
+                prediction = result.get("prediction")
                 st.success(f"🎯 Classificação estimada: {prediction}")
+                probabilidades = result.get("probabilities")
+                if probabilidades:
+                    st.caption(f"Confiança do modelo: {probabilidades[prediction]:.0%}")
+                explicacao = api_client.explain(input_data)
+                if explicacao.status_code == 200:
+                    mostrar_explicacao(explicacao.json())
             else:
                 st.error(f"Erro na API: {response.status_code}")
-        
+            st.caption(f"⏱️ Tempo de resposta da API: {latencia_ms:.0f} ms")
+
         except requests.exceptions.RequestException as e:
             st.error("⚠️ Não foi possível conectar à API.")
             st.caption("A API pode estar iniciando (Render gratuito pode levar alguns segundos).")
 
+    st.divider()
+
+    st.subheader("🔁 Simulação: e se os hábitos mudassem?")
+    st.markdown("Varia um ou dois hábitos em toda a faixa do formulário, mantendo os demais dados do paciente.")
+    campos_simulacao = st.multiselect(
+        "Variáveis simuladas",
+        CAMPOS_SIMULACAO,
+        max_selections=2,
+        format_func=lambda campo: campos_pt[campo],
+        key="form_simulacao"
+    )
+
+    if campos_simulacao and st.button("🔁 Simular"):
+        try:
+            response = api_client.sweep(input_data, campos_simulacao)
+            if response.status_code == 200:
+                mostrar_simulacao(response.json())
+            else:
+                st.error(f"Erro na API: {response.status_code}")
+        except requests.exceptions.RequestException:
+            st.error("⚠️ Não foi possível conectar à API.")
+
 # =====================================================
 # 📊 DASHBOARD COMPLETO
 # =====================================================
-with tab2:
+elif secao == SECAO_PAINEL:
 
     st.header("Painel Estratégico de Saúde Populacional")
 
     # FILTROS
     st.sidebar.header("Filtros")
+    idade_lo, idade_hi = cube.age_range
     idade_min, idade_max = st.sidebar.slider(
         "Faixa Etária",
-        int(df["Age"].min()),
-        int(df["Age"].max()),
-        (int(df["Age"].min()), int(df["Age"].max()))
+        idade_lo,
+        idade_hi,
+        key="filtro_idade"
     )
 
-    genero = st.sidebar.selectbox("Gênero", ["Todos", "Male", "Female"])
-
-    df_filtrado = df[(df["Age"] >= idade_min) & (df["Age"] <= idade_max)].copy()
-
-    if genero != "Todos":
-        df_filtrado = df_filtrado[df_filtrado["Gender"] == genero]
+    genero = st.sidebar.selectbox("Gênero", ["Todos", "Male", "Female"], key="filtro_genero")
 
-    # SCORE
-    df_filtrado["risk_score"] = (
-        (df_filtrado["family_history"] == "yes").astype(int) * 2 +
-        (df_filtrado["FAF"] == 0).astype(int) * 2 +
-        (df_filtrado["TUE"] >= 1.5).astype(int) +
-        (df_filtrado["CH2O"] == 1).astype(int) +
-        (df_filtrado["FAVC"] == "yes").astype(int)
-    )
+    # Recorte do cubo pré-computado: soma de células, sem refiltrar o dataset.
+    recorte = cube.select(idade_min, idade_max, None if genero == "Todos" else genero)
 
     # KPIs
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("IMC Médio", round(df_filtrado["IMC"].mean(), 2))
-    col2.metric("Idade Média", round(df_filtrado["Age"].mean(), 1))
+    col1.metric("IMC Médio", round(recorte.mean("IMC"), 2))
+    col2.metric("Idade Média", round(recorte.mean("Age"), 1))
     col3.metric("% Obesidade",
-                f"{(df_filtrado['Obesity'].str.contains('Obesity').mean()*100):.1f}%")
+                f"{(recorte.share(NIVEIS_OBESIDADE)*100):.1f}%")
     col4.metric("Score Médio de Risco",
-                round(df_filtrado["risk_score"].mean(), 2))
+                round(recorte.mean_risk(), 2))
 
     st.divider()
 
-    # FUNÇÃO AUXILIAR PARA PAINÉIS
+    # PAINÉIS: figuras do cache, pelo estado dos filtros.
+    filtros = (idade_min, idade_max, None if genero == "Todos" else genero, cube.rows)
+
     def painel_hist(coluna, titulo, explicacao):
         st.subheader(titulo)
         st.markdown(explicacao)
-        fig = px.histogram(
-            df_filtrado,
-            x=coluna,
-            color="Nível de Obesidade",
-            barmode="group",
-            color_discrete_sequence=px.colors.sequential.Blues
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figura_hist(coluna, *filtros), use_container_width=True)
         st.divider()
 
     def painel_box(coluna, titulo, explicacao):
         st.subheader(titulo)
         st.markdown(explicacao)
-        fig = px.box(
-            df_filtrado,
-            x="Nível de Obesidade",
-            y=coluna,
-            color="Nível de Obesidade",
-            color_discrete_sequence=px.colors.sequential.Blues
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figura_box(coluna, *filtros), use_container_width=True)
         st.divider()
 
     # DISTRIBUIÇÕES
@@ -283,3 +590,115 @@ with tab2:
     painel_hist("Gender",
                 "📌 Distribuição por Gênero",
                 "Diferenças de prevalência entre homens e mulheres.")
+
+# =====================================================
+# 📡 MONITORAMENTO DO MODELO (DRIFT)
+# =====================================================
+elif secao == SECAO_MONITORAMENTO:
+    import plotly.express as px
+
+    st.header("Monitoramento de Drift e Qualidade dos Dados")
+    st.markdown(
+        "Compara as entradas recebidas pela API (e as classes previstas) com a distribuição "
+        "do dataset de treino, pelo PSI (*Population Stability Index*): abaixo de 0,1 a "
+        "população é estável, entre 0,1 e 0,25 há mudança moderada e acima de 0,25 a "
+        "mudança é significativa e o modelo deve ser reavaliado."
+    )
+
+    try:
+        relatorio = carregar_drift()
+    except (requests.exceptions.RequestException, ValueError):
+        relatorio = None
+        st.warning("⚠️ Não foi possível obter o monitoramento da API.")
+
+    if relatorio is not None and not relatorio.get("enabled"):
+        st.info("O monitoramento de drift está desativado na API (DRIFT_ENABLED=0).")
+    elif relatorio is not None:
+        janelas = {j["window_seconds"]: j for j in relatorio["windows"]}
+        segundos = st.radio(
+            "Janela",
+            list(janelas),
+            format_func=lambda s: f"Últimos {s // 60} min" if s < 3600 else f"Últimas {s / 3600:g} h",
+            horizontal=True
+        )
+        janela = janelas[segundos]
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Predições na Janela", janela["samples"])
+        col2.metric("Taxa de Rejeição", f"{janela['rejected_rate'] * 100:.1f}%")
+        col3.metric("PSI das Classes Previstas", f"{janela['prediction']['psi']:.3f}")
+        col4.metric("Campos com Drift", len(janela["drifted_features"]))
+
+        if janela["samples"] < relatorio["thresholds"]["min_samples"]:
+            st.caption(
+                f"Menos de {relatorio['thresholds']['min_samples']} predições na janela: "
+                "os índices ainda são pouco confiáveis."
+            )
+
+        st.divider()
+
+        st.subheader("📌 PSI por Campo")
+        psi_campos = pd.DataFrame([
+            {
+                "Campo": campos_pt.get(nome, nome),
+                "PSI": info["psi"],
+                "Situação": status_pt[info["status"]],
+                "Fora da Faixa do Treino": info.get("out_of_range")
+            }
+            for nome, info in janela["features"].items()
+        ]).sort_values("PSI", ascending=False)
+        fig = px.bar(
+            psi_campos,
+            x="PSI",
+            y="Campo",
+            color="Situação",
+            orientation="h",
+            color_discrete_map={
+                status_pt["stable"]: "#9ecae1",
+                status_pt["moderate"]: "#fdae6b",
+                status_pt["significant"]: "#e6550d",
+                status_pt["insufficient_data"]: "#d9d9d9"
+            }
+        )
+        fig.add_vline(x=relatorio["thresholds"]["moderate"], line_dash="dot")
+        fig.add_vline(x=relatorio["thresholds"]["significant"], line_dash="dash")
+        fig.update_layout(yaxis={"categoryorder": "total ascending"})
+        st.plotly_chart(fig, use_container_width=True)
+
+        st.subheader("📌 Distribuição Atual x Treino")
+        nomes = ["Classe prevista"] + list(janela["features"])
+        escolhido = st.selectbox(
+            "Variável",
+            nomes,
+            format_func=lambda nome: campos_pt.get(nome, nome)
+        )
+        info = janela["prediction"] if escolhido == "Classe prevista" else janela["features"][escolhido]
+        bins = info["bins"]
+        if escolhido == "Classe prevista":
+            bins = [obesity_map_pt.get(b, b) for b in bins]
+        comparacao = pd.DataFrame({
+            "Faixa": bins * 2,
+            "Proporção": info["expected"] + info["actual"],
+            "Origem": ["Treino"] * len(bins) + ["Janela atual"] * len(bins)
+        })
+        fig = px.bar(
+            comparacao,
+            x="Faixa",
+            y="Proporção",
+            color="Origem",
+            barmode="group",
+            color_discrete_sequence=px.colors.sequential.Blues[3::3]
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption(f"PSI: {info['psi']:.3f} — {status_pt[info['status']]}")
+
+        if janela["rejected_fields"]:
+            st.subheader("📌 Qualidade dos Dados")
+            st.markdown("Requisições rejeitadas pela validação da API, por campo com erro.")
+            st.dataframe(
+                pd.DataFrame({
+                    "Campo": [campos_pt.get(c, "Registro inválido") for c in janela["rejected_fields"]],
+                    "Rejeições": list(janela["rejected_fields"].values())
+                }),
+                hide_index=True
+            )
@@ -0,0 +1,256 @@
+"""
+Cubo de agregados pré-computados para o Painel Analítico.
+
+O dataset é reduzido uma única vez a células indexadas por (idade, gênero, nível de
+obesidade). Cada célula guarda contagens por valor de cada coluna categórica, um
+histograma fino de cada coluna numérica (de onde saem os quantis dos box-plots), a soma
+de cada coluna numérica (para as médias) e a soma do score de risco. Qualquer filtro de faixa etária e
+gênero do painel é respondido somando células, então o tempo de interação não depende
+do tamanho do dataset.
+
+Idades fracionárias (dados sintéticos) caem em meias-células: a chave é
+`2 * floor(idade) + (idade não inteira)`, de modo que o filtro inteiro
+`idade_min <= idade <= idade_max` corresponde exatamente ao intervalo de chaves
+`[2 * idade_min, 2 * idade_max]`.
+
+O cubo é aditivo: `append` soma as linhas novas (ingeridas na API) às células existentes,
+estendendo o eixo de idade e os valores categóricos quando preciso, sem recalcular o que
+já foi agregado. Os bins dos histogramas numéricos ficam fixos; valores novos fora da
+faixa original caem no primeiro ou no último bin (médias continuam exatas).
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BINS = 200
+
+
+def age_keys(age):
+    age = np.asarray(age, dtype=np.float64)
+    floor = np.floor(age)
+    return (2 * floor + (age != floor)).astype(np.int64)
+
+
+def risk_score(df):
+    """Score comportamental de risco do painel, linha a linha (usa a coluna
+    `risk_score` quando ela já vem calculada pela API)."""
+    if "risk_score" in df:
+        return df["risk_score"]
+    return (
+        (df["family_history"] == "yes").astype(int) * 2 +
+        (df["FAF"] == 0).astype(int) * 2 +
+        (df["TUE"] >= 1.5).astype(int) +
+        (df["CH2O"] == 1).astype(int) +
+        (df["FAVC"] == "yes").astype(int)
+    )
+
+
+class CubeView:
+    """Agregados de um recorte do cubo, já somados sobre idade e gênero."""
+
+    def __init__(self, cube, count, cat_counts, num_hist, num_sum, risk_sum):
+        self.cube = cube
+        self.count = count            # [nível]
+        self.cat_counts = cat_counts  # coluna -> [nível, valor]
+        self.num_hist = num_hist      # coluna -> [nível, bin]
+        self.num_sum = num_sum        # coluna -> [nível]
+        self.risk_sum = risk_sum      # [nível]
+
+    @property
+    def total(self):
+        return int(self.count.sum())
+
+    def mean(self, column):
+        return self.num_sum[column].sum() / self.total if self.total else float("nan")
+
+    def mean_risk(self):
+        return self.risk_sum.sum() / self.total if self.total else float("nan")
+
+    def share(self, levels):
+        mask = np.isin(self.cube.levels, list(levels))
+        return self.count[mask].sum() / self.total if self.total else float("nan")
+
+    def counts_frame(self, column):
+        """Contagens em formato longo (valor, nível, contagem) para gráficos de barras."""
+        if column == self.cube.level_column:
+            return pd.DataFrame({column: self.cube.levels, "Contagem": self.count})[self.count > 0]
+
+        counts = self.cat_counts[column]
+        values = self.cube.categories[column]
+        rows = [
+            (value, level, int(counts[i, j]))
+            for i, level in enumerate(self.cube.levels)
+            for j, value in enumerate(values)
+            if counts[i, j]
+        ]
+        return pd.DataFrame(rows, columns=[column, self.cube.level_column, "Contagem"])
+
+    def box_stats(self, column):
+        """Quartis, mediana e cercas (1,5 IQR) por nível, estimados do histograma."""
+        edges = self.cube.edges[column]
+        stats = {}
+        for i, level in enumerate(self.cube.levels):
+            hist = self.num_hist[column][i]
+            if not hist.sum():
+                continue
+            q1, median, q3 = _hist_quantiles(hist, edges, (0.25, 0.5, 0.75))
+            iqr = q3 - q1
+            centers = (edges[:-1] + edges[1:]) / 2
+            populated = centers[hist > 0]
+            inside = populated[(populated >= q1 - 1.5 * iqr) & (populated <= q3 + 1.5 * iqr)]
+            lower = inside.min() if len(inside) else q1
+            upper = inside.max() if len(inside) else q3
+            stats[level] = {
+                "q1": q1, "median": median, "q3": q3,
+                "lowerfence": float(min(lower, q1)), "upperfence": float(max(upper, q3)),
+            }
+        return stats
+
+
+class DashboardCube:
+    """Cubo (idade x gênero x nível) construído a partir do dataset e estendido com `append`."""
+
+    def __init__(self, df, level_column, levels, categorical_columns, numeric_columns,
+                 gender_column="Gender", bins=DEFAULT_BINS):
+        self.level_column = level_column
+        self.levels = list(levels)
+        self.gender_column = gender_column
+        self.genders = sorted(df[gender_column].astype(str).unique())
+        self.bins = bins
+        self.rows = 0
+
+        keys = age_keys(df["Age"])
+        self.key_min = int(keys.min())
+        shape = (int(keys.max()) - self.key_min + 1, len(self.genders), len(self.levels))
+
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.risk_sum = np.zeros(shape)
+
+        self.categories = {}
+        self.cat_counts = {}
+        for column in categorical_columns:
+            values = sorted(df[column].astype(str).unique())
+            self.categories[column] = values
+            self.cat_counts[column] = np.zeros(shape + (len(values),), dtype=np.int64)
+
+        self.edges = {}
+        self.num_hist = {}
+        self.num_sum = {}
+        for column in numeric_columns:
+            values = df[column].to_numpy(dtype=np.float64)
+            edges = np.linspace(values.min(), values.max(), bins + 1)
+            if edges[0] == edges[-1]:
+                edges = edges + np.linspace(-0.5, 0.5, bins + 1)
+            self.edges[column] = edges
+            self.num_hist[column] = np.zeros(shape + (bins,), dtype=np.int64)
+            self.num_sum[column] = np.zeros(shape)
+
+        self._accumulate(df)
+
+    # =====================================================
+    # ATUALIZAÇÃO INCREMENTAL
+    # =====================================================
+    def append(self, df):
+        """Soma ao cubo as linhas de `df` (mesmas colunas do dataset original)."""
+        if len(df):
+            self._grow_ages(age_keys(df["Age"]))
+            for column, values in self.categories.items():
+                new = sorted(set(df[column].astype(str).unique()) - set(values))
+                if new:
+                    values.extend(new)
+                    counts = self.cat_counts[column]
+                    self.cat_counts[column] = np.concatenate(
+                        [counts, np.zeros(counts.shape[:-1] + (len(new),), dtype=counts.dtype)], axis=-1
+                    )
+            self._accumulate(df)
+
+    def _grow_ages(self, keys):
+        before = max(self.key_min - int(keys.min()), 0)
+        after = max(int(keys.max()) - (self.key_min + self.count.shape[0] - 1), 0)
+        if not before and not after:
+            return
+
+        def pad(array):
+            return np.pad(array, [(before, after)] + [(0, 0)] * (array.ndim - 1))
+
+        self.key_min -= before
+        self.count = pad(self.count)
+        self.risk_sum = pad(self.risk_sum)
+        for arrays in (self.cat_counts, self.num_hist, self.num_sum):
+            for column in arrays:
+                arrays[column] = pad(arrays[column])
+
+    def _accumulate(self, df):
+        shape = self.count.shape
+        a = age_keys(df["Age"]) - self.key_min
+        g = pd.Categorical(df[self.gender_column].astype(str), categories=self.genders).codes
+        o = pd.Categorical(df[self.level_column].astype(str), categories=self.levels).codes
+        self.rows += len(df)
+        # Gêneros ou níveis fora do cubo ficam de fora, como no recorte do painel.
+        keep = (o >= 0) & (g >= 0)
+        a, g, o = a[keep], g[keep], o[keep]
+        df = df[keep]
+        cell = np.ravel_multi_index((a, g, o), shape)
+        n_cells = int(np.prod(shape))
+
+        self.count += np.bincount(cell, minlength=n_cells).reshape(shape)
+        self.risk_sum += np.bincount(cell, weights=risk_score(df), minlength=n_cells).reshape(shape)
+
+        for column, values in self.categories.items():
+            codes = pd.Categorical(df[column].astype(str), categories=values).codes
+            flat = cell * len(values) + codes
+            self.cat_counts[column] += np.bincount(
+                flat, minlength=n_cells * len(values)
+            ).reshape(shape + (len(values),))
+
+        bins = self.bins
+        for column, edges in self.edges.items():
+            values = df[column].to_numpy(dtype=np.float64)
+            b = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, bins - 1)
+            self.num_hist[column] += np.bincount(
+                cell * bins + b, minlength=n_cells * bins
+            ).reshape(shape + (bins,))
+            self.num_sum[column] += np.bincount(cell, weights=values, minlength=n_cells).reshape(shape)
+
+    @property
+    def age_range(self):
+        """(int(idade mínima), int(idade máxima)), como nos limites do slider."""
+        return self.key_min // 2, (self.key_min + self.count.shape[0] - 1) // 2
+
+    def select(self, age_min, age_max, gender=None):
+        """Soma as células do filtro `age_min <= idade <= age_max` (e gênero)."""
+        start = max(2 * int(age_min) - self.key_min, 0)
+        stop = max(2 * int(age_max) - self.key_min + 1, 0)
+        ages = slice(start, stop)
+        if gender is None:
+            genders = slice(None)
+        elif gender in self.genders:
+            genders = [self.genders.index(gender)]
+        else:
+            genders = []
+
+        def reduce(array):
+            return array[ages][:, genders].sum(axis=(0, 1))
+
+        return CubeView(
+            self,
+            reduce(self.count),
+            {c: reduce(v) for c, v in self.cat_counts.items()},
+            {c: reduce(v) for c, v in self.num_hist.items()},
+            {c: reduce(v) for c, v in self.num_sum.items()},
+            reduce(self.risk_sum),
+        )
+
+
+def _hist_quantiles(hist, edges, quantiles):
+    """Quantis interpolados linearmente dentro do bin (sketch de quantis)."""
+    cumulative = np.cumsum(hist)
+    total = cumulative[-1]
+    result = []
+    for q in quantiles:
+        target = q * total
+        b = int(np.searchsorted(cumulative, target, side="left"))
+        before = cumulative[b - 1] if b else 0
+        fraction = (target - before) / hist[b] if hist[b] else 0.0
+        result.append(float(edges[b] + fraction * (edges[b + 1] - edges[b])))
+    return result
@@ -0,0 +1,360 @@
+"""
+Benchmark e teste de carga da API de predição.
+
+1. Gera um corpus reprodutível (JSONL, uma requisição por linha) amostrando o
+   `obesity.csv`: registros de `/predict` (com leve ruído nas numéricas, para não virar
+   só acerto de cache), lotes de `/predict/batch` e consultas de `/data` com os filtros
+   e a paginação do painel. A mesma semente gera sempre o mesmo corpus.
+2. Reexecuta o corpus contra a API com N threads concorrentes, em três modos:
+   - `inprocess`: `app.test_client()` do Flask, sem rede (custo da aplicação);
+   - `socket`: servidor werkzeug numa porta local, via HTTP keep-alive;
+   - `--url`: uma API já rodando (ex.: Gunicorn ou docker-compose).
+3. Reporta vazão e latência p50/p95/p99 por endpoint e grava o resultado em JSON
+   (`benchmarks/results/<commit>-<modo>.json`) para comparar entre commits com
+   `--compare`.
+
+Uso:
+    python benchmarks/bench_api.py --mode inprocess socket --concurrency 8 --requests 2000
+    python benchmarks/bench_api.py --url http://localhost:5000 --compare benchmarks/results/abc1234-url.json
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+API_DIR = os.path.join(PROJECT_ROOT, "api")
+
+DEFAULT_DATA = os.path.join(API_DIR, "obesity.csv")
+DEFAULT_CORPUS = os.path.join(BENCH_DIR, "corpus.jsonl")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+TARGET = "Obesity"
+
+# Proporção de cada tipo de requisição no corpus.
+DEFAULT_MIX = {"predict": 0.8, "batch": 0.1, "data": 0.1}
+BATCH_SIZES = (8, 32, 128)
+DATA_LIMITS = (50, 200, 1000)
+
+
+# =====================================================
+# CORPUS
+# =====================================================
+def _predict_record(row, numeric_stats, rng, jitter):
+    record = {}
+    for column, value in row.items():
+        if column in numeric_stats and jitter:
+            std, low, high = numeric_stats[column]
+            value = round(float(np.clip(value + rng.normal(0, jitter * std), low, high)), 4)
+        elif isinstance(value, (np.integer, np.floating)):
+            value = value.item()
+        record[column] = value
+    return record
+
+
+def _data_query(df, rng):
+    levels = sorted(df[TARGET].unique())
+    query = {"format": str(rng.choice(["json", "json", "ndjson", "csv"]))}
+    if rng.random() < 0.5:
+        query["limit"] = int(rng.choice(DATA_LIMITS))
+        query["offset"] = int(rng.integers(0, len(df)))
+    if rng.random() < 0.6:
+        age_min = int(rng.integers(14, 40))
+        query["age_min"] = age_min
+        query["age_max"] = int(rng.integers(age_min, 62))
+    if rng.random() < 0.4:
+        query["gender"] = str(rng.choice(["Male", "Female"]))
+    if rng.random() < 0.3:
+        query["obesity"] = ",".join(rng.choice(levels, size=2, replace=False))
+    return query
+
+
+def build_corpus(data_path=DEFAULT_DATA, n=2000, seed=42, jitter=0.05, mix=None):
+    """Lista de requisições {"endpoint", "method", "path", "json"|"query"}."""
+    mix = mix or DEFAULT_MIX
+    rng = np.random.default_rng(seed)
+    df = pd.read_csv(data_path)
+    features = df.drop(columns=[TARGET])
+    numeric = features.select_dtypes(include="number")
+    numeric_stats = {c: (numeric[c].std(), numeric[c].min(), numeric[c].max()) for c in numeric}
+    records = features.to_dict("records")
+
+    def sample_record():
+        return _predict_record(records[rng.integers(len(records))], numeric_stats, rng, jitter)
+
+    kinds = rng.choice(list(mix), size=n, p=np.array(list(mix.values())) / sum(mix.values()))
+    corpus = []
+    for kind in kinds:
+        if kind == "predict":
+            corpus.append({"endpoint": "/predict", "method": "POST", "path": "/predict",
+                           "json": sample_record()})
+        elif kind == "batch":
+            size = int(rng.choice(BATCH_SIZES))
+            corpus.append({"endpoint": "/predict/batch", "method": "POST", "path": "/predict/batch",
+                           "json": [sample_record() for _ in range(size)]})
+        else:
+            corpus.append({"endpoint": "/data", "method": "GET", "path": "/data",
+                           "query": _data_query(df, rng)})
+    return corpus
+
+
+def write_corpus(corpus, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for entry in corpus:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def read_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def corpus_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+# =====================================================
+# CLIENTES
+# =====================================================
+class InProcessClient:
+    """Flask test client: mede a aplicação sem rede nem servidor."""
+
+    def __init__(self, flask_app):
+        self._local = threading.local()
+        self.app = flask_app
+
+    def send(self, entry):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        if entry["method"] == "GET":
+            response = client.get(entry["path"], query_string=entry.get("query"))
+        else:
+            response = client.post(entry["path"], json=entry.get("json"))
+        response.get_data()
+        return response.status_code
+
+
+class HttpClient:
+    """Uma requests.Session (keep-alive) por thread contra uma URL base."""
+
+    def __init__(self, base_url):
+        self._local = threading.local()
+        self.base_url = base_url.rstrip("/")
+
+    def send(self, entry):
+        import requests
+
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        url = self.base_url + entry["path"]
+        if entry["method"] == "GET":
+            response = session.get(url, params=entry.get("query"))
+        else:
+            response = session.post(url, json=entry.get("json"))
+        return response.status_code
+
+
+def _load_app():
+    if API_DIR not in sys.path:
+        sys.path.insert(0, API_DIR)
+    import app as api
+
+    return api.app
+
+
+def start_local_server(flask_app):
+    """Sobe o app num servidor werkzeug multi-thread numa porta livre."""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server("127.0.0.1", 0, flask_app, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+# =====================================================
+# EXECUÇÃO
+# =====================================================
+def run_load(client, corpus, concurrency, n_requests, warmup=20):
+    """Reexecuta o corpus (em ciclo) com `concurrency` threads; devolve amostras por endpoint."""
+    for entry in corpus[:warmup]:
+        client.send(entry)
+
+    entries = itertools.islice(itertools.cycle(corpus), n_requests)
+    lock = threading.Lock()
+    samples = {}
+
+    def worker():
+        while True:
+            with lock:
+                entry = next(entries, None)
+            if entry is None:
+                return
+            start = time.perf_counter()
+            try:
+                status = client.send(entry)
+            except Exception:
+                status = None
+            elapsed = time.perf_counter() - start
+            with lock:
+                bucket = samples.setdefault(entry["endpoint"], {"latency": [], "errors": 0})
+                bucket["latency"].append(elapsed)
+                if status is None or status >= 400:
+                    bucket["errors"] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples, wall_seconds):
+    def describe(latency, errors):
+        ms = np.asarray(latency) * 1000
+        return {
+            "requests": len(ms),
+            "errors": errors,
+            "throughput_rps": round(len(ms) / wall_seconds, 2),
+            "mean_ms": round(float(ms.mean()), 3),
+            "p50_ms": round(float(np.percentile(ms, 50)), 3),
+            "p95_ms": round(float(np.percentile(ms, 95)), 3),
+            "p99_ms": round(float(np.percentile(ms, 99)), 3),
+            "max_ms": round(float(ms.max()), 3),
+        }
+
+    endpoints = {name: describe(b["latency"], b["errors"]) for name, b in sorted(samples.items())}
+    overall = describe(
+        [x for b in samples.values() for x in b["latency"]],
+        sum(b["errors"] for b in samples.values()),
+    )
+    return {"wall_seconds": round(wall_seconds, 3), "overall": overall, "endpoints": endpoints}
+
+
+def _git_revision():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    cwd=PROJECT_ROOT, capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, dirty
+
+
+def print_summary(mode, summary, baseline=None):
+    print(f"\n[{mode}] {summary['overall']['requests']} requisições em {summary['wall_seconds']:.2f}s")
+    print(f"{'endpoint':<16}{'n':>6}{'err':>5}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = dict(summary["endpoints"], total=summary["overall"])
+    for name, r in rows.items():
+        line = (f"{name:<16}{r['requests']:>6}{r['errors']:>5}{r['throughput_rps']:>10.1f}"
+                f"{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}")
+        if baseline is not None:
+            old = baseline["overall"] if name == "total" else baseline["endpoints"].get(name)
+            if old:
+                line += (f"   Δp50 {_delta(r['p50_ms'], old['p50_ms'])}"
+                         f"  Δp95 {_delta(r['p95_ms'], old['p95_ms'])}"
+                         f"  Δreq/s {_delta(r['throughput_rps'], old['throughput_rps'])}")
+        print(line)
+
+
+def _delta(new, old):
+    return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark/carga dos endpoints da API.")
+    parser.add_argument("--data", default=DEFAULT_DATA)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL de requisições (gerado se não existir)")
+    parser.add_argument("--regenerate", action="store_true", help="regera o corpus mesmo se existir")
+    parser.add_argument("--corpus-size", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--jitter", type=float, default=0.05,
+                        help="ruído nas numéricas, em desvios-padrão (0 = linhas exatas do CSV)")
+    parser.add_argument("--mode", nargs="+", choices=["inprocess", "socket"], default=["inprocess", "socket"])
+    parser.add_argument("--url", default=None, help="API externa; substitui --mode")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000, help="requisições por modo")
+    parser.add_argument("--output-dir", default=RESULTS_DIR)
+    parser.add_argument("--compare", default=None, help="resultado JSON anterior para comparar")
+    args = parser.parse_args(argv)
+
+    if args.regenerate or not os.path.exists(args.corpus):
+        write_corpus(build_corpus(args.data, args.corpus_size, args.seed, args.jitter), args.corpus)
+        print(f"Corpus gerado em {args.corpus}")
+    corpus = read_corpus(args.corpus)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    commit, dirty = _git_revision()
+    modes = ["url"] if args.url else args.mode
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    for mode in modes:
+        server = None
+        if mode == "url":
+            client = HttpClient(args.url)
+        elif mode == "inprocess":
+            client = InProcessClient(_load_app())
+        else:
+            server, base_url = start_local_server(_load_app())
+            client = HttpClient(base_url)
+
+        try:
+            samples, wall = run_load(client, corpus, args.concurrency, args.requests)
+        finally:
+            if server is not None:
+                server.shutdown()
+
+        summary = summarize(samples, wall)
+        result = {
+            "commit": commit,
+            "dirty": dirty,
+            "mode": mode,
+            "url": args.url,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "concurrency": args.concurrency,
+            "corpus": {"path": os.path.abspath(args.corpus), "sha256": corpus_digest(args.corpus),
+                       "entries": len(corpus)},
+            "environment": {
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+                "api_env": {k: v for k, v in os.environ.items()
+                            if k.startswith(("MICROBATCH_", "PREDICTION_CACHE_", "BATCH_"))},
+            },
+            **summary,
+        }
+        compare = baseline if baseline is not None and baseline.get("mode") == mode else None
+        print_summary(mode, summary, compare)
+
+        name = f"{commit}{'-dirty' if dirty else ''}-{mode}.json"
+        path = os.path.join(args.output_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Resultado salvo em {path}")
+
+
+if __name__ == "__main__":
+    main()
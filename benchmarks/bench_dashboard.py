@@ -0,0 +1,206 @@
+"""
+Benchmark de execução do painel Streamlit (`app/app.py`).
+
+O Streamlit reexecuta o script inteiro a cada interação. Este benchmark mede, com o
+`streamlit.testing.v1.AppTest` (o mesmo runner do servidor, sem navegador), quanto
+tempo cada rerun leva:
+
+- `partida a frio`: processo novo até o fim da primeira execução (imports incluídos),
+  num subprocesso;
+- `primeira execução`: nova sessão num processo já aquecido (caches do Streamlit
+  preenchidos por sessões anteriores);
+- `formulário`: mudar a idade no formulário de predição;
+- `filtro de idade` e `filtro de gênero`: mudar os filtros do painel analítico;
+- `troca de seção`: ir do formulário ao painel, quando a navegação é por rerun.
+
+A API roda num subprocesso numa porta livre (`api/app.py`), para o painel sincronizar
+o cubo e ler o `/drift` como em produção. Reporta a mediana e o p95 de cada interação e
+grava o resultado em JSON (`benchmarks/results/<commit>-dashboard.json`), comparável
+entre commits com `--compare`.
+
+Uso:
+    python benchmarks/bench_dashboard.py [--repeat 15] [--cold 3] [--compare benchmarks/results/<commit>-dashboard.json]
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+API_DIR = os.path.join(PROJECT_ROOT, "api")
+APP_PATH = os.path.join(PROJECT_ROOT, "app", "app.py")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+sys.path.insert(0, BENCH_DIR)
+from bench_api import _delta, _git_revision  # noqa: E402
+
+SECTION_LABEL = "Seção"
+DASHBOARD_SECTION = "📊 Painel Analítico"
+PREDICTION_SECTION = "🔍 Predição Individual"
+
+
+# =====================================================
+# API EM SUBPROCESSO
+# =====================================================
+def start_api():
+    """Sobe a API do projeto numa porta livre; devolve (processo, URL do /predict)."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    env = dict(os.environ, INGEST_LOG_PATH=os.devnull, INGEST_WATCH_INTERVAL="0", MODEL_WATCH_INTERVAL="0")
+    process = subprocess.Popen(
+        [sys.executable, "-c", f"import app; app.app.run(host='127.0.0.1', port={port})"],
+        cwd=API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(base_url + "/ready", timeout=1)
+            return process, base_url + "/predict"
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("API did not become ready")
+
+
+# =====================================================
+# INTERAÇÕES
+# =====================================================
+def _timed(action):
+    start = time.perf_counter()
+    at = action()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed
+
+
+def _show(at, section):
+    """Vai à seção pedida quando a navegação é um widget (com st.tabs, tudo já roda)."""
+    radios = [r for r in at.radio if r.label == SECTION_LABEL]
+    if radios and radios[0].value != section:
+        radios[0].set_value(section).run()
+        return True
+    return False
+
+
+def _widget(elements, label):
+    return next(e for e in elements if e.label == label)
+
+
+def run_interactions(repeat):
+    from streamlit.testing.v1 import AppTest
+
+    def new_session():
+        return AppTest.from_file(APP_PATH, default_timeout=120)
+
+    # Aquece o processo (imports e caches globais) com uma sessão descartada.
+    new_session().run()
+
+    samples = {name: [] for name in (
+        "primeira execução", "formulário", "troca de seção", "filtro de idade", "filtro de gênero"
+    )}
+    for i in range(repeat):
+        at = new_session()
+        samples["primeira execução"].append(_timed(at.run))
+
+        idade = _widget(at.number_input, "Idade")
+        samples["formulário"].append(_timed(idade.set_value(30 + i % 2 + 1).run))
+
+        start = time.perf_counter()
+        if _show(at, DASHBOARD_SECTION):
+            samples["troca de seção"].append(time.perf_counter() - start)
+
+        faixa = _widget(at.sidebar.slider, "Faixa Etária")
+        low, high = faixa.value
+        samples["filtro de idade"].append(_timed(faixa.set_value((low + 1 + i % 5, high)).run))
+
+        genero = _widget(at.sidebar.selectbox, "Gênero")
+        samples["filtro de gênero"].append(_timed(genero.set_value(("Male", "Female")[i % 2]).run))
+        _show(at, PREDICTION_SECTION)
+
+    return {name: _describe(values) for name, values in samples.items() if values}
+
+
+def run_cold(n):
+    """Processo novo até o fim da primeira execução, imports incluídos."""
+    code = (
+        "import time; start = time.perf_counter()\n"
+        "from streamlit.testing.v1 import AppTest\n"
+        f"at = AppTest.from_file({APP_PATH!r}, default_timeout=120).run()\n"
+        "assert not at.exception, at.exception\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    samples = []
+    for _ in range(n):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                env=os.environ)
+        samples.append(float(output.stdout.strip().splitlines()[-1]))
+    return _describe(samples)
+
+
+def _describe(seconds):
+    ms = np.asarray(seconds) * 1000
+    return {
+        "runs": len(ms),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p95_ms": round(float(np.percentile(ms, 95)), 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de rerun do painel Streamlit por interação.")
+    parser.add_argument("--repeat", type=int, default=15, help="sessões medidas por interação")
+    parser.add_argument("--cold", type=int, default=3, help="partidas a frio (0 desativa)")
+    parser.add_argument("--output-dir", default=RESULTS_DIR)
+    parser.add_argument("--compare", default=None, help="resultado JSON anterior para comparar")
+    args = parser.parse_args(argv)
+
+    process, predict_url = start_api()
+    os.environ["API_URL"] = predict_url
+    try:
+        results = {}
+        if args.cold:
+            results["partida a frio"] = run_cold(args.cold)
+        results.update(run_interactions(args.repeat))
+    finally:
+        process.terminate()
+        process.wait()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["interactions"]
+
+    print(f"{'interação':<20}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, r in results.items():
+        line = f"{name:<20}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}"
+        if baseline is not None and name in baseline:
+            line += f"   Δp50 {_delta(r['p50_ms'], baseline[name]['p50_ms'])}"
+        print(line)
+
+    commit, dirty = _git_revision()
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f"{commit}{'-dirty' if dirty else ''}-dashboard.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "commit": commit,
+            "dirty": dirty,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "repeat": args.repeat,
+            "interactions": results,
+        }, f, indent=2)
+    print(f"Resultado salvo em {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark das explicações: atribuição por caminho nas árvores x permutação ingênua.
+
+Atribuição por caminho (a do `/explain`): `CompiledPipeline.explain`, uma passada
+nível a nível pelas árvores empacotadas (`api/trees.py`), com as colunas do one-hot
+somadas nos 16 campos. Mede a latência de uma linha (montagem do vetor + probabilidades
++ atribuições, como no endpoint sem cache), a vazão em lote e confere que valor base +
+contribuições reproduz a `decision_function` do modelo.
+
+Permutação ingênua (linha de base): para cada campo, troca o valor da linha pelo de N
+linhas de fundo do dataset, pontua com o pipeline sklearn e usa a queda média na
+probabilidade da classe prevista como importância. Custa 16 x N predições por linha.
+
+Também reporta a concordância entre os dois métodos: mesmo campo mais importante e
+correlação de Spearman entre os módulos das atribuições.
+
+Uso:
+    python benchmarks/bench_explain.py [--rows 50] [--background 50] [--repeat 300] [--output resultados.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "api"))
+
+from inference import compile_pipeline  # noqa: E402
+
+DEFAULT_MODEL = os.path.join(PROJECT_ROOT, "api", "obesity_model.pkl")
+DEFAULT_DATA = os.path.join(PROJECT_ROOT, "api", "obesity.csv")
+SEED = 42
+
+
+def _percentiles_ms(samples):
+    samples = np.asarray(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p95_ms": round(float(np.percentile(samples, 95)), 4),
+    }
+
+
+def path_attributions(compiled, record):
+    """Atribuições por campo da classe prevista, para um registro."""
+    X = compiled.transform_record(record)
+    proba = compiled.predict_proba(X)[0]
+    _, contrib = compiled.explain(X)
+    return contrib[0, int(np.argmax(proba))]
+
+
+def permutation_attributions(pipeline, row, background):
+    """Queda média na probabilidade da classe prevista ao trocar cada campo pelo fundo."""
+    predicted = int(np.argmax(pipeline.predict_proba(row)[0]))
+    base = pipeline.predict_proba(row)[0, predicted]
+    scores = np.empty(len(row.columns))
+    for j, name in enumerate(row.columns):
+        perturbed = pd.concat([row] * len(background), ignore_index=True)
+        perturbed[name] = background[name].to_numpy()
+        scores[j] = base - pipeline.predict_proba(perturbed)[:, predicted].mean()
+    return scores
+
+
+def _spearman(a, b):
+    ra = np.argsort(np.argsort(a))
+    rb = np.argsort(np.argsort(b))
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara atribuição por caminho e permutação.")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--data", default=DEFAULT_DATA)
+    parser.add_argument("--rows", type=int, default=50, help="linhas explicadas pela permutação")
+    parser.add_argument("--background", type=int, default=50, help="linhas de fundo por campo")
+    parser.add_argument("--repeat", type=int, default=300, help="explicações de uma linha (caminho)")
+    parser.add_argument("--output", default=None, help="grava os resultados em JSON")
+    args = parser.parse_args(argv)
+
+    pipeline = joblib.load(args.model)
+    compiled = compile_pipeline(pipeline)
+    df = pd.read_csv(args.data)
+    X_frame = df[list(pipeline.feature_names_in_)]
+    records = X_frame.to_dict("records")
+    rng = np.random.default_rng(SEED)
+
+    # Aditividade: valor base + contribuições = decision_function.
+    X = compiled.transform_records(records)
+    bias, contrib = compiled.explain(X)
+    additivity = float(np.abs(bias + contrib.sum(axis=2) - pipeline.decision_function(X_frame)).max())
+
+    samples = []
+    for i in range(args.repeat):
+        start = time.perf_counter()
+        path_attributions(compiled, records[i % len(records)])
+        samples.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    compiled.explain(compiled.transform_records(records))
+    batch_seconds = time.perf_counter() - start
+
+    rows = rng.choice(len(X_frame), size=args.rows, replace=False)
+    background = X_frame.iloc[rng.choice(len(X_frame), size=args.background, replace=False)].reset_index(drop=True)
+    perm_samples, same_top, correlations = [], 0, []
+    for i in rows:
+        start = time.perf_counter()
+        perm = permutation_attributions(pipeline, X_frame.iloc[[i]], background)
+        perm_samples.append(time.perf_counter() - start)
+        path = path_attributions(compiled, records[i])
+        same_top += int(np.argmax(np.abs(perm)) == np.argmax(np.abs(path)))
+        correlations.append(_spearman(np.abs(perm), np.abs(path)))
+
+    results = {
+        "additivity_max_error": additivity,
+        "path": dict(_percentiles_ms(samples), batch_rows_per_second=round(len(records) / batch_seconds)),
+        "permutation": dict(_percentiles_ms(perm_samples), background=args.background,
+                            predictions_per_row=len(X_frame.columns) * args.background),
+        "agreement": {
+            "rows": len(rows),
+            "same_top_feature": round(same_top / len(rows), 4),
+            "spearman_abs_mean": round(float(np.nanmean(correlations)), 4),
+        },
+    }
+
+    path, perm = results["path"], results["permutation"]
+    print(f"aditividade: max |base + Σ contribuições - decision_function| = {additivity:.2e}")
+    print(f"{'método':<14}{'1 linha p50':>13}{'p95':>11}")
+    print(f"{'caminho':<14}{path['p50_ms']:>11.3f}ms{path['p95_ms']:>9.3f}ms"
+          f"   lote: {path['batch_rows_per_second']} linhas/s")
+    print(f"{'permutação':<14}{perm['p50_ms']:>11.3f}ms{perm['p95_ms']:>9.3f}ms"
+          f"   ({perm['predictions_per_row']} predições por linha)")
+    print(f"speedup (p50): {perm['p50_ms'] / path['p50_ms']:.0f}x")
+    agreement = results["agreement"]
+    print(f"concordância em {agreement['rows']} linhas: mesmo campo mais importante "
+          f"{agreement['same_top_feature']:.0%}, Spearman médio {agreement['spearman_abs_mean']:.2f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark de modelos: Gradient Boosting atual x Histogram Gradient Boosting.
+
+Treina os dois pipelines no mesmo split do notebook (80/20 estratificado,
+random_state=42) e mede, para cada um: tempo de ajuste, latência de uma linha
+(mediana e p95 de `predict` num DataFrame de 1 linha, como no fallback da API),
+vazão em lote (linhas/s num lote grande), tamanho do .pkl e accuracy/F1 no teste.
+
+Para o Gradient Boosting também é medida a latência do caminho compilado que a API
+usa (`api/inference.py`); o HistGradientBoosting não é compilável e a API o serve
+pelo sklearn.
+
+Uso:
+    python benchmarks/bench_models.py [--repeat 200] [--batch-rows 20000] [--output resultados.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import train_test_split
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "api"))
+
+from training.train import RANDOM_STATE, TARGET, build_pipeline  # noqa: E402
+from inference import compile_pipeline  # noqa: E402
+
+DEFAULT_DATA = os.path.join(PROJECT_ROOT, "api", "obesity.csv")
+
+# nome no relatório -> (candidato do train.py, parâmetros)
+MODELS = {
+    "gradient_boosting": ("gradient_boosting", {}),
+    "hist_gradient_boosting": ("hist_gradient_boosting", {}),
+}
+
+
+def _percentiles_ms(samples):
+    samples = np.asarray(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p95_ms": round(float(np.percentile(samples, 95)), 4),
+    }
+
+
+def _time_calls(fn, rows, repeat):
+    samples = []
+    for i in range(repeat):
+        row = rows[i % len(rows)]
+        start = time.perf_counter()
+        fn(row)
+        samples.append(time.perf_counter() - start)
+    return _percentiles_ms(samples)
+
+
+def bench_model(name, params, X_train, y_train, X_test, y_test, repeat, batch_rows):
+    pipeline = build_pipeline(name, X_train, **params)
+
+    start = time.perf_counter()
+    pipeline.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    y_pred = pipeline.predict(X_test)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.pkl")
+        joblib.dump(pipeline, path)
+        size_bytes = os.path.getsize(path)
+
+    frames = [X_test.iloc[[i]] for i in range(len(X_test))]
+    single = _time_calls(pipeline.predict, frames, repeat)
+
+    batch = pd.concat([X_test] * (batch_rows // len(X_test) + 1), ignore_index=True).head(batch_rows)
+    pipeline.predict(batch.head(100))
+    start = time.perf_counter()
+    pipeline.predict(batch)
+    batch_seconds = time.perf_counter() - start
+
+    result = {
+        "fit_seconds": round(fit_seconds, 4),
+        "single_row": single,
+        "batch": {
+            "rows": len(batch),
+            "seconds": round(batch_seconds, 4),
+            "rows_per_second": round(len(batch) / batch_seconds, 1),
+        },
+        "model_bytes": size_bytes,
+        "accuracy": round(accuracy_score(y_test, y_pred), 4),
+        "f1_macro": round(f1_score(y_test, y_pred, average="macro"), 4),
+    }
+
+    try:
+        compiled = compile_pipeline(pipeline)
+    except TypeError:
+        compiled = None
+    if compiled is not None:
+        records = X_test.to_dict("records")
+        result["single_row_compiled"] = _time_calls(compiled.predict_record, records, repeat)
+
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara GB e HistGB em latência e accuracy.")
+    parser.add_argument("--data", default=DEFAULT_DATA)
+    parser.add_argument("--repeat", type=int, default=200, help="predições de uma linha por modelo")
+    parser.add_argument("--batch-rows", type=int, default=20000)
+    parser.add_argument("--output", default=None, help="grava os resultados em JSON")
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.data)
+    X = df.drop(columns=[TARGET])
+    y = df[TARGET]
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=RANDOM_STATE, stratify=y
+    )
+
+    results = {}
+    for label, (name, params) in MODELS.items():
+        results[label] = bench_model(name, params, X_train, y_train, X_test, y_test,
+                                     args.repeat, args.batch_rows)
+
+    header = f"{'modelo':<24}{'fit s':>8}{'1 linha p50':>13}{'p95':>9}{'lote l/s':>12}{'KB':>9}{'acc':>8}{'f1':>8}"
+    print(header)
+    for label, r in results.items():
+        print(f"{label:<24}{r['fit_seconds']:>8.2f}{r['single_row']['p50_ms']:>11.3f}ms"
+              f"{r['single_row']['p95_ms']:>7.3f}ms{r['batch']['rows_per_second']:>12.0f}"
+              f"{r['model_bytes'] / 1024:>9.1f}{r['accuracy']:>8.4f}{r['f1_macro']:>8.4f}")
+        if "single_row_compiled" in r:
+            c = r["single_row_compiled"]
+            print(f"{'  (compilado, API)':<24}{'':>8}{c['p50_ms']:>11.3f}ms{c['p95_ms']:>7.3f}ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
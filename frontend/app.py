@@ -14,6 +14,9 @@ import requests
 import os
 import plotly.express as px
 
+from api_client import ApiClient
+from columnar import load_dataset
+
 # =====================================================
 # CONFIGURAÇÃO DA PÁGINA
 # =====================================================
@@ -31,6 +34,14 @@ st.divider()
 # =====================================================
 API_URL = "https://obesity-api-2uun.onrender.com/predict"
 
+
+@st.cache_resource
+def get_api_client():
+    return ApiClient(API_URL)
+
+api_client = get_api_client()
+api_client.warm_up()
+
 # =====================================================
 # MAPAS DE TRADUÇÃO
 # =====================================================
@@ -62,6 +73,44 @@ obesity_map_pt = {
     "Obesity_Type_III": "Obesidade Tipo III"
 }
 
+# Rótulos dos campos nas explicações da predição.
+campos_pt = {
+    "Gender": "Gênero",
+    "Age": "Idade",
+    "Height": "Altura",
+    "Weight": "Peso",
+    "family_history": "Histórico familiar",
+    "FAVC": "Alimentos calóricos",
+    "FCVC": "Consumo de vegetais",
+    "NCP": "Refeições por dia",
+    "CAEC": "Alimentação entre refeições",
+    "SMOKE": "Tabagismo",
+    "CH2O": "Consumo de água",
+    "SCC": "Monitora calorias",
+    "FAF": "Atividade física",
+    "TUE": "Tempo de tela",
+    "CALC": "Consumo de álcool",
+    "MTRANS": "Meio de transporte"
+}
+
+
+def mostrar_explicacao(explicacao, n=6):
+    """Campos que mais pesaram na classificação (contribuições do `/explain`)."""
+    principais = explicacao["contributions"][:n]
+    st.markdown("**Fatores que mais influenciaram a classificação**")
+    st.bar_chart(
+        pd.DataFrame({
+            "Campo": [campos_pt.get(c["feature"], c["feature"]) for c in principais],
+            "Contribuição": [c["value"] for c in principais]
+        }),
+        x="Campo",
+        y="Contribuição",
+        horizontal=True,
+        sort=False
+    )
+    st.caption("Valores positivos aproximam o paciente da classe prevista; negativos o afastam.")
+
+
 # =====================================================
 # CARREGAR DADOS PARA DASHBOARD
 # =====================================================
@@ -69,13 +118,14 @@ obesity_map_pt = {
 def load_data():
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     DATA_PATH = os.path.join(BASE_DIR, "obesity.csv")
-    return pd.read_csv(DATA_PATH)
+    df = load_dataset(DATA_PATH)
+    # Colunas derivadas calculadas uma vez, dentro do cache, e não a cada rerun.
+    df["IMC"] = df["Weight"] / (df["Height"] ** 2)
+    df["Nível de Obesidade"] = df["Obesity"].map(obesity_map_pt)
+    return df
 
 df = load_data()
 
-df["IMC"] = df["Weight"] / (df["Height"] ** 2)
-df["Nível de Obesidade"] = df["Obesity"].map(obesity_map_pt)
-
 # =====================================================
 # ABAS
 # =====================================================
@@ -137,13 +187,21 @@ with tab1:
         }
 
         try:
-            response = requests.post(API_URL, json=input_data)
+            response, latencia_ms = api_client.predict(input_data)
             if response.status_code == 200:
-                prediction = response.json()["prediction"]
+                result = response.json()
+                prediction = result["prediction"]
                 prediction_pt = obesity_map_pt.get(prediction, prediction)
                 st.success(f"🎯 Classificação estimada: {prediction_pt}")
+                probabilidades = result.get("probabilities")
+                if probabilidades:
+                    st.caption(f"Confiança do modelo: {probabilidades[prediction]:.0%}")
+                explicacao = api_client.explain(input_data)
+                if explicacao.status_code == 200:
+                    mostrar_explicacao(explicacao.json())
             else:
                 st.error(f"Erro na API: {response.status_code}")
+            st.caption(f"⏱️ Tempo de resposta da API: {latencia_ms:.0f} ms")
 
         except requests.exceptions.RequestException:
             st.error("⚠️ Não foi possível conectar à API.")
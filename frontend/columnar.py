@@ -0,0 +1,127 @@
+"""
+Formato colunar binário para o dataset, com carregamento por memory-map.
+
+`python columnar.py obesity.csv` grava `obesity.columns/` ao lado do CSV: um arquivo
+`.npy` por coluna (categóricas codificadas por dicionário em int8/int16, numéricas no
+menor tipo inteiro ou float32 que represente os valores sem perda, senão float64) e um
+`schema.json` com a ordem das colunas, os dicionários das categóricas e a assinatura do
+CSV de origem.
+
+`load_dataset(csv_path)` abre as colunas com `np.load(..., mmap_mode="r")`, de modo que
+vários processos compartilham as mesmas páginas físicas e a inicialização não precisa
+interpretar o CSV. Se o diretório não existir, estiver desatualizado ou corrompido, o
+CSV é lido normalmente.
+
+Este arquivo é idêntico em `api/`, `app/` e `frontend/`, assim como o `obesity.csv`.
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+SCHEMA_FILE = "schema.json"
+
+
+def columnar_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".columns"
+
+
+def _source_signature(csv_path):
+    stat = os.stat(csv_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _numeric_array(values):
+    """Menor representação sem perda: inteiro estreito, float32 ou o dtype original."""
+    values = np.asarray(values)
+    if values.dtype.kind in "iu":
+        for dtype in (np.int8, np.int16, np.int32):
+            info = np.iinfo(dtype)
+            if len(values) == 0 or (values.min() >= info.min and values.max() <= info.max):
+                return values.astype(dtype)
+        return values
+
+    as_float32 = values.astype(np.float32)
+    if np.array_equal(as_float32.astype(values.dtype), values, equal_nan=True):
+        return as_float32
+    return values
+
+
+# =====================================================
+# CONVERSÃO CSV -> COLUNAR
+# =====================================================
+def convert(csv_path, out_dir=None):
+    """Converte o CSV para o formato colunar e retorna o diretório gerado."""
+    out_dir = out_dir or columnar_path(csv_path)
+    df = pd.read_csv(csv_path)
+    os.makedirs(out_dir, exist_ok=True)
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        file_name = f"{i:03d}.npy"
+        if not pd.api.types.is_numeric_dtype(series):
+            codes, categories = pd.factorize(series, sort=True)
+            dtype = np.int8 if len(categories) < 128 else np.int16
+            np.save(os.path.join(out_dir, file_name), codes.astype(dtype))
+            columns.append({"name": name, "file": file_name, "kind": "category",
+                            "categories": [str(c) for c in categories]})
+        else:
+            array = _numeric_array(series.to_numpy())
+            np.save(os.path.join(out_dir, file_name), array)
+            columns.append({"name": name, "file": file_name, "kind": "numeric",
+                            "dtype": array.dtype.name, "source_dtype": series.dtype.name})
+
+    schema = {
+        "version": FORMAT_VERSION,
+        "rows": len(df),
+        "source": _source_signature(csv_path),
+        "columns": columns,
+    }
+    # schema.json por último: sem ele o diretório é ignorado pelo loader.
+    with open(os.path.join(out_dir, SCHEMA_FILE), "w", encoding="utf-8") as f:
+        json.dump(schema, f, ensure_ascii=False, indent=2)
+    return out_dir
+
+
+# =====================================================
+# CARREGAMENTO
+# =====================================================
+def load_columnar(path):
+    """Abre o dataset colunar por memory-map; categóricas viram pd.Categorical."""
+    with open(os.path.join(path, SCHEMA_FILE), encoding="utf-8") as f:
+        schema = json.load(f)
+    if schema.get("version") != FORMAT_VERSION:
+        raise ValueError(f"unsupported columnar format version: {schema.get('version')}")
+
+    data = {}
+    for column in schema["columns"]:
+        array = np.load(os.path.join(path, column["file"]), mmap_mode="r")
+        if len(array) != schema["rows"]:
+            raise ValueError(f"column {column['name']} has {len(array)} rows, expected {schema['rows']}")
+        if column["kind"] == "category":
+            data[column["name"]] = pd.Categorical.from_codes(array, column["categories"])
+        else:
+            data[column["name"]] = array
+    return pd.DataFrame(data, copy=False), schema
+
+
+def load_dataset(csv_path):
+    """Carrega o dataset do formato colunar quando atualizado; senão lê o CSV."""
+    path = columnar_path(csv_path)
+    try:
+        df, schema = load_columnar(path)
+        if os.path.exists(csv_path) and schema["source"] != _source_signature(csv_path):
+            raise ValueError("columnar copy is older than the CSV")
+        return df
+    except (OSError, ValueError, KeyError):
+        return pd.read_csv(csv_path)
+
+
+if __name__ == "__main__":
+    for csv_file in sys.argv[1:] or ["obesity.csv"]:
+        print(f"{csv_file} -> {convert(csv_file)}")
@@ -0,0 +1,313 @@
+"""
+Treinamento reprodutível do modelo de obesidade.
+
+Reproduz a etapa de modelagem do notebook `01_eda_obesity.ipynb` como um comando:
+lê o dataset, separa treino/teste estratificado (80/20, random_state=42), compara por
+validação cruzada os pipelines candidatos (Regressão Logística, Random Forest,
+Gradient Boosting e Histogram Gradient Boosting) com uma busca de hiperparâmetros,
+reajusta o vencedor no treino e grava o pipeline completo (`preprocessing` + `model`, o
+formato que a API carrega) e um relatório JSON com métricas e tempos.
+
+As avaliações (candidato x hiperparâmetros x fold) rodam em paralelo num pool de
+processos usando todos os núcleos. O pré-processamento é ajustado uma única vez por
+fold e por tipo ("onehot": StandardScaler + OneHotEncoder; "ordinal": categorias
+ordinais para o tratamento nativo de categóricas do HistGradientBoosting) e
+reaproveitado por todos os candidatos que o usam: os workers recebem as matrizes já
+transformadas no initializer e só ajustam o estimador.
+
+Uso:
+    python training/train.py --data api/obesity.csv --output models/obesity_model.pkl
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import (
+    GradientBoostingClassifier,
+    HistGradientBoostingClassifier,
+    RandomForestClassifier,
+)
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, classification_report, f1_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DATA = os.path.join(PROJECT_ROOT, "api", "obesity.csv")
+DEFAULT_OUTPUT = os.path.join(PROJECT_ROOT, "models", "obesity_model.pkl")
+
+TARGET = "Obesity"
+RANDOM_STATE = 42
+
+# =====================================================
+# CANDIDATOS E GRADES DE HIPERPARÂMETROS
+# =====================================================
+# nome -> (estimador base, grade, tipo de pré-processamento)
+CANDIDATES = {
+    "logistic_regression": (
+        LogisticRegression(max_iter=1000, solver="lbfgs"),
+        {"C": [0.1, 1.0, 10.0]},
+        "onehot",
+    ),
+    "random_forest": (
+        RandomForestClassifier(n_estimators=200, random_state=RANDOM_STATE, n_jobs=1),
+        {"max_depth": [None, 20], "min_samples_leaf": [1, 2]},
+        "onehot",
+    ),
+    "gradient_boosting": (
+        GradientBoostingClassifier(random_state=RANDOM_STATE),
+        {"n_estimators": [100, 200], "max_depth": [3, 4]},
+        "onehot",
+    ),
+    "hist_gradient_boosting": (
+        HistGradientBoostingClassifier(random_state=RANDOM_STATE),
+        {"learning_rate": [0.1, 0.05], "max_iter": [200, 400]},
+        "ordinal",
+    ),
+}
+
+
+def split_features(X):
+    categorical_features = X.select_dtypes(exclude="number").columns.tolist()
+    numerical_features = X.select_dtypes(include="number").columns.tolist()
+    return categorical_features, numerical_features
+
+
+def build_preprocessor(X, kind="onehot"):
+    """Pré-processamento do candidato.
+
+    "onehot" é o do notebook (scaler nas numéricas, one-hot nas categóricas). "ordinal"
+    codifica as categóricas como inteiros (desconhecidas viram NaN, tratadas como
+    ausentes) e as coloca primeiro, para o HistGradientBoosting tratá-las nativamente.
+    """
+    categorical_features, numerical_features = split_features(X)
+    if kind == "ordinal":
+        return ColumnTransformer(
+            transformers=[
+                ("cat", OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=np.nan),
+                 categorical_features),
+                ("num", "passthrough", numerical_features)
+            ]
+        )
+    return ColumnTransformer(
+        transformers=[
+            ("num", StandardScaler(), numerical_features),
+            ("cat", OneHotEncoder(handle_unknown="ignore"), categorical_features)
+        ]
+    )
+
+
+def build_estimator(name, X, **params):
+    """Estimador do candidato, já apontando as colunas categóricas quando nativas."""
+    estimator = clone(CANDIDATES[name][0]).set_params(**params)
+    if CANDIDATES[name][2] == "ordinal":
+        n_categorical = len(split_features(X)[0])
+        estimator.set_params(categorical_features=list(range(n_categorical)))
+    return estimator
+
+
+def build_pipeline(name, X, **params):
+    return Pipeline(steps=[
+        ("preprocessing", build_preprocessor(X, CANDIDATES[name][2])),
+        ("model", build_estimator(name, X, **params))
+    ])
+
+
+def iter_param_grid(grid):
+    names = sorted(grid)
+    for values in itertools.product(*(grid[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+# =====================================================
+# WORKERS DO POOL
+# =====================================================
+_FOLDS = None
+_N_CATEGORICAL = None
+
+
+def _init_worker(folds, n_categorical):
+    global _FOLDS, _N_CATEGORICAL
+    _FOLDS = folds
+    _N_CATEGORICAL = n_categorical
+
+
+def _evaluate(task):
+    """Ajusta um candidato num fold já pré-processado e devolve métricas + tempo."""
+    name, params, fold = task
+    base, _, kind = CANDIDATES[name]
+    X_fit, y_fit, X_val, y_val = _FOLDS[kind][fold]
+    estimator = clone(base).set_params(**params)
+    if kind == "ordinal":
+        estimator.set_params(categorical_features=list(range(_N_CATEGORICAL)))
+
+    start = time.perf_counter()
+    estimator.fit(X_fit, y_fit)
+    fit_seconds = time.perf_counter() - start
+
+    y_pred = estimator.predict(X_val)
+    return {
+        "candidate": name,
+        "params": params,
+        "fold": fold,
+        "accuracy": accuracy_score(y_val, y_pred),
+        "f1_macro": f1_score(y_val, y_pred, average="macro"),
+        "fit_seconds": fit_seconds,
+    }
+
+
+def preprocess_folds(X, y, n_splits, kinds):
+    """Ajusta o pré-processamento uma vez por fold e tipo (cache compartilhado entre candidatos)."""
+    folds = {kind: [] for kind in kinds}
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=RANDOM_STATE)
+    for fit_idx, val_idx in splitter.split(X, y):
+        y_fit, y_val = y.iloc[fit_idx].to_numpy(), y.iloc[val_idx].to_numpy()
+        for kind in kinds:
+            preprocessor = build_preprocessor(X, kind)
+            X_fit = preprocessor.fit_transform(X.iloc[fit_idx])
+            X_val = preprocessor.transform(X.iloc[val_idx])
+            folds[kind].append((X_fit, y_fit, X_val, y_val))
+    return folds
+
+
+def summarize(results, metric):
+    """Agrega os folds por (candidato, parâmetros), do melhor para o pior."""
+    grouped = {}
+    for r in results:
+        key = (r["candidate"], json.dumps(r["params"], sort_keys=True))
+        grouped.setdefault(key, []).append(r)
+
+    summary = []
+    for (name, params), rows in grouped.items():
+        scores = np.array([r[metric] for r in rows])
+        summary.append({
+            "candidate": name,
+            "params": json.loads(params),
+            f"mean_{metric}": float(scores.mean()),
+            f"std_{metric}": float(scores.std()),
+            "mean_accuracy": float(np.mean([r["accuracy"] for r in rows])),
+            "mean_f1_macro": float(np.mean([r["f1_macro"] for r in rows])),
+            "total_fit_seconds": float(sum(r["fit_seconds"] for r in rows)),
+        })
+    summary.sort(key=lambda s: s[f"mean_{metric}"], reverse=True)
+    return summary
+
+
+# =====================================================
+# EXECUÇÃO
+# =====================================================
+def train(data_path, output_path, report_path=None, candidates=None, n_splits=5,
+          metric="accuracy", n_jobs=None):
+    started = time.perf_counter()
+    df = pd.read_csv(data_path)
+    X = df.drop(columns=[TARGET])
+    y = df[TARGET]
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=RANDOM_STATE, stratify=y
+    )
+
+    names = candidates or list(CANDIDATES)
+    tasks = [
+        (name, params, fold)
+        for name in names
+        for params in iter_param_grid(CANDIDATES[name][1])
+        for fold in range(n_splits)
+    ]
+
+    t0 = time.perf_counter()
+    kinds = sorted({CANDIDATES[name][2] for name in names})
+    folds = preprocess_folds(X_train, y_train, n_splits, kinds)
+    n_categorical = len(split_features(X_train)[0])
+    preprocess_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    n_jobs = n_jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                             initargs=(folds, n_categorical)) as pool:
+        # Tarefas mais caras primeiro, para não sobrar um fit longo no final.
+        order = sorted(range(len(tasks)), key=lambda i: tasks[i][0] == "logistic_regression")
+        results = list(pool.map(_evaluate, [tasks[i] for i in order]))
+    search_seconds = time.perf_counter() - t0
+
+    summary = summarize(results, metric)
+    best = summary[0]
+
+    t0 = time.perf_counter()
+    pipeline = build_pipeline(best["candidate"], X_train, **best["params"])
+    pipeline.fit(X_train, y_train)
+    refit_seconds = time.perf_counter() - t0
+
+    y_pred = pipeline.predict(X_test)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    joblib.dump(pipeline, output_path)
+
+    report = {
+        "data": os.path.abspath(data_path),
+        "model_path": os.path.abspath(output_path),
+        "selection_metric": metric,
+        "best": best,
+        "test": {
+            "accuracy": accuracy_score(y_test, y_pred),
+            "f1_macro": f1_score(y_test, y_pred, average="macro"),
+            "classification_report": classification_report(y_test, y_pred, output_dict=True),
+        },
+        "cv": {"n_splits": n_splits, "results": summary},
+        "timing": {
+            "preprocess_seconds": preprocess_seconds,
+            "search_seconds": search_seconds,
+            "sequential_fit_seconds": float(sum(r["fit_seconds"] for r in results)),
+            "refit_seconds": refit_seconds,
+            "total_seconds": time.perf_counter() - started,
+            "n_jobs": n_jobs,
+            "tasks": len(tasks),
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "sklearn": sklearn.__version__,
+        },
+    }
+
+    report_path = report_path or os.path.splitext(output_path)[0] + "_report.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return pipeline, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Treina e seleciona o modelo de obesidade.")
+    parser.add_argument("--data", default=DEFAULT_DATA, help="CSV com a coluna alvo 'Obesity'")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="caminho do pipeline .pkl")
+    parser.add_argument("--report", default=None, help="caminho do relatório JSON")
+    parser.add_argument("--candidates", nargs="+", choices=sorted(CANDIDATES), default=None)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--metric", choices=["accuracy", "f1_macro"], default="accuracy")
+    parser.add_argument("--jobs", type=int, default=None, help="processos (padrão: todos os núcleos)")
+    args = parser.parse_args(argv)
+
+    _, report = train(args.data, args.output, args.report, args.candidates,
+                      args.folds, args.metric, args.jobs)
+
+    best = report["best"]
+    timing = report["timing"]
+    print(f"Melhor modelo: {best['candidate']} {best['params']}")
+    print(f"CV {report['selection_metric']}: {best['mean_' + report['selection_metric']]:.4f}")
+    print(f"Teste: accuracy={report['test']['accuracy']:.4f} f1_macro={report['test']['f1_macro']:.4f}")
+    print(f"Busca: {timing['tasks']} ajustes em {timing['search_seconds']:.1f}s "
+          f"({timing['n_jobs']} processos; {timing['sequential_fit_seconds']:.1f}s somando os fits)")
+    print(f"Modelo salvo em {report['model_path']}")
+
+
+if __name__ == "__main__":
+    main()